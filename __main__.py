@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the whole YOLol pipeline:
+
+    python . scrape | generate | split | validate | train | distill | metrics | evaluate | detect | serve | extract-frames
+
+Only argparse and the standard library are imported here. Every subcommand loads its
+own package (and with it torch, ultralytics, cv2, selenium or mss) when it runs, so the
+lightweight commands start fast.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_module(package, module="__main__"):
+    """
+    Imports a module of one of the project folders, which use flat imports between their files.
+
+    Parameters:
+    ----------
+    package (str):
+        Project folder (e.g. "train_model").
+    module (str):
+        File name without extension inside the folder.
+
+    Returns:
+    -------
+    module:
+        The imported module.
+    """
+    directory = os.path.join(ROOT, package)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = f"{package}_main" if module == "__main__" else module
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, f"{module}.py"))
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@contextmanager
+def working_dir(path):
+    """
+    Runs the block inside a project folder (or any absolute path), since the scripts
+    use paths relative to it (./utils, ./assets, ./characters.json, ./video...).
+    """
+    previous = os.getcwd()
+    os.chdir(os.path.join(ROOT, path))
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def absolute(path):
+    """
+    Resolves a user path against the directory the CLI was called from.
+    """
+    return os.path.abspath(path) if path else path
+
+
+def cmd_scrape(args):
+    path = absolute(args.path)
+    with working_dir("scrapping"):
+        load_module("scrapping").main(path, workers=args.workers, rate=args.rate, normalize=not args.no_normalize)
+
+
+def cmd_generate(args):
+    with working_dir("minimap_generator"):
+        load_module("minimap_generator").main(args.maps, seed=args.seed, sizes=args.sizes,
+                                              feedback=absolute(args.feedback), manifest=absolute(args.manifest),
+                                              run_name=args.run, workers=args.workers, max_rss_mb=args.max_rss,
+                                              report_every=args.report_every, use_pool=args.pool,
+                                              batch_size=args.batch)
+
+
+def cmd_split(args):
+    train = load_module("train_model")
+    output = absolute(args.output)
+    tm = train.TrainModelYOLO(
+        source_images_dir=absolute(args.images),
+        source_labels_dir=absolute(args.labels or args.images),
+        output_dir=output,
+        train_ratio=args.train, val_ratio=args.val, test_ratio=args.test
+    )
+    tm.shuffle()
+    with working_dir("train_model"):
+        class_names, _ = train.load_class()
+    tm.create_yaml(os.path.join(output, "data.yaml"), names=class_names)
+
+
+def cmd_validate(args):
+    dataset_index = load_module("train_model", "dataset_index")
+    index = dataset_index.DatasetIndex(absolute(args.images), absolute(args.labels),
+                                       num_classes=args.classes, workers=args.workers)
+    stats = index.refresh()
+    print(f"🔄 {stats['scanned']} escaneadas, {stats['cached']} en caché, {stats['removed']} eliminadas")
+    dataset_index.print_report(index.report(), args.images)
+
+
+def cmd_train(args):
+    train = load_module("train_model")
+    data = absolute(args.data)
+    tm = train.TrainModelYOLO(None, None, name=args.name, output_dir=os.path.dirname(data))
+    tm.train(data, model=args.model, epochs=args.epochs, batch=args.batch,
+             imgsz=args.imgsz, device=args.device, patience=args.patience, mmap=args.mmap,
+             coreset=args.coreset)
+
+
+def cmd_distill(args):
+    train = load_module("train_model")
+    data_dir = absolute(args.data)
+    tm = train.TrainModelYOLO(None, None, name=args.name, output_dir=data_dir)
+    tm.distill(absolute(args.teacher), student=args.student, extra_images=absolute(args.extra_images),
+               conf=args.conf, epochs=args.epochs, batch=args.batch, imgsz=args.imgsz, device=args.device,
+               patience=args.patience)
+
+
+def cmd_metrics(args):
+    train = load_module("train_model")
+    data = absolute(args.data)
+    tm = train.TrainModelYOLO(None, None, output_dir=os.path.dirname(data))
+    tm.export_class_metrics(absolute(args.weights), data, absolute(args.output),
+                            imgsz=args.imgsz, device=args.device,
+                            recipes=[absolute(r) for r in args.recipes] if args.recipes else None)
+
+
+def cmd_evaluate(args):
+    evaluate = load_module("train_model", "evaluate")
+    evaluate.evaluate([absolute(w) for w in args.weights], absolute(args.data), args.split,
+                      iou=args.iou, conf=args.conf, imgsz=args.imgsz, batch=args.batch,
+                      device=args.device, output_json=absolute(args.output))
+
+
+def cmd_detect(args):
+    realtime = load_module("train_model", "realtime_detection")
+    if args.capture:
+        realtime.capture(args.bus or "yolol_frames")
+    else:
+        realtime.main(absolute(args.weights) if args.weights else realtime.WEIGHTS, bus_name=args.bus,
+                      service=("127.0.0.1", args.service) if args.service else None, stream=args.stream,
+                      heatmap_path=absolute(args.heatmap), store_path=absolute(args.store), game=args.game)
+
+
+def cmd_serve(args):
+    service = load_module("train_model", "inference_service")
+    if args.demo:
+        service.demo(args.demo, max_batch=args.max_batch, max_wait=args.max_wait / 1000)
+        return
+    weights = absolute(args.weights) if args.weights else service.WEIGHTS
+    predict, names = service.yolo_predictor(weights, imgsz=args.imgsz, device=args.device)
+    service.InferenceService(predict, names, address=("127.0.0.1", args.port),
+                             max_batch=args.max_batch, max_wait=args.max_wait / 1000).serve_forever()
+
+
+def cmd_extract_frames(args):
+    extractor = load_module("video_training")
+    hud_index, layout = absolute(args.hud), absolute(args.layout)
+    with working_dir(absolute(args.path)):
+        extractor.main(not args.fixed, args.interval, args.min_spacing, args.max_spacing, args.analysis_fps,
+                       hud_index, args.dedup, args.dedup_distance, args.dedup_minimap, layout)
+
+
+def build_parser():
+    """
+    Builds the argument parser with one subcommand per pipeline step.
+    """
+    parser = argparse.ArgumentParser(prog="yolol", description="YOLol: visión por computador del minimapa de LoL")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scrape", help="Descarga los recursos del CDN.")
+    p.add_argument("--path", type=str, default="./data_train", help="Ruta donde guardar los datos.")
+    p.add_argument("--workers", type=int, default=8, help="Descargas simultáneas.")
+    p.add_argument("--rate", type=float, default=10.0, help="Peticiones por segundo como máximo.")
+    p.add_argument("--no-normalize", action="store_true", help="No normaliza los recursos al terminar.")
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser("generate", help="Genera minimapas sintéticos.")
+    p.add_argument("--maps", type=int, default=20000, help="Número de minimapas a generar.")
+    p.add_argument("--seed", type=int, default=None, help="Semilla de la ejecución.")
+    p.add_argument("--sizes", type=int, nargs="*", default=None, help="Resoluciones de salida (p. ej. 640 800).")
+    p.add_argument("--feedback", type=str, default=None, help="JSON de métricas por clase para generar casos difíciles.")
+    p.add_argument("--manifest", type=str, default=None, help="Manifiesto de recursos normalizados del scraper.")
+    p.add_argument("--run", type=str, default="run", help="Nombre de la ejecución (se reanuda si ya existe).")
+    p.add_argument("--workers", type=int, default=1, help="Procesos generadores.")
+    p.add_argument("--max-rss", type=float, default=None, help="MB de RSS a partir de los que se recicla un proceso.")
+    p.add_argument("--report-every", type=int, default=1000, help="Mapas entre informes de recursos.")
+    p.add_argument("--pool", action="store_true", help="Reutiliza los buffers de imagen entre mapas.")
+    p.add_argument("--batch", type=int, default=None, help="Mapas renderizados juntos con BatchRenderer.")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("split", help="Divide el dataset en train/val/test y crea el YAML.")
+    p.add_argument("--images", type=str, required=True, help="Carpeta de imágenes generadas.")
+    p.add_argument("--labels", type=str, default=None, help="Carpeta de etiquetas (por defecto la de imágenes).")
+    p.add_argument("--output", type=str, default="./prepared_data", help="Carpeta del dataset preparado.")
+    p.add_argument("--train", type=float, default=0.8)
+    p.add_argument("--val", type=float, default=0.1)
+    p.add_argument("--test", type=float, default=0.1)
+    p.set_defaults(func=cmd_split)
+
+    p = sub.add_parser("validate", help="Valida un dataset YOLO con un índice en caché.")
+    p.add_argument("images", type=str, help="Carpeta de imágenes.")
+    p.add_argument("--labels", type=str, default=None, help="Carpeta de etiquetas.")
+    p.add_argument("--classes", type=int, default=None, help="Número de clases.")
+    p.add_argument("--workers", type=int, default=None, help="Procesos en paralelo.")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("train", help="Entrena un modelo YOLO.")
+    p.add_argument("--data", type=str, default="./prepared_data/data.yaml", help="YAML del dataset.")
+    p.add_argument("--model", type=str, default="yolo11s.pt")
+    p.add_argument("--name", type=str, default="LeagueIAModel")
+    p.add_argument("--epochs", type=int, default=200)
+    p.add_argument("--batch", type=int, default=16)
+    p.add_argument("--imgsz", type=int, default=800)
+    p.add_argument("--device", type=str, default="cuda")
+    p.add_argument("--patience", type=int, default=20)
+    p.add_argument("--mmap", action="store_true", help="Lee las imágenes ya decodificadas de un array mmap.")
+    p.add_argument("--coreset", type=float, default=None,
+                   help="Entrena con un subconjunto equilibrado de train de este tamaño (o fracción si < 1).")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("distill", help="Entrena un modelo pequeño con ayuda de uno grande.")
+    p.add_argument("teacher", type=str, help="Pesos del modelo profesor.")
+    p.add_argument("--data", type=str, default="./prepared_data", help="Carpeta del dataset preparado.")
+    p.add_argument("--student", type=str, default="yolo11n.pt", help="Modelo alumno.")
+    p.add_argument("--extra-images", type=str, default=None, help="Imágenes sin etiquetar que etiqueta el profesor.")
+    p.add_argument("--conf", type=float, default=0.25, help="Confianza mínima de las cajas del profesor.")
+    p.add_argument("--name", type=str, default="LeagueIAModel")
+    p.add_argument("--epochs", type=int, default=200)
+    p.add_argument("--batch", type=int, default=16)
+    p.add_argument("--imgsz", type=int, default=800)
+    p.add_argument("--device", type=str, default="cuda")
+    p.add_argument("--patience", type=int, default=20)
+    p.set_defaults(func=cmd_distill)
+
+    p = sub.add_parser("metrics", help="Exporta las métricas por clase de un modelo para --feedback.")
+    p.add_argument("weights", type=str, help="Pesos del modelo entrenado.")
+    p.add_argument("--data", type=str, default="./prepared_data/data.yaml", help="YAML del dataset.")
+    p.add_argument("--output", type=str, default="./class_metrics.json", help="JSON de salida.")
+    p.add_argument("--imgsz", type=int, default=800)
+    p.add_argument("--device", type=str, default="cuda")
+    p.add_argument("--recipes", type=str, nargs="*", default=None,
+                   help="recipes.jsonl de las generaciones del dataset, para el recall por estilo.")
+    p.set_defaults(func=cmd_metrics)
+
+    p = sub.add_parser("evaluate", help="Evalúa y compara modelos con predicciones en caché.")
+    p.add_argument("weights", nargs="+", help="Pesos de los modelos a comparar.")
+    p.add_argument("--data", type=str, default="./prepared_data", help="Carpeta del dataset preparado.")
+    p.add_argument("--split", type=str, default="test")
+    p.add_argument("--iou", type=float, default=0.5, help="IoU para precisión, recall y matriz de confusión.")
+    p.add_argument("--conf", type=float, default=0.25, help="Confianza para precisión, recall y matriz de confusión.")
+    p.add_argument("--imgsz", type=int, default=800)
+    p.add_argument("--batch", type=int, default=32)
+    p.add_argument("--device", type=str, default=None)
+    p.add_argument("--output", type=str, default=None, help="JSON con los resultados.")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("detect", help="Detección en tiempo real sobre la pantalla.")
+    p.add_argument("--weights", type=str, default=None, help="Pesos del modelo entrenado.")
+    p.add_argument("--bus", type=str, default=None, help="Lee los frames de este bus de memoria compartida.")
+    p.add_argument("--capture", action="store_true", help="Solo captura la pantalla y la publica en el bus.")
+    p.add_argument("--service", type=int, default=None, help="Puerto del servicio de inferencia compartido.")
+    p.add_argument("--stream", type=str, default="detect", help="Nombre de esta partida en el servicio.")
+    p.add_argument("--heatmap", type=str, default=None, help="Guarda el heatmap de posiciones en este .npz.")
+    p.add_argument("--store", type=str, default=None, help="Carpeta del almacén de detecciones.")
+    p.add_argument("--game", type=int, default=0, help="Identificador de la partida en el almacén.")
+    p.set_defaults(func=cmd_detect)
+
+    p = sub.add_parser("serve", help="Servicio de inferencia por lotes compartido por varias partidas.")
+    p.add_argument("--weights", type=str, default=None, help="Pesos del modelo entrenado.")
+    p.add_argument("--port", type=int, default=6010, help="Puerto local.")
+    p.add_argument("--imgsz", type=int, default=800)
+    p.add_argument("--device", type=str, default=None)
+    p.add_argument("--max-batch", type=int, default=16, help="Frames máximos por lote.")
+    p.add_argument("--max-wait", type=float, default=10.0, help="Espera máxima por lote en ms.")
+    p.add_argument("--demo", type=int, default=0, help="Prueba con N productores sintéticos y un modelo falso.")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("extract-frames", help="Extrae frames de los .mkv de una carpeta 'video/'.")
+    p.add_argument("--path", type=str, default=".", help="Carpeta que contiene 'video/'.")
+    p.add_argument("--fixed", action="store_true", help="Extrae un frame cada --interval segundos.")
+    p.add_argument("--interval", type=int, default=30, help="Segundos entre frames en modo fijo.")
+    p.add_argument("--min-spacing", type=float, default=2.0, help="Segundos mínimos entre frames.")
+    p.add_argument("--max-spacing", type=float, default=30.0, help="Segundos máximos entre frames.")
+    p.add_argument("--analysis-fps", type=float, default=2.0, help="Frames por segundo analizados.")
+    p.add_argument("--hud", type=str, default=None, help="Índice de iconos para reconocer objetos y hechizos.")
+    p.add_argument("--layout", type=str, default=None, help="JSON con las casillas del HUD.")
+    p.add_argument("--dedup", action="store_true", help="No guarda frames casi iguales a otros ya extraídos.")
+    p.add_argument("--dedup-distance", type=int, default=5, help="Distancia de Hamming máxima de un duplicado.")
+    p.add_argument("--dedup-minimap", action="store_true", help="Compara solo la región del minimapa.")
+    p.set_defaults(func=cmd_extract_frames)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
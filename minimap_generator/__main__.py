@@ -1,510 +1,63 @@
 #!/usr/bin/env python3
-from PIL import Image, ImageDraw, ImageFilter, ImageChops
-import random
-import json
 import os
-import shutil
-import uuid
-import yaml
-import numpy as np
+import argparse
+import multiprocessing
+from collections import deque
 from tqdm import tqdm
+from minimap import Minimap, render_from_log
+from batch_render import BatchRenderer
+from hard_mining import HardExampleSampler
+from run_manifest import RunManifest
+from resources import ImagePool, ResourceMonitor
+from workers import render_sample, render_batch, generate_chunk
 
-class Minimap:
-    """
-    Class to generate a minimap for training a computer vision model.
-    It includes methods to load icons, create a minimap with various game elements,
-    and save the minimap with YOLO format labels.
-    
-    Attributes:
-    ----------
-    minimap (Image): 
-        The base minimap image.
-    shadow_map (Image):
-        The shadow map image used for war zones.
-    position_json_map_file (str):
-        Path to the JSON file containing positions of items on the map.
-    icons_dir (str):
-        Directory containing icons for various game elements.
-    source_square (str):
-        Directory containing champion icons.
-    destination_square (str):
-        Directory where champion icons will be saved.
-    extract_s (bool):
-        If True, extracts champion icons from the source directory.
-    yolo_output (str):
-        Path to save YOLO format labels.
-    yolo_labels (list):
-        List to store YOLO labels.
-    character_dir (dict):
-        Dictionary mapping champion names to their IDs.
-    elements_in_map (list):
-        List of elements already placed on the minimap.
-    objects_in_image (list):
-        List of objects placed on the minimap with their properties.
-    position_item_dict (dict):
-        Dictionary mapping item names to their positions and sizes on the minimap.
-    """
-    def __init__(self,
-                 minimap='./utils/minimap.png',
-                 shadow_map="./utils/shadow_map.png",
-                 position_json_map_file="./utils/locations_item_map.json",
-                 icons_dir="./utils/icons",
-                 source_square="C:/Users/fxkik/Documents/LeagueIA/train/scrapping/data_train/characters",
-                 destination_square="./utils/character_items",
-                 extract_s=False,
-                 yolo_output="./utils/map_labels.txt"):
-        """
-        Initializes the Minimap class with the given parameters.
-
-        Parameters:
-        ----------
-        minimap (str): 
-            Path to the base minimap image.
-        shadow_map (str):
-            Path to the shadow map image used for war zones.
-        position_json_map_file (str):
-            Path to the JSON file containing positions of items on the map.
-        icons_dir (str):
-            Directory containing icons for various game elements.
-        source_square (str):
-            Directory containing champion icons.
-        destination_square (str):
-            Directory where champion icons will be saved.
-        extract_s (bool):
-            If True, extracts champion icons from the source directory.
-        yolo_output (str):
-            Path to save YOLO format labels.
-        """
-        
-        self.minimap = Image.open(minimap)
-        self.elements_in_map = []
-        self.shadow_map = Image.open(shadow_map)
-        self.position_json_map_file = position_json_map_file
-        self.icons_dir = icons_dir
-        self.source_dir = source_square
-        self.dest_dir = destination_square
-        self.yolo_output = yolo_output
-        self.yolo_labels = []
-        self.character_dir = {}
-        
-        
-        # if extract_s is True, it will extract the champion icons from the source directory.
-        if extract_s:
-            self.extract_squares()
-        
-        """
-        Initial flow, load the position_item_dict from the JSON file,
-        load the character directory, and create the items map.
-        """
-        self.load_character_dir()
-        self.load_pos_item_map()
-        self.create_items_map()
-        self.war_zones()
-        self.downgrade_resolution()
-        
-        
-
-    def war_zones(self, count=5):
-        """
-        Applies a shadow effect to random areas of the minimap to simulate war zones.
-        
-        Parameters:
-        ----------
-        count (int):
-            Number of war zones to apply.
-        """
-        W, H = self.minimap.size
-
-        fog_color = (0, 0, 0, 204)
-        fog = Image.new("RGBA", (W, H), fog_color)
-
-        visibility_mask = Image.new("L", (W, H), 0)
-        draw = ImageDraw.Draw(visibility_mask)
-
-        for item_map in self.objects_in_image:
-            cx = item_map["x"] + item_map["width"] // 2
-            cy = item_map["y"] + item_map["height"] // 2
-
-            vision_radius = int(max(item_map["width"], item_map["height"]) * 0.8)
-
-            draw.ellipse(
-                (cx - vision_radius, cy - vision_radius, cx + vision_radius, cy + vision_radius),
-                fill=255
-            )
-
-        visibility_mask = visibility_mask.filter(ImageFilter.GaussianBlur(radius=15))
-
-        inverted_mask = ImageChops.invert(visibility_mask)
-        
-        inverted_mask = inverted_mask.point(lambda p: int(p * 0.9))
-
-        fog.putalpha(inverted_mask)
-
-        self.minimap = Image.alpha_composite(self.minimap.convert("RGBA"), fog)
-
-
-
-    def load_pos_item_map(self):
-        """
-        Loads the position of items on the map from a JSON file.
-        """
-
-        with open(self.position_json_map_file, "r") as f:
-            self.position_item_dict = json.load(f)
-    
-    def insert_element(self,x,y,width,height,iconmap,name,resize=False):
-        """
-        Inserts an icon into the minimap at the specified position.
-
-        Parameters:
-        ----------
-        x (int):
-            X-coordinate where the icon will be placed.
-        y (int):
-            Y-coordinate where the icon will be placed.
-        width (int):
-            Width of the icon.
-        height (int):
-            Height of the icon.
-        iconmap (Image):
-            The icon image to be placed on the minimap.
-        name (str):
-            Name of the icon, used for labeling in YOLO format.
-        resize (bool):
-            If True, resizes the icon to fit the specified width and height.
-        """
-        if resize:
-            iconmap = iconmap.resize((width,height), Image.LANCZOS)
-        result = self.minimap.copy()
-        result.paste(iconmap,(x,y),iconmap)
-        self.minimap = result
-        if name:
-            if not hasattr(self, "objects_in_image"):
-                self.objects_in_image = []
-            self.objects_in_image.append({
-                "name": name,
-                "x": x,
-                "y": y,
-                "width": width,
-                "height": height
-            })
-    
-    def dicc_icon_to_image(self,kind,can_repeat=False):
-        """
-        Returns a random icon from the dictionary of icons based on the specified kind.
-
-        Parameters:
-        ----------
-        kind (str):
-            The category of icons to select from (e.g., "nex_", "tower_", "inhib_").
-        can_repeat (bool):
-            If True, allows the same icon to be selected multiple times; otherwise, it will not
-            select an icon that has already been placed on the minimap.
-        
-        Returns:
-        -------
-        Image:
-            The selected icon as a PIL Image.
-        """
-        if not hasattr(self,"dict_icons"):
-            self.dicc_icons = {
-                "nex_":{
-                    "nex_alive_blue": "./utils/icons/nexus/nexus_blue.png",
-                    "nex_alive_red": "./utils/icons/nexus/nexus_red.png",
-                    "nex_died": "./utils/icons/nexus/nexus_died.png"
-                },
-                "tower_": {
-                    "tower_died": "./utils/icons/towers/tower_died.png",
-                    "tower_died_low": "./utils/icons/towers/tower_died_low.png",
-                    "tower_died_medium": "./utils/icons/towers/tower_died_medium.png",
-                    "tower_blue_bounty": "./utils/icons/towers/tower_blue_bounty.png",
-                    "tower_blue_low_bounty": "./utils/icons/towers/tower_blue_low_bounty.png",
-                    "tower_blue_low_bounty_wiuouth": "./utils/icons/towers/tower_blue_low_bounty_wiouth.png",
-                    "tower_blue_medium_bounty": "./utils/icons/towers/tower_blue_medium_bounty.png",
-                    "tower_blue_medium_bounty_wiuouth": "./utils/icons/towers/tower_blue_medium_bounty_wiouth.png",
-                    "tower_red_bounty": "./utils/icons/towers/tower_red_bounty.png",
-                    "tower_red_bounty_wiouth": "./utils/icons/towers/tower_red_bounty_wiouth.png",
-                    "tower_red_low_bounty": "./utils/icons/towers/tower_red_low_bounty.png",
-                    "tower_red_low_bounty_wiouth": "./utils/icons/towers/tower_red_low_bounty_wiouth.png",
-                    "tower_red_medium_bounty": "./utils/icons/towers/tower_red_medium_bounty.png",
-                    "tower_red_medium_bounty_wiouth": "./utils/icons/towers/tower_red_medium_bounty_wiouth.png",
-                    "turret_1plate": "./utils/icons/towers/turret_1plate.png",
-                    "turret_2plate": "./utils/icons/towers/turret_2plate.png",
-                    "turret_3plate": "./utils/icons/towers/turret_3plate.png",
-                    "turret_4plate": "./utils/icons/towers/turret_4plate.png",
-                    "turret_5plate": "./utils/icons/towers/turret_5plate.png",
-                    "turret_red_1plate": "./utils/icons/towers/turret_red_1plate.png",
-                    "turret_red_2plate": "./utils/icons/towers/turret_red_2plate.png",
-                    "turret_red_3plate": "./utils/icons/towers/turret_red_3plate.png",
-                    "turret_red_4plate": "./utils/icons/towers/turret_red_4plate.png",
-                    "turret_red_5plate": "./utils/icons/towers/turret_red_5plate.png",
-                    "turret_blue_1plate": "./utils/icons/towers/turret_blue_1plate.png",
-                    "turret_blue_2plate": "./utils/icons/towers/turret_blue_2plate.png",
-                    "turret_blue_3plate": "./utils/icons/towers/turret_blue_3plate.png",
-                    "turret_blue_4plate": "./utils/icons/towers/turret_blue_4plate.png",
-                    "turret_blue_5plate": "./utils/icons/towers/turret_blue_5plate.png"
-                },
-                "inhib_":
-                    {
-                        "inhib_died":"./utils/icons/inhib/inhibitor_died.png",
-                        "inhib_blue":"./utils/icons/inhib/inhibitor_blue.png",
-                        "inhib_red":"./utils/icons/inhib/inhibitor_red.png"
-                    }
-            }
-        
-        if kind not in self.dicc_icons:
-            raise ValueError(f"Categoría '{kind}' no encontrada en dicc_icons")
-        
-        if not can_repeat:
-            available_icons = [k for k in self.dicc_icons[kind] if k not in self.elements_in_map]
-        else:
-            available_icons = list(self.dicc_icons[kind])
-        if not available_icons:
-            raise ValueError(f"No quedan iconos disponibles para '{kind}'")
-    
-        selected_icon = random.choice(available_icons)
-        self.elements_in_map.append(selected_icon)
-        
-        path = self.dicc_icons[kind][selected_icon]
-        return Image.open(path).convert("RGBA")
-    
-    def create_items_map(self):
-        """
-        Creates the minimap by placing various game elements such as nexus, towers, inhibitors, jungle items, and champions.
-        It randomly selects icons for each element and places them on the minimap at specified positions.
-        """
-
-        # Nexus
-        nexus = [nexo for nexo in self.position_item_dict if nexo["name"].startswith("nex_")]
-        for nexo in nexus:
-            random_nexo = self.dicc_icon_to_image("nex_")
-            self.insert_element(
-                x=nexo["x"],y=nexo["y"],
-                height=nexo["height"],width=nexo["width"],
-                iconmap=random_nexo,
-                resize=True,
-                name="nexo"
-        )
-        
-        # Towers
-        towers = [tower for tower in self.position_item_dict if tower["name"].startswith("tower_")]
-        
-        for tower in towers:
-            random_tower = self.dicc_icon_to_image("tower_")
-            self.insert_element(
-                x=tower["x"],y=tower["y"],
-                height=tower["height"],width=tower["width"],
-                iconmap=random_tower,
-                resize=True,
-                name="tower"
-            )
-        
-        # Inhibitors
-        inhibs = [inhib for inhib in self.position_item_dict if inhib["name"].startswith("inhib_")]
-        
-        for inhib in inhibs:
-            random_inhib = self.dicc_icon_to_image("inhib_",can_repeat=True)
-            self.insert_element(
-                x=inhib["x"],y=inhib["y"],
-                height=inhib["height"],width=inhib["width"],
-                iconmap=random_inhib,
-                resize=True,
-                name="inhibitor")
-    
-        # Jungle items
-        jungle_dir = './utils/icons/jungle'
-        jungle_items = [f for f in os.listdir(jungle_dir) if not f == "blue_red.png"] 
-        np.random.shuffle(jungle_items)
-        for jungle_place in self.position_item_dict:
-            if jungle_place["name"].startswith("jungle_"):
-                item = jungle_items.pop()
-                self.insert_element(
-                    x=jungle_place["x"],y=jungle_place["y"],
-                    height=jungle_place["height"],width=jungle_place["width"],
-                    name="jungle",
-                    iconmap=Image.open(os.path.join(jungle_dir,item)).convert("RGBA"),
-                    resize=True
-                    )
-            if jungle_place["name"].startswith("redblue_"):
-                self.insert_element(
-                    x=jungle_place["x"],y=jungle_place["y"],
-                    height=jungle_place["height"],width=jungle_place["width"],
-                    name="jungle",
-                    iconmap=Image.open(os.path.join(jungle_dir,"blue_red.png")).convert("RGBA"),
-                    resize=True
-                    )
-
-        # Characters
-        champ_names = list(self.character_dir.keys())
-        selected = random.sample(champ_names, min(15, len(champ_names)))
-        red_recall = Image.open("./utils/recall/red_recall.png").convert("RGBA")
-        blue_recall = Image.open("./utils/recall/blue_recall.png").convert("RGBA")
-        W, H = self.minimap.size
-
-        for champ in selected:
-            path = os.path.join(self.dest_dir, f"square_{champ}.png")
-            icon = Image.open(path).convert("RGBA")
-            icon = icon.resize((45, 45), Image.LANCZOS)
-            w, h = icon.size
 
-            mask = Image.new("L", (w, h), 0)
-            mdraw = ImageDraw.Draw(mask)
-            mdraw.ellipse((0, 0, w, h), fill=255)
-            icon.putalpha(mask)
-
-            x = random.randint(0, W - w)
-            y = random.randint(0, H - h)
-
-            self.insert_element(
-                x=x, y=y,
-                width=w, height=h,
-                iconmap=icon, resize=False,
-                name=champ
-            )
-
-            draw = ImageDraw.Draw(self.minimap)
-            cx, cy = x + w / 2, y + h / 2
-            r = w / 2
-            
-            style = random.choice(["red","blue","recall_red","recall_blue"])
-            
-            if style == 'red':
-                draw.ellipse((cx - r, cy - r, cx + r, cy + r), outline=(213, 32, 22), width=2)
-            elif style == 'blue':
-                draw.ellipse((cx - r, cy - r, cx + r, cy + r), outline=(10, 121, 186), width=2)
-            elif style == 'recall_red':
-                self.minimap.paste(red_recall.resize((w + 10, h + 10), Image.LANCZOS), (x - 5, y - 5), red_recall.resize((w + 10, h + 10), Image.LANCZOS))
-            elif style == 'recall_blue':
-                self.minimap.paste(blue_recall.resize((w + 10, h + 10), Image.LANCZOS), (x - 5, y - 5), blue_recall.resize((w + 10, h + 10), Image.LANCZOS))
-                    
-            
-        # Pings
-        ping_dir = "./utils/pings"
-        ping_files = [f for f in os.listdir(ping_dir) if f.lower().endswith(".png")]
-        selected_pings = random.sample(ping_files, k=20) 
-
-        for ping_file in selected_pings:
-            ping_icon = Image.open(os.path.join(ping_dir, ping_file)).convert("RGBA")
-            ping_icon = ping_icon.resize((30, 30), Image.LANCZOS)
-            w, h = ping_icon.size
-
-            x = random.randint(0, W - w)
-            y = random.randint(0, H - h)
-
-            self.insert_element(
-                x=x, y=y,
-                width=w, height=h,
-                iconmap=ping_icon,
-                resize=False,
-                name="ping"
-            )
-
-    
-    def load_character_dir(self):
-        """
-        Loads the character directory from the destination square directory.
-        It creates a dictionary mapping champion names to their IDs based on the filenames in the directory.
-        """
-        self.character_dir = {}
-        for fn in os.listdir(self.dest_dir):
-            if fn.startswith("square_") and fn.lower().endswith(".png"):
-                champ = fn.removeprefix("square_").removesuffix(".png")
-                self.character_dir[champ] = len(self.character_dir)
-
-
-    def extract_squares(self):
-        """
-        Extracts champion icons from the source directory and saves them to the destination directory.
-        It copies files that start with "square_" and do not contain "generic" in their names.
-        """
-        os.makedirs(self.dest_dir, exist_ok=True)
-        count = 0
-        for root, _, files in os.walk(self.source_dir):
-            for fn in files:
-                if fn.startswith("square_") and fn.lower().endswith(".png") and fn.lower().find("generic") == -1:
-                    self.character_dir[(fn.removeprefix("square_").removesuffix(".png"))] = self.character_dir.keys().__len__()
-                    src = os.path.join(root, fn)
-                    dst = os.path.join(self.dest_dir, fn)
-                    try:
-                        shutil.copy2(src, dst)
-                        count += 1
-                    except Exception as e:
-                        print(f"⚠️ Error copiando {src}: {e}")
-        print(f"✅ Copiados {count} archivos a '{self.dest_dir}'")
-    
-    def save_yolo_labels(self, output_folder, image=True,ignore_labels = ["nexus","inhibitor","nexo"]):
-        """
-        Saves the minimap image and its corresponding YOLO format labels to the specified output folder.
-        
-        Parameters:
-        ----------
-        output_folder (str):
-            The directory where the minimap image and labels will be saved.
-        image (bool):
-            If True, saves the minimap image; otherwise, only saves the labels.
-        ignore_labels (list):
-            List of labels to ignore when saving YOLO labels.
-        """
-        """ 
-        Careful with this, less than 16 can generate colision with 30k minimaps
-        Colision probability is 1/2^64, so it's very low.
-        """
-        image_id = str(uuid.uuid4())[:16]
-        width, height = self.minimap.size
-
-        if image:
-            img_path = os.path.join(output_folder, f"{image_id}.png")
-            self.minimap.save(img_path)
-
-        label_path = os.path.join(output_folder, f"{image_id}.txt")
-        with open(label_path, "w") as f:
-            for obj in self.objects_in_image:
-                name = obj["name"]
-                if any(name == ign or name.startswith(ign) for ign in ignore_labels):
-                    continue
-                if name in getattr(self, "character_dir", {}):
-                    cls = self.character_dir[name]
-                else:
-                    continue
-                x = obj["x"]; y = obj["y"]
-                w = obj["width"]; h = obj["height"]
-                x_center = (x + w / 2) / width
-                y_center = (y + h / 2) / height
-                w_norm = w / width
-                h_norm = h / height
-
-                f.write(f"{cls} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}\n")
-    
-    def downgrade_resolution(self, scale_factor=0.4):
-        """
-        Downgrades the resolution of the minimap by scaling it down and then back up.
-        This simulates a lower resolution while maintaining the overall structure of the minimap.
-        """
-
-        original_size = self.minimap.size
-        new_size = (int(original_size[0] * scale_factor), int(original_size[1] * scale_factor))
-        downgraded = self.minimap.resize(new_size, Image.BILINEAR)
-        self.minimap = downgraded.resize(original_size, Image.BILINEAR)
-
-    
-    def save_character_json(self):
-        """
-        Saves the character directory to a JSON file.
-        This file contains the mapping of champion names to their IDs.
-        """
-
-        if not self.character_dir:
-            raise RuntimeError("self.character_dir está vacío; asegúrate de haber llamado a load_character_dir() o extract_squares().")
-
-        with open("./characters.json", "w", encoding="utf-8") as f:
-            json.dump(self.character_dir, f, indent=2, ensure_ascii=False)
-
-
-
-if __name__ == "__main__":
+def main(num_maps=20000, seed=None, recipe_log="recipes.jsonl", sizes=None, feedback=None, manifest=None,
+         run_name="run", squares_dir="./utils/character_items", workers=1, max_rss_mb=None,
+         report_every=1000, use_pool=False, chunk_size=500, batch_size=None):
     """
     Main function to generate minimaps for training.
     It creates a specified number of minimaps, saves them in a directory, and prints the completion message.
+    The run is described by a manifest (train_images/<run_name>.json) with its seed, target and
+    options and the indices already generated: running it again resumes an interrupted run,
+    after checking the files of the completed samples.
+
+    Parameters:
+    ----------
+    num_maps (int):
+        Number of minimaps to generate.
+    seed (int, optional):
+        Seed of the run. With a seed, every sample can be regenerated from its index.
+        If None, a new run gets a random seed, stored in its manifest.
+    recipe_log (str):
+        Name of the JSON Lines file, inside the output folder, where the recipe of every sample is written.
+    sizes (list, optional):
+        If given, every minimap is rendered once and saved at each of these resolutions,
+        in one sub-folder per size.
+    feedback (str, optional):
+        Per-class metrics JSON of a validation run. If given, the champions, styles and
+        placements are biased toward the classes with low recall.
+    manifest (str, optional):
+        Asset manifest written by scrapping/normalize_assets.py, used to extract the champion squares.
+    run_name (str):
+        Name of the run manifest. A different name starts an independent run in the same folder.
+    squares_dir (str):
+        Folder of the champion squares; they are only extracted if it has none.
+    workers (int):
+        Number of generator processes. With more than one, or with max_rss_mb, every chunk of
+        chunk_size maps runs in a fresh process, so memory can't build up across the run.
+    max_rss_mb (float, optional):
+        RSS above which a worker stops and is replaced by a new process.
+    report_every (int):
+        Maps between two resource reports (RSS, open files, throughput), also appended to
+        train_images/<run_name>_resources.jsonl.
+    use_pool (bool):
+        If True, the canvas, fog and mask images are reused between maps.
+    chunk_size (int):
+        Maps per worker process.
+    batch_size (int, optional):
+        If given, the maps are rendered in batches of this size with a BatchRenderer: same recipes,
+        ids and labels, pixels within a few levels of Minimap's. A run can't switch renderers on resume.
     """
     
     print("\n🧠 Generación de minimapas para entrenamiento")
@@ -513,13 +66,125 @@ if __name__ == "__main__":
     output_folder = os.path.join(os.getcwd(), "train_images")
     os.makedirs(output_folder, exist_ok=True)
 
-    NUM_MAPS = 20000
+    config = {"sizes": sizes, "feedback": feedback, "manifest": manifest}
+    if batch_size:
+        # Only batched runs record it, so the manifests of earlier runs still resume
+        config["renderer"] = "batch"
+    run = RunManifest(os.path.join(output_folder, f"{run_name}.json"), seed=seed, target=num_maps,
+                      config=config)
+    log_path = os.path.join(output_folder, recipe_log)
+    if run.resumed:
+        broken = run.verify(output_folder)
+        run.compact_recipe_log(log_path)
+        print(f"🔁 Reanudando '{run_name}' (semilla {run.seed}): {len(run.completed)}/{run.target} completados"
+              + (f", {broken} incompletos se regeneran" if broken else ""))
+
+    pending = run.pending()
+    if not pending:
+        print(f"✅ La ejecución '{run_name}' ya está completa ({run.target} minimapas)")
+        return
+
+    sampler = HardExampleSampler.from_file(feedback) if feedback else None
+    if sampler:
+        print(f"🎯 Generación dirigida por las métricas de '{feedback}'")
+
+    # Champion squares are copied once, only if they are not there yet
+    extract = not (os.path.isdir(squares_dir)
+                   and any(fn.startswith("square_") for fn in os.listdir(squares_dir)))
+
+    resources_log = os.path.join(output_folder, f"{run_name}_resources.jsonl")
+    monitor = ResourceMonitor(report_every, max_rss_mb, resources_log, echo=tqdm.write)
+    pool = ImagePool() if use_pool else None
+
+    try:
+        with open(log_path, "a", encoding="utf-8") as log, \
+                tqdm(total=len(pending), desc="🗺️ Generando minimapas", ncols=100) as bar:
+
+            def done(i, line):
+                log.write(line)
+                log.flush()
+                run.mark_done(i)
+                bar.update(1)
+
+            # With a RSS limit a single worker is recycled too: clearing the caches of this
+            # process would only decode them again for every map without bounding the RSS
+            recycle = workers > 1 or max_rss_mb is not None
+            if batch_size and extract:
+                # The batch renderer only draws recipes: the squares are extracted before the first batch
+                Minimap(extract_s=True, manifest=manifest, destination_square=squares_dir, render=False).close()
+                extract = False
+            # The first map extracts the squares before any worker starts
+            extract_first = recycle and extract
+            if batch_size and not recycle:
+                renderer = BatchRenderer()
+                for s in range(0, len(pending), batch_size):
+                    batch = pending[s:s + batch_size]
+                    for i, line in render_batch(batch, run.seed, output_folder, renderer, sizes, sampler,
+                                                manifest, squares_dir):
+                        done(i, line)
+                    monitor.tick(len(batch))
+            else:
+                for i in pending if not recycle else pending[:int(extract_first)]:
+                    done(i, render_sample(i, run.seed, output_folder, sizes, sampler, manifest,
+                                          squares_dir, pool, extract=extract))
+                    extract = False
+                    monitor.tick()
+            remaining = pending[1:] if extract_first else pending
+
+            if recycle and remaining:
+                job = {"seed": run.seed, "output_folder": output_folder, "sizes": sizes, "sampler": sampler,
+                       "manifest": manifest, "squares_dir": squares_dir, "use_pool": use_pool,
+                       "max_rss_mb": max_rss_mb, "report_every": report_every, "log_path": resources_log,
+                       "batch_size": batch_size}
+                chunks = deque(remaining[s:s + chunk_size] for s in range(0, len(remaining), chunk_size))
+                recycled = 0
+                # One task per process: every chunk starts with a clean heap
+                with multiprocessing.Pool(workers, maxtasksperchild=1) as workers_pool:
+                    running = []
+                    while chunks or running:
+                        while chunks and len(running) < workers * 2:
+                            running.append(workers_pool.apply_async(generate_chunk, ({**job, "indices": chunks.popleft()},)))
+                        running[0].wait(0.2)
+                        for result in [r for r in running if r.ready()]:
+                            running.remove(result)
+                            generated, leftover = result.get()
+                            for i, line in generated:
+                                done(i, line)
+                            if leftover:
+                                chunks.appendleft(leftover)
+                                recycled += 1
+                if recycled:
+                    tqdm.write(f"♻️ {recycled} procesos reciclados por superar {max_rss_mb} MB")
+    finally:
+        run.save()
+
+    print("\n✅ Generación finalizada: {} minimapas guardados en '{}'".format(len(pending), output_folder))
 
-    for i in tqdm(range(NUM_MAPS), desc="🗺️ Generando minimapas", ncols=100):
-        minimap = Minimap(extract_s=i==0)
-        minimap.save_yolo_labels(output_folder, image=True) 
 
-    print("\n✅ Generación finalizada: {} minimapas guardados en '{}'".format(NUM_MAPS, output_folder)) 
-
-
-   
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de minimapas")
+    parser.add_argument("--maps", type=int, default=20000, help="Número de minimapas a generar.")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla de la ejecución.")
+    parser.add_argument("--rerender", type=str, default=None, help="Log de recetas a renderizar de nuevo.")
+    parser.add_argument("--indices", type=int, nargs="*", default=None, help="Índices a renderizar con --rerender.")
+    parser.add_argument("--output", type=str, default="rerendered", help="Carpeta de salida de --rerender.")
+    parser.add_argument("--scale-factor", type=float, default=0.4, help="Factor de degradación de la resolución.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None, help="Resoluciones de salida (p. ej. 640 800).")
+    parser.add_argument("--feedback", type=str, default=None, help="JSON de métricas por clase para generar casos difíciles.")
+    parser.add_argument("--manifest", type=str, default=None, help="Manifiesto de recursos normalizados del scraper.")
+    parser.add_argument("--run", type=str, default="run", help="Nombre de la ejecución (se reanuda si ya existe).")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos generadores.")
+    parser.add_argument("--max-rss", type=float, default=None, help="MB de RSS a partir de los que se recicla un proceso.")
+    parser.add_argument("--report-every", type=int, default=1000, help="Mapas entre informes de recursos.")
+    parser.add_argument("--pool", action="store_true", help="Reutiliza los buffers de imagen entre mapas.")
+    parser.add_argument("--batch", type=int, default=None, help="Mapas renderizados juntos con BatchRenderer.")
+    args = parser.parse_args()
+
+    if args.rerender:
+        count = render_from_log(args.rerender, args.output, indices=args.indices, sizes=args.sizes,
+                                scale_factor=args.scale_factor)
+        print(f"✅ {count} minimapas renderizados de nuevo en '{args.output}'")
+    else:
+        main(args.maps, seed=args.seed, sizes=args.sizes, feedback=args.feedback, manifest=args.manifest,
+             run_name=args.run, workers=args.workers, max_rss_mb=args.max_rss,
+             report_every=args.report_every, use_pool=args.pool, batch_size=args.batch)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from minimap import Minimap
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+STAGES = [
+    "load_character_dir",
+    "load_pos_item_map",
+    "create_items_map",
+    "war_zones",
+    "downgrade_resolution",
+    "save_yolo_labels",
+]
+
+
+def peak_rss_bytes():
+    """
+    Returns the peak resident set size of the current process in bytes.
+
+    Returns:
+    -------
+    int or None:
+        Peak RSS in bytes, or None if it can't be measured on this platform.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+class StageProfiler:
+    """
+    Context manager that wraps the Minimap pipeline stages and records, for every call,
+    the wall time and the number of memory blocks allocated by the stage.
+
+    Attributes:
+    ----------
+    stages (list):
+        Names of the Minimap methods to profile.
+    trace_allocations (bool):
+        If True, also records the peak traced bytes of each call with tracemalloc.
+        It adds a noticeable overhead, so timings are less accurate.
+    records (dict):
+        Dictionary mapping each stage to a list of (seconds, net_blocks, peak_bytes) tuples.
+    """
+
+    def __init__(self, stages=STAGES, trace_allocations=False):
+        """
+        Initializes the profiler.
+
+        Parameters:
+        ----------
+        stages (list):
+            Names of the Minimap methods to profile.
+        trace_allocations (bool):
+            If True, records the peak traced bytes of each call with tracemalloc.
+        """
+        self.stages = stages
+        self.trace_allocations = trace_allocations
+        self.records = {stage: [] for stage in stages}
+        self._originals = {}
+
+    def _wrap(self, stage, fn):
+        records = self.records[stage]
+        trace = self.trace_allocations
+
+        def timed(*args, **kwargs):
+            if trace:
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                net_blocks = sys.getallocatedblocks() - blocks
+                peak_bytes = tracemalloc.get_traced_memory()[1] - base if trace else None
+                records.append((elapsed, net_blocks, peak_bytes))
+
+        return timed
+
+    def __enter__(self):
+        for stage in self.stages:
+            self._originals[stage] = getattr(Minimap, stage)
+            setattr(Minimap, stage, self._wrap(stage, self._originals[stage]))
+        if self.trace_allocations:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        for stage, fn in self._originals.items():
+            setattr(Minimap, stage, fn)
+        self._originals = {}
+        if self.trace_allocations:
+            tracemalloc.stop()
+        return False
+
+    def reset(self):
+        """
+        Clears the recorded calls, used to discard the warmup maps.
+        """
+        for stage in self.stages:
+            self.records[stage].clear()
+
+    def summary(self):
+        """
+        Summarizes the recorded calls per stage.
+
+        Returns:
+        -------
+        dict:
+            Dictionary mapping each stage to its call count, total and percentile times
+            and mean allocated blocks.
+        """
+        result = {}
+        for stage, calls in self.records.items():
+            if not calls:
+                continue
+            times = np.array([c[0] for c in calls]) * 1000
+            blocks = np.array([c[1] for c in calls])
+            result[stage] = {
+                "calls": len(calls),
+                "total_s": round(float(times.sum()) / 1000, 6),
+                "mean_ms": round(float(times.mean()), 4),
+                "p50_ms": round(float(np.percentile(times, 50)), 4),
+                "p95_ms": round(float(np.percentile(times, 95)), 4),
+                "max_ms": round(float(times.max()), 4),
+                "net_blocks_mean": round(float(blocks.mean()), 1),
+            }
+            if self.trace_allocations:
+                result[stage]["peak_bytes_max"] = int(max(c[2] for c in calls))
+        return result
+
+
+def run_benchmark(num_maps=50, seed=0, warmup=2, trace_allocations=False, output_folder=None, **minimap_kwargs):
+    """
+    Generates num_maps minimaps with a fixed seed and profiles every stage of the pipeline.
+
+    Parameters:
+    ----------
+    num_maps (int):
+        Number of measured minimaps.
+    seed (int):
+        Run seed, so that every benchmark renders the same maps.
+    warmup (int):
+        Number of maps generated before measuring, to warm up caches and the allocator.
+    trace_allocations (bool):
+        If True, records the peak traced bytes of each stage with tracemalloc.
+    output_folder (str, optional):
+        Where to save the images and labels. If None, a temporary folder is used.
+    **minimap_kwargs:
+        Extra arguments passed to Minimap.
+
+    Returns:
+    -------
+    dict:
+        Machine-readable report with the per-stage timings, throughput and peak RSS.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        folder = output_folder or tmp_dir
+        os.makedirs(folder, exist_ok=True)
+        with StageProfiler(trace_allocations=trace_allocations) as profiler:
+            for i in range(warmup):
+                Minimap(seed=seed, index=num_maps + i, **minimap_kwargs).save_yolo_labels(folder, image=True)
+            profiler.reset()
+
+            start = time.perf_counter()
+            for i in range(num_maps):
+                Minimap(seed=seed, index=i, **minimap_kwargs).save_yolo_labels(folder, image=True)
+            total = time.perf_counter() - start
+
+    return {
+        "maps": num_maps,
+        "seed": seed,
+        "warmup": warmup,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "total_s": round(total, 4),
+        "images_per_s": round(num_maps / total, 3) if total else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": profiler.summary(),
+    }
+
+
+def compare_reports(current, baseline, tolerance=0.10):
+    """
+    Compares a benchmark report against a stored baseline.
+
+    Parameters:
+    ----------
+    current (dict):
+        Report returned by run_benchmark.
+    baseline (dict):
+        Previously stored report.
+    tolerance (float):
+        Allowed relative slowdown before a stage is flagged as a regression.
+
+    Returns:
+    -------
+    tuple:
+        A dictionary with the per-stage ratios (current / baseline) and the list of regressions.
+    """
+    ratios = {}
+    regressions = []
+    for stage, stats in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base or not base["mean_ms"]:
+            continue
+        ratio = stats["mean_ms"] / base["mean_ms"]
+        ratios[stage] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(stage)
+
+    if baseline.get("images_per_s") and current.get("images_per_s"):
+        ratio = baseline["images_per_s"] / current["images_per_s"]
+        ratios["images_per_s"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append("images_per_s")
+    return ratios, regressions
+
+
+def main():
+    """
+    Runs the benchmark from the command line, optionally comparing it against a baseline.
+    Exits with status 1 if any stage regressed more than the tolerance.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark del generador de minimapas")
+    parser.add_argument("--maps", type=int, default=50, help="Número de minimapas medidos.")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de generación.")
+    parser.add_argument("--warmup", type=int, default=2, help="Minimapas de calentamiento sin medir.")
+    parser.add_argument("--trace-allocations", action="store_true", help="Mide el pico de memoria por etapa con tracemalloc.")
+    parser.add_argument("--output", type=str, default=None, help="Ruta del JSON con el resultado.")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON de referencia con el que comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Ralentización relativa permitida.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.maps, seed=args.seed, warmup=args.warmup,
+                           trace_allocations=args.trace_allocations)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        ratios, regressions = compare_reports(report, baseline, args.tolerance)
+        report["comparison"] = {"baseline": args.baseline, "ratios": ratios, "regressions": regressions}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+    if report.get("comparison", {}).get("regressions"):
+        print(f"❌ Regresiones detectadas: {', '.join(report['comparison']['regressions'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
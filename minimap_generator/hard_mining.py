@@ -0,0 +1,101 @@
+import json
+import math
+
+
+class HardExampleSampler:
+    """
+    Biases the scene sampling of Minimap toward the classes and conditions the model
+    handles worst, from the per-class metrics of a validation run
+    (see TrainModelYOLO.export_class_metrics).
+
+    Metrics file format:
+        {
+          "classes": {"aatrox": {"recall": 0.41, "precision": 0.8, "ap50": 0.5}, ...},
+          "styles":  {"recall_red": 0.62, ...}          (optional)
+        }
+
+    Attributes:
+    ----------
+    champion_weights (dict):
+        Sampling weight of each champion, higher for lower recall.
+    default_weight (float):
+        Weight of the champions missing from the metrics.
+    style_weights (dict):
+        Sampling weight of each champion style (outline or recall effect).
+    overlap_probs (dict):
+        Probability of placing each champion over another champion, a hard condition
+        that is given to the weakest classes.
+    """
+
+    def __init__(self, metrics, metric="recall", power=2.0, floor=0.05, max_overlap=0.5):
+        """
+        Parameters:
+        ----------
+        metrics (dict):
+            Metrics as described in the class docstring.
+        metric (str):
+            Per-class metric used to measure how hard a class is.
+        power (float):
+            Exponent applied to (1 - metric); higher values focus more on the weakest classes.
+        floor (float):
+            Minimum weight, so that well learned classes are still generated.
+        max_overlap (float):
+            Overlap probability of the hardest class.
+        """
+        hardness = {name: 1.0 - float(values.get(metric, 0.0))
+                    for name, values in metrics.get("classes", {}).items()}
+        # Classes without validation instances are treated as the hardest ones
+        self.default_weight = 1.0
+        self.champion_weights = {name: max(floor, h ** power) for name, h in hardness.items()}
+        self.style_weights = {style: max(floor, (1.0 - float(recall)) ** power)
+                              for style, recall in metrics.get("styles", {}).items()}
+        top = max(hardness.values(), default=0.0)
+        self.overlap_probs = {name: max_overlap * h / top if top else 0.0 for name, h in hardness.items()}
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Loads the sampler from a metrics JSON file.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def sample_champions(self, rng, names, k):
+        """
+        Chooses k different champions, each with probability proportional to its weight
+        (weighted sampling without replacement, Efraimidis-Spirakis).
+
+        Parameters:
+        ----------
+        rng (random.Random):
+            Random generator of the minimap.
+        names (list):
+            Available champions.
+        k (int):
+            Number of champions to choose.
+
+        Returns:
+        -------
+        list:
+            The chosen champions.
+        """
+        keys = []
+        for name in names:
+            w = self.champion_weights.get(name, self.default_weight)
+            keys.append((math.log(1.0 - rng.random()) / w, name))
+        keys.sort(reverse=True)
+        return [name for _, name in keys[:k]]
+
+    def sample_style(self, rng, styles):
+        """
+        Chooses a champion style, uniformly if no style metrics were given.
+        """
+        if not self.style_weights:
+            return rng.choice(styles)
+        return rng.choices(styles, weights=[self.style_weights.get(s, 1.0) for s in styles])[0]
+
+    def overlap_prob(self, name):
+        """
+        Returns the probability of placing this champion over another one.
+        """
+        return self.overlap_probs.get(name, 0.0)
@@ -0,0 +1,143 @@
+from functools import lru_cache
+import json
+import os
+from PIL import Image, ImageDraw
+
+# Icon categories used by Minimap and the folder of utils/icons where they live.
+KIND_DIRS = {
+    "nex_": "nexus",
+    "tower_": "towers",
+    "inhib_": "inhib",
+    "jungle_": "jungle",
+}
+
+
+@lru_cache(maxsize=None)
+def icon_registry(icons_dir="./utils/icons"):
+    """
+    Discovers the icons of every category from the icons directory tree.
+    It is built once per directory and shared by every Minimap.
+
+    Parameters:
+    ----------
+    icons_dir (str):
+        Directory containing one sub-folder of PNG icons per category.
+
+    Returns:
+    -------
+    dict:
+        Dictionary mapping each category folder (e.g. "towers") to a dictionary of
+        icon names (file name without extension) and their paths.
+    """
+    registry = {}
+    for kind in sorted(os.listdir(icons_dir)):
+        kind_dir = os.path.join(icons_dir, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        registry[kind] = {
+            os.path.splitext(fn)[0]: os.path.join(kind_dir, fn)
+            for fn in sorted(os.listdir(kind_dir))
+            if fn.lower().endswith(".png")
+        }
+    return registry
+
+
+@lru_cache(maxsize=1024)
+def load_icon(path, size=None, circle=False):
+    """
+    Loads an icon as RGBA, optionally resized and cropped to a circle.
+    Decoded images are kept in an LRU cache keyed by (path, size, circle), so the same icon
+    is read from disk only once. The returned image is shared: copy it before modifying it.
+
+    Parameters:
+    ----------
+    path (str):
+        Path to the icon.
+    size (tuple, optional):
+        (width, height) to resize the icon to with LANCZOS. If None, the original size is kept.
+    circle (bool):
+        If True, everything outside the inscribed ellipse becomes transparent.
+
+    Returns:
+    -------
+    Image:
+        The icon as a PIL Image.
+    """
+    with Image.open(path) as img:
+        icon = img.convert("RGBA")
+    if size is not None:
+        icon = icon.resize(size, Image.LANCZOS)
+    if circle:
+        w, h = icon.size
+        mask = Image.new("L", (w, h), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, w, h), fill=255)
+        icon.putalpha(mask)
+    return icon
+
+
+@lru_cache(maxsize=16)
+def load_base(path):
+    """
+    Loads a full image (e.g. the base minimap) in its own mode, decoded once and with its file
+    closed. The returned image is shared: copy it before modifying it.
+    """
+    with Image.open(path) as img:
+        img.load()
+    return img
+
+
+@lru_cache(maxsize=None)
+def load_manifest(path):
+    """
+    Loads the asset manifest written by scrapping/normalize_assets.py once per path.
+
+    Parameters:
+    ----------
+    path (str):
+        Path to manifest.json.
+
+    Returns:
+    -------
+    dict:
+        Dictionary mapping each category (e.g. "champions") to its assets, each with the
+        absolute path of the normalized RGBA file and of every pre-scaled size ("45x45"...).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    return {
+        category: {
+            name: {"path": os.path.join(root, asset["path"]),
+                   "sizes": {k: os.path.join(root, v) for k, v in asset["sizes"].items()}}
+            for name, asset in assets.items()
+        }
+        for category, assets in manifest["assets"].items()
+    }
+
+
+def cache_stats():
+    """
+    Returns the hit and miss counters of the icon caches, to check that icons
+    are no longer decoded on every minimap.
+
+    Returns:
+    -------
+    dict:
+        Hits, misses and current size of the image cache and of the registry.
+    """
+    images = load_icon.cache_info()
+    registry = icon_registry.cache_info()
+    return {
+        "images": {"hits": images.hits, "misses": images.misses, "size": images.currsize},
+        "registry": {"hits": registry.hits, "misses": registry.misses, "size": registry.currsize},
+    }
+
+
+def clear_caches():
+    """
+    Empties the registry and image caches, e.g. after the icons on disk have changed.
+    """
+    icon_registry.cache_clear()
+    load_icon.cache_clear()
+    load_base.cache_clear()
+    load_manifest.cache_clear()
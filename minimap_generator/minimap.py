@@ -0,0 +1,756 @@
+from PIL import Image, ImageDraw, ImageFilter, ImageChops
+import random
+import json
+import os
+import shutil
+import uuid
+import hashlib
+import yaml
+import numpy as np
+from icons import KIND_DIRS, icon_registry, load_base, load_icon, load_manifest
+
+STYLES = ["red", "blue", "recall_red", "recall_blue"]
+
+
+def derive_seed(seed, index):
+    """
+    Derives the seed of a single sample from the run seed and the sample index,
+    so any sample can be regenerated on its own.
+
+    Parameters:
+    ----------
+    seed (int):
+        Seed of the whole generation run.
+    index (int):
+        Index of the sample inside the run.
+
+    Returns:
+    -------
+    int:
+        64-bit seed for the sample.
+    """
+    digest = hashlib.sha256(f"{seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class Minimap:
+    """
+    Class to generate a minimap for training a computer vision model.
+    It includes methods to load icons, create a minimap with various game elements,
+    and save the minimap with YOLO format labels.
+    
+    Attributes:
+    ----------
+    minimap (Image): 
+        The base minimap image.
+    shadow_map (Image):
+        The shadow map image, loaded only when accessed (war_zones draws its own fog).
+    position_json_map_file (str):
+        Path to the JSON file containing positions of items on the map.
+    icons_dir (str):
+        Directory containing icons for various game elements.
+    source_square (str):
+        Directory containing champion icons.
+    destination_square (str):
+        Directory where champion icons will be saved.
+    extract_s (bool):
+        If True, extracts champion icons from the source directory.
+    yolo_output (str):
+        Path to save YOLO format labels.
+    yolo_labels (list):
+        List to store YOLO labels.
+    character_dir (dict):
+        Dictionary mapping champion names to their IDs.
+    elements_in_map (list):
+        List of elements already placed on the minimap.
+    objects_in_image (list):
+        List of objects placed on the minimap with their properties.
+    position_item_dict (dict):
+        Dictionary mapping item names to their positions and sizes on the minimap.
+    dicc_icons (dict):
+        Icon registry shared by every minimap, mapping each icon category to its icons.
+    rng (random.Random):
+        Random generator of this minimap, every random choice is taken from it.
+    recipe (list):
+        Elements drawn on the minimap (icon, position, size and style), enough to render it again.
+    image_id (str):
+        Name of the saved image and labels. Derived from the seed when given, random otherwise.
+    """
+    def __init__(self,
+                 minimap='./utils/minimap.png',
+                 shadow_map="./utils/shadow_map.png",
+                 position_json_map_file="./utils/locations_item_map.json",
+                 icons_dir="./utils/icons",
+                 source_square="C:/Users/fxkik/Documents/LeagueIA/train/scrapping/data_train/characters",
+                 destination_square="./utils/character_items",
+                 extract_s=False,
+                 yolo_output="./utils/map_labels.txt",
+                 seed=None,
+                 index=0,
+                 recipe=None,
+                 scale_factor=0.4,
+                 sampler=None,
+                 manifest=None,
+                 pool=None,
+                 render=True):
+        """
+        Initializes the Minimap class with the given parameters.
+
+        Parameters:
+        ----------
+        minimap (str): 
+            Path to the base minimap image.
+        shadow_map (str):
+            Path to the shadow map image used for war zones.
+        position_json_map_file (str):
+            Path to the JSON file containing positions of items on the map.
+        icons_dir (str):
+            Directory containing icons for various game elements.
+        source_square (str):
+            Directory containing champion icons.
+        destination_square (str):
+            Directory where champion icons will be saved.
+        extract_s (bool):
+            If True, extracts champion icons from the source directory.
+        yolo_output (str):
+            Path to save YOLO format labels.
+        seed (int, optional):
+            Seed of the generation run. If None, the minimap is not reproducible.
+        index (int):
+            Index of the sample inside the run, combined with the seed.
+        recipe (list, optional):
+            Elements to draw instead of sampling a new scene, as stored by write_recipe().
+        scale_factor (float):
+            Scale factor used by downgrade_resolution().
+        sampler (HardExampleSampler, optional):
+            Biases the champions, styles and placements toward the hard cases.
+            If None, everything is sampled uniformly.
+        manifest (str, optional):
+            Asset manifest written by scrapping/normalize_assets.py. If given, the champion
+            squares are taken from it (already RGBA and at 45x45) instead of walking source_square.
+        pool (ImagePool, optional):
+            Pool the canvas, fog and mask images are taken from and given back to, so long
+            runs reuse the same buffers instead of allocating new ones for every map.
+        render (bool):
+            If False, only the recipe is sampled (for BatchRenderer); nothing is drawn.
+        """
+        
+        # The base image is decoded once per process; every minimap draws on its own copy
+        self.pool = pool
+        base = load_base(minimap)
+        if pool:
+            self.canvas = pool.get(base.mode, base.size)
+            self.canvas.paste(base, (0, 0))
+        else:
+            self.canvas = base.copy()
+        self.minimap = self.canvas
+        self.elements_in_map = []
+        self.shadow_map_path = shadow_map
+        self.position_json_map_file = position_json_map_file
+        self.icons_dir = icons_dir
+        self.source_dir = source_square
+        self.dest_dir = destination_square
+        self.yolo_output = yolo_output
+        self.yolo_labels = []
+        self.character_dir = {}
+        self.dicc_icons = icon_registry(icons_dir)
+        self.seed = seed
+        self.index = index
+        self.recipe = recipe
+        self.scale_factor = scale_factor
+        self.sampler = sampler
+        self.manifest = manifest
+        if seed is None:
+            self.rng = random.Random()
+            self.image_id = str(uuid.uuid4())[:16]
+        else:
+            sample_seed = derive_seed(seed, index)
+            self.rng = random.Random(sample_seed)
+            self.image_id = f"{sample_seed:016x}"
+        
+        
+        # if extract_s is True, it will extract the champion icons from the source directory.
+        if extract_s:
+            self.extract_squares()
+        
+        """
+        Initial flow, load the position_item_dict from the JSON file,
+        load the character directory, and create the items map.
+        """
+        self.load_character_dir()
+        self.load_pos_item_map()
+        if not render:
+            if self.recipe is None:
+                self.recipe = self.sample_scene()
+            return
+        self.create_items_map()
+        self.war_zones()
+        self.downgrade_resolution(self.scale_factor)
+        
+        
+
+    @property
+    def shadow_map(self):
+        return load_base(self.shadow_map_path)
+
+    def close(self):
+        """
+        Releases the images of the minimap (giving the canvas back to the pool, if any).
+        The minimap can't be saved after closing it.
+        """
+        if self.pool and self.canvas is not None:
+            self.pool.release(self.canvas)
+        self.canvas = None
+        self.minimap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def war_zones(self, count=5):
+        """
+        Applies a shadow effect to random areas of the minimap to simulate war zones.
+        
+        Parameters:
+        ----------
+        count (int):
+            Number of war zones to apply.
+        """
+        W, H = self.minimap.size
+
+        fog_color = (0, 0, 0, 204)
+        fog = self.pool.get("RGBA", (W, H), fog_color) if self.pool else Image.new("RGBA", (W, H), fog_color)
+
+        mask = self.pool.get("L", (W, H), 0) if self.pool else Image.new("L", (W, H), 0)
+        draw = ImageDraw.Draw(mask)
+
+        for item_map in self.objects_in_image:
+            cx = item_map["x"] + item_map["width"] // 2
+            cy = item_map["y"] + item_map["height"] // 2
+
+            vision_radius = int(max(item_map["width"], item_map["height"]) * 0.8)
+
+            draw.ellipse(
+                (cx - vision_radius, cy - vision_radius, cx + vision_radius, cy + vision_radius),
+                fill=255
+            )
+
+        visibility_mask = mask.filter(ImageFilter.GaussianBlur(radius=15))
+
+        inverted_mask = ImageChops.invert(visibility_mask)
+        
+        inverted_mask = inverted_mask.point(lambda p: int(p * 0.9))
+
+        fog.putalpha(inverted_mask)
+
+        self.minimap = Image.alpha_composite(self.minimap.convert("RGBA"), fog)
+        # From here on the minimap is a new image: the buffers can be reused by the next map
+        if self.pool:
+            self.pool.release(fog)
+            self.pool.release(mask)
+            if self.canvas is not None:
+                self.pool.release(self.canvas)
+        self.canvas = None
+
+
+
+    def load_pos_item_map(self):
+        """
+        Loads the position of items on the map from a JSON file.
+        """
+
+        with open(self.position_json_map_file, "r") as f:
+            self.position_item_dict = json.load(f)
+    
+    def insert_element(self,x,y,width,height,iconmap,name,resize=False):
+        """
+        Inserts an icon into the minimap at the specified position.
+
+        Parameters:
+        ----------
+        x (int):
+            X-coordinate where the icon will be placed.
+        y (int):
+            Y-coordinate where the icon will be placed.
+        width (int):
+            Width of the icon.
+        height (int):
+            Height of the icon.
+        iconmap (Image):
+            The icon image to be placed on the minimap.
+        name (str):
+            Name of the icon, used for labeling in YOLO format.
+        resize (bool):
+            If True, resizes the icon to fit the specified width and height.
+        """
+        if resize:
+            iconmap = iconmap.resize((width,height), Image.LANCZOS)
+        # The canvas belongs to this minimap: paste in place instead of copying it for every icon
+        self.minimap.paste(iconmap,(x,y),iconmap)
+        if name:
+            if not hasattr(self, "objects_in_image"):
+                self.objects_in_image = []
+            self.objects_in_image.append({
+                "name": name,
+                "x": x,
+                "y": y,
+                "width": width,
+                "height": height
+            })
+    
+    def choose_icon(self,kind,can_repeat=False):
+        """
+        Returns the path of a random icon from the dictionary of icons based on the specified kind.
+
+        Parameters:
+        ----------
+        kind (str):
+            The category of icons to select from (e.g., "nex_", "tower_", "inhib_").
+        can_repeat (bool):
+            If True, allows the same icon to be selected multiple times; otherwise, it will not
+            select an icon that has already been placed on the minimap.
+        
+        Returns:
+        -------
+        str:
+            Path to the selected icon.
+        """
+        icons = self.dicc_icons.get(KIND_DIRS.get(kind, kind))
+        if icons is None:
+            raise ValueError(f"Categoría '{kind}' no encontrada en dicc_icons")
+        
+        if not can_repeat:
+            available_icons = [k for k in icons if k not in self.elements_in_map]
+        else:
+            available_icons = list(icons)
+        if not available_icons:
+            raise ValueError(f"No quedan iconos disponibles para '{kind}'")
+    
+        selected_icon = self.rng.choice(available_icons)
+        self.elements_in_map.append(selected_icon)
+        
+        return icons[selected_icon]
+
+    def dicc_icon_to_image(self,kind,can_repeat=False):
+        """
+        Returns a random icon from the dictionary of icons based on the specified kind.
+
+        Parameters:
+        ----------
+        kind (str):
+            The category of icons to select from (e.g., "nex_", "tower_", "inhib_").
+        can_repeat (bool):
+            If True, allows the same icon to be selected multiple times.
+        
+        Returns:
+        -------
+        Image:
+            The selected icon as a PIL Image, shared with the icon cache.
+        """
+        return load_icon(self.choose_icon(kind, can_repeat))
+    
+    def create_items_map(self):
+        """
+        Creates the minimap by placing various game elements such as nexus, towers, inhibitors, jungle items, and champions.
+        If no recipe was given, a new scene is sampled first; then every element of the recipe is drawn in order.
+        """
+        if self.recipe is None:
+            self.recipe = self.sample_scene()
+        
+        for element in self.recipe:
+            self.render_element(element)
+    
+    def sample_scene(self):
+        """
+        Randomly selects icons, positions and styles for each element of the minimap.
+        Only self.rng is used, so the same seed and index always produce the same scene.
+
+        Returns:
+        -------
+        list:
+            Recipe of the scene, a list of dictionaries with the name, icon, position and size
+            of each element, plus the style for champions.
+        """
+        recipe = []
+
+        def element(place, name, icon):
+            return {"name": name, "icon": icon,
+                    "x": place["x"], "y": place["y"],
+                    "width": place["width"], "height": place["height"]}
+
+        # Nexus
+        nexus = [nexo for nexo in self.position_item_dict if nexo["name"].startswith("nex_")]
+        for nexo in nexus:
+            recipe.append(element(nexo, "nexo", self.choose_icon("nex_")))
+        
+        # Towers
+        towers = [tower for tower in self.position_item_dict if tower["name"].startswith("tower_")]
+        for tower in towers:
+            recipe.append(element(tower, "tower", self.choose_icon("tower_")))
+        
+        # Inhibitors
+        inhibs = [inhib for inhib in self.position_item_dict if inhib["name"].startswith("inhib_")]
+        for inhib in inhibs:
+            recipe.append(element(inhib, "inhibitor", self.choose_icon("inhib_", can_repeat=True)))
+    
+        # Jungle items
+        jungle_icons = self.dicc_icons["jungle"]
+        jungle_items = [k for k in jungle_icons if not k == "blue_red"]
+        self.rng.shuffle(jungle_items)
+        for jungle_place in self.position_item_dict:
+            if jungle_place["name"].startswith("jungle_"):
+                item = jungle_items.pop()
+                recipe.append(element(jungle_place, "jungle", jungle_icons[item]))
+            if jungle_place["name"].startswith("redblue_"):
+                recipe.append(element(jungle_place, "jungle", jungle_icons["blue_red"]))
+
+        # Characters
+        champ_names = list(self.character_dir.keys())
+        k = min(15, len(champ_names))
+        if self.sampler:
+            selected = self.sampler.sample_champions(self.rng, champ_names, k)
+        else:
+            selected = self.rng.sample(champ_names, k)
+        W, H = self.minimap.size
+        w, h = 45, 45
+        placed = []
+
+        for champ in selected:
+            if self.sampler and placed and self.rng.random() < self.sampler.overlap_prob(champ):
+                # Hard case: partially over another champion
+                ox, oy = self.rng.choice(placed)
+                x = min(max(ox + self.rng.randint(-w // 2, w // 2), 0), W - w)
+                y = min(max(oy + self.rng.randint(-h // 2, h // 2), 0), H - h)
+            else:
+                x = self.rng.randint(0, W - w)
+                y = self.rng.randint(0, H - h)
+            placed.append((x, y))
+            recipe.append({
+                "name": champ,
+                "icon": os.path.join(self.dest_dir, f"square_{champ}.png"),
+                "x": x, "y": y,
+                "width": w, "height": h,
+                "style": self.sampler.sample_style(self.rng, STYLES) if self.sampler else self.rng.choice(STYLES)
+            })
+            
+        # Pings
+        ping_dir = "./utils/pings"
+        ping_files = sorted(f for f in os.listdir(ping_dir) if f.lower().endswith(".png"))
+        selected_pings = self.rng.sample(ping_files, k=20) 
+        w, h = 30, 30
+
+        for ping_file in selected_pings:
+            x = self.rng.randint(0, W - w)
+            y = self.rng.randint(0, H - h)
+            recipe.append({
+                "name": "ping",
+                "icon": os.path.join(ping_dir, ping_file),
+                "x": x, "y": y,
+                "width": w, "height": h
+            })
+        
+        return recipe
+    
+    def render_element(self, element):
+        """
+        Draws one element of the recipe on the minimap.
+        Champions are cropped to a circle and get the outline or recall effect of their style.
+
+        Parameters:
+        ----------
+        element (dict):
+            Element of the recipe, as returned by sample_scene().
+        """
+        x, y = element["x"], element["y"]
+        w, h = element["width"], element["height"]
+        style = element.get("style")
+        icon = load_icon(element["icon"], (w, h), circle=style is not None)
+
+        self.insert_element(
+            x=x, y=y,
+            width=w, height=h,
+            iconmap=icon, resize=False,
+            name=element["name"]
+        )
+
+        if style is None:
+            return
+
+        draw = ImageDraw.Draw(self.minimap)
+        cx, cy = x + w / 2, y + h / 2
+        r = w / 2
+        
+        if style == 'red':
+            draw.ellipse((cx - r, cy - r, cx + r, cy + r), outline=(213, 32, 22), width=2)
+        elif style == 'blue':
+            draw.ellipse((cx - r, cy - r, cx + r, cy + r), outline=(10, 121, 186), width=2)
+        elif style in ('recall_red', 'recall_blue'):
+            recall = load_icon(f"./utils/recall/{style.removeprefix('recall_')}_recall.png", (w + 10, h + 10))
+            self.minimap.paste(recall, (x - 5, y - 5), recall)
+    
+    def recipe_record(self):
+        """
+        Returns the recipe of the minimap with the data needed to identify it.
+
+        Returns:
+        -------
+        dict:
+            Dictionary with the run seed, the sample index, the image id and the elements.
+        """
+        return {
+            "seed": self.seed,
+            "index": self.index,
+            "image_id": self.image_id,
+            "elements": self.recipe
+        }
+    
+    def write_recipe(self, log_file):
+        """
+        Appends the recipe of the minimap to a JSON Lines log, one compact line per sample.
+
+        Parameters:
+        ----------
+        log_file (str or file):
+            Path of the log or an already opened text file.
+        """
+        line = json.dumps(self.recipe_record(), separators=(",", ":")) + "\n"
+        if hasattr(log_file, "write"):
+            log_file.write(line)
+        else:
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(line)
+    
+    def load_character_dir(self):
+        """
+        Loads the character directory from the destination square directory.
+        It creates a dictionary mapping champion names to their IDs based on the filenames in the directory.
+        """
+        self.character_dir = {}
+        for fn in sorted(os.listdir(self.dest_dir)):
+            if fn.startswith("square_") and fn.lower().endswith(".png"):
+                champ = fn.removeprefix("square_").removesuffix(".png")
+                self.character_dir[champ] = len(self.character_dir)
+
+
+    def extract_squares(self):
+        """
+        Extracts champion icons from the source directory and saves them to the destination directory.
+        It copies files that start with "square_" and do not contain "generic" in their names.
+        With a manifest, the normalized 45x45 squares listed in it are copied instead.
+        """
+        os.makedirs(self.dest_dir, exist_ok=True)
+        count = 0
+        if self.manifest:
+            for champ, asset in sorted(load_manifest(self.manifest).get("champions", {}).items()):
+                self.character_dir[champ] = len(self.character_dir)
+                shutil.copy2(asset["sizes"].get("45x45", asset["path"]),
+                             os.path.join(self.dest_dir, f"square_{champ}.png"))
+                count += 1
+            print(f"✅ Copiados {count} archivos del manifiesto a '{self.dest_dir}'")
+            return
+        for root, _, files in os.walk(self.source_dir):
+            for fn in files:
+                if fn.startswith("square_") and fn.lower().endswith(".png") and fn.lower().find("generic") == -1:
+                    self.character_dir[(fn.removeprefix("square_").removesuffix(".png"))] = self.character_dir.keys().__len__()
+                    src = os.path.join(root, fn)
+                    dst = os.path.join(self.dest_dir, fn)
+                    try:
+                        shutil.copy2(src, dst)
+                        count += 1
+                    except Exception as e:
+                        print(f"⚠️ Error copiando {src}: {e}")
+        print(f"✅ Copiados {count} archivos a '{self.dest_dir}'")
+    
+    def build_yolo_labels(self, ignore_labels=["nexus","inhibitor","nexo"]):
+        """
+        Builds the YOLO format label lines of the champions placed on the minimap.
+        Coordinates are normalized by the minimap size, so the same lines are valid for
+        any resized copy of the image.
+        
+        Parameters:
+        ----------
+        ignore_labels (list):
+            List of labels to ignore when saving YOLO labels.
+        
+        Returns:
+        -------
+        list:
+            Lines "class x_center y_center width height", also stored in self.yolo_labels.
+        """
+        width, height = self.minimap.size
+        self.yolo_labels = []
+        for obj in self.objects_in_image:
+            name = obj["name"]
+            if any(name == ign or name.startswith(ign) for ign in ignore_labels):
+                continue
+            if name in getattr(self, "character_dir", {}):
+                cls = self.character_dir[name]
+            else:
+                continue
+            x = obj["x"]; y = obj["y"]
+            w = obj["width"]; h = obj["height"]
+            x_center = (x + w / 2) / width
+            y_center = (y + h / 2) / height
+            w_norm = w / width
+            h_norm = h / height
+
+            self.yolo_labels.append(f"{cls} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}\n")
+        return self.yolo_labels
+    
+    def save_yolo_labels(self, output_folder, image=True,ignore_labels = ["nexus","inhibitor","nexo"]):
+        """
+        Saves the minimap image and its corresponding YOLO format labels to the specified output folder.
+        
+        Parameters:
+        ----------
+        output_folder (str):
+            The directory where the minimap image and labels will be saved.
+        image (bool):
+            If True, saves the minimap image; otherwise, only saves the labels.
+        ignore_labels (list):
+            List of labels to ignore when saving YOLO labels.
+        """
+        """ 
+        Careful with this, less than 16 can generate colision with 30k minimaps
+        Colision probability is 1/2^64, so it's very low.
+        """
+        image_id = self.image_id
+
+        if image:
+            img_path = os.path.join(output_folder, f"{image_id}.png")
+            self.minimap.save(img_path)
+
+        label_path = os.path.join(output_folder, f"{image_id}.txt")
+        with open(label_path, "w") as f:
+            f.writelines(self.build_yolo_labels(ignore_labels))
+    
+    def save_resolutions(self, output_folder, sizes=(640, 800), image=True, ignore_labels=["nexus","inhibitor","nexo"]):
+        """
+        Saves the rendered minimap at several resolutions in a single pass, one sub-folder per size
+        (e.g. output_folder/640, output_folder/800). The scene, fog and degradation are computed once;
+        only the final resize is repeated. Labels are normalized, so they are built once and shared.
+        
+        Parameters:
+        ----------
+        output_folder (str):
+            The directory where the per-size folders will be created.
+        sizes (iterable):
+            Target sizes, either an int for square images or a (width, height) tuple.
+        image (bool):
+            If True, saves the minimap images; otherwise, only saves the labels.
+        ignore_labels (list):
+            List of labels to ignore when saving YOLO labels.
+        
+        Returns:
+        -------
+        list:
+            Paths of the per-size folders.
+        """
+        lines = self.build_yolo_labels(ignore_labels)
+        folders = []
+        for size in sizes:
+            target = (size, size) if isinstance(size, int) else tuple(size)
+            folder = os.path.join(output_folder, str(size) if isinstance(size, int) else f"{target[0]}x{target[1]}")
+            os.makedirs(folder, exist_ok=True)
+            folders.append(folder)
+
+            if image:
+                resized = self.minimap if target == self.minimap.size else self.minimap.resize(target, Image.LANCZOS)
+                resized.save(os.path.join(folder, f"{self.image_id}.png"))
+
+            with open(os.path.join(folder, f"{self.image_id}.txt"), "w") as f:
+                f.writelines(lines)
+        return folders
+    
+    def downgrade_resolution(self, scale_factor=0.4):
+        """
+        Downgrades the resolution of the minimap by scaling it down and then back up.
+        This simulates a lower resolution while maintaining the overall structure of the minimap.
+        """
+
+        original_size = self.minimap.size
+        new_size = (int(original_size[0] * scale_factor), int(original_size[1] * scale_factor))
+        downgraded = self.minimap.resize(new_size, Image.BILINEAR)
+        self.minimap = downgraded.resize(original_size, Image.BILINEAR)
+
+    
+    def save_character_json(self):
+        """
+        Saves the character directory to a JSON file.
+        This file contains the mapping of champion names to their IDs.
+        """
+
+        if not self.character_dir:
+            raise RuntimeError("self.character_dir está vacío; asegúrate de haber llamado a load_character_dir() o extract_squares().")
+
+        with open("./characters.json", "w", encoding="utf-8") as f:
+            json.dump(self.character_dir, f, indent=2, ensure_ascii=False)
+
+
+def load_recipes(log_path, indices=None):
+    """
+    Reads the recipes written by Minimap.write_recipe().
+
+    Parameters:
+    ----------
+    log_path (str):
+        Path of the JSON Lines recipe log.
+    indices (iterable, optional):
+        Sample indices to keep. If None, every recipe is returned.
+
+    Returns:
+    -------
+    list:
+        List of recipe records, in the order of the log.
+    """
+    wanted = set(indices) if indices is not None else None
+    records = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if wanted is None or record["index"] in wanted:
+                records.append(record)
+    return records
+
+
+def render_from_log(log_path, output_folder, indices=None, image=True, sizes=None, **minimap_kwargs):
+    """
+    Renders again a subset of samples from a recipe log without sampling the scenes again.
+    The extra arguments are passed to Minimap, so the samples can be rendered with another
+    degradation (scale_factor) or base image while keeping the same icons and positions.
+
+    Parameters:
+    ----------
+    log_path (str):
+        Path of the JSON Lines recipe log.
+    output_folder (str):
+        Directory where the minimaps and labels will be saved.
+    indices (iterable, optional):
+        Sample indices to render. If None, every sample of the log is rendered.
+    image (bool):
+        If True, saves the minimap image; otherwise, only saves the labels.
+    sizes (iterable, optional):
+        If given, every sample is saved at each of these resolutions with save_resolutions().
+    **minimap_kwargs:
+        Extra arguments passed to Minimap.
+
+    Returns:
+    -------
+    int:
+        Number of rendered samples.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    records = load_recipes(log_path, indices)
+    for record in records:
+        minimap = Minimap(seed=record["seed"], index=record["index"], recipe=record["elements"], **minimap_kwargs)
+        minimap.image_id = record["image_id"]
+        if sizes:
+            minimap.save_resolutions(output_folder, sizes, image=image)
+        else:
+            minimap.save_yolo_labels(output_folder, image=image)
+    return len(records)
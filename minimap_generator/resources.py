@@ -0,0 +1,172 @@
+import gc
+import json
+import os
+import sys
+import time
+from PIL import Image
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def rss_bytes():
+    """
+    Returns the current resident set size of the process in bytes (not the peak).
+
+    Returns:
+    -------
+    int or None:
+        RSS in bytes, or None if it can't be measured on this platform.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def open_files():
+    """
+    Returns the number of open file descriptors (handles on Windows) of the process, or None.
+    """
+    if os.path.isdir("/proc/self/fd"):
+        return len(os.listdir("/proc/self/fd"))
+    if psutil is not None:
+        process = psutil.Process()
+        return process.num_handles() if hasattr(process, "num_handles") else process.num_fds()
+    return None
+
+
+class ImagePool:
+    """
+    Reuses the full-size PIL images of the generator (canvas, fog and visibility mask) between
+    minimaps instead of allocating new ones for every map, keyed by mode and size.
+    Images taken with get() must be given back with release() once they are no longer referenced.
+    """
+
+    def __init__(self, max_per_key=4):
+        """
+        Parameters:
+        ----------
+        max_per_key (int):
+            Maximum free images kept for each (mode, size).
+        """
+        self.max_per_key = max_per_key
+        self.free = {}
+        self.allocated = 0
+        self.reused = 0
+
+    def get(self, mode, size, color=0):
+        """
+        Returns an image of the given mode and size filled with color.
+        """
+        images = self.free.get((mode, size))
+        if images:
+            image = images.pop()
+            image.paste(color, (0, 0, size[0], size[1]))
+            self.reused += 1
+            return image
+        self.allocated += 1
+        return Image.new(mode, size, color)
+
+    def release(self, image):
+        """
+        Gives an image back to the pool.
+        """
+        images = self.free.setdefault((image.mode, image.size), [])
+        if len(images) < self.max_per_key:
+            images.append(image)
+
+
+class ResourceMonitor:
+    """
+    Watchdog of a long generation run: every `every` maps it logs the RSS, the open files and
+    the throughput, and tells the caller when the RSS passed the threshold, so the process can
+    be recycled before memory keeps creeping up.
+
+    Attributes:
+    ----------
+    every (int):
+        Maps between two reports.
+    max_rss_mb (float):
+        RSS above which over_limit() is True. None disables the limit.
+    log_path (str):
+        JSON Lines file the reports are appended to. None only prints them.
+    maps (int):
+        Maps counted so far.
+    """
+
+    def __init__(self, every=1000, max_rss_mb=None, log_path=None, label="main", echo=print):
+        """
+        Parameters:
+        ----------
+        every (int):
+            Maps between two reports.
+        max_rss_mb (float, optional):
+            RSS threshold in MB.
+        log_path (str, optional):
+            JSON Lines file the reports are appended to.
+        label (str):
+            Name of the process in the reports (e.g. the worker pid).
+        echo (callable):
+            Function used to print the reports (tqdm.write inside progress bars).
+        """
+        self.every = every
+        self.max_rss_mb = max_rss_mb
+        self.log_path = log_path
+        self.label = label
+        self.echo = echo
+        self.maps = self.last_maps = 0
+        self.start = self.last_time = time.monotonic()
+        self.first_rss = rss_bytes()
+
+    def rss_mb(self):
+        rss = rss_bytes()
+        return None if rss is None else rss / 2 ** 20
+
+    def over_limit(self):
+        """
+        Returns True if the RSS of the process is above max_rss_mb.
+        """
+        rss = self.rss_mb()
+        return self.max_rss_mb is not None and rss is not None and rss > self.max_rss_mb
+
+    def tick(self, count=1):
+        """
+        Counts generated maps and reports every `every` of them.
+
+        Returns:
+        -------
+        dict or None:
+            The report, when one was made.
+        """
+        before = self.maps
+        self.maps += count
+        if self.maps // self.every == before // self.every:
+            return None
+        now = time.monotonic()
+        rss = self.rss_mb()
+        report = {
+            "process": self.label,
+            "maps": self.maps,
+            "rss_mb": rss,
+            "rss_growth_mb": None if rss is None or self.first_rss is None else rss - self.first_rss / 2 ** 20,
+            "open_files": open_files(),
+            "gc_objects": len(gc.get_objects()),
+            "maps_per_s": (self.maps - self.last_maps) / max(now - self.last_time, 1e-9),
+            "time": time.time(),
+        }
+        self.last_time, self.last_maps = now, self.maps
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        rss_text = "?" if rss is None else f"{rss:.0f} MB"
+        self.echo(f"📊 [{self.label}] {self.maps} mapas | RSS {rss_text} | "
+                  f"{report['open_files']} ficheros abiertos | {report['maps_per_s']:.1f} mapas/s")
+        return report
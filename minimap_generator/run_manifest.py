@@ -0,0 +1,205 @@
+import json
+import os
+import random
+import time
+from minimap import derive_seed
+
+RUN_VERSION = 1
+
+
+def to_ranges(indices):
+    """
+    Compresses sorted indices into [start, end) ranges, so the manifest stays small.
+    """
+    ranges = []
+    for i in sorted(indices):
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i, i + 1])
+    return ranges
+
+
+def from_ranges(ranges):
+    return {i for start, end in ranges for i in range(start, end)}
+
+
+def is_complete_png(path):
+    """
+    Returns True if the file exists and ends with the PNG IEND chunk, i.e. it was not cut
+    while being written.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(-12, os.SEEK_END)
+            return f.read()[4:8] == b"IEND"
+    except OSError:
+        return False
+
+
+class RunManifest:
+    """
+    Progress of a generation run, stored as JSON in its output folder. A run is defined by its
+    seed, target number of maps and output options; the manifest records which sample indices
+    are complete, so an interrupted run restarts exactly where it stopped. Completed indices are
+    written atomically in batches.
+
+    Attributes:
+    ----------
+    path (str):
+        Path of the manifest file.
+    seed (int):
+        Seed of the run. A random one is chosen and stored if none is given, so every run can be resumed.
+    target (int):
+        Number of maps of the run.
+    config (dict):
+        Output options of the run (sizes, feedback, asset manifest); they must not change on resume.
+    completed (set):
+        Indices of the finished samples.
+    """
+
+    def __init__(self, path, seed=None, target=0, config=None, flush_every=200):
+        """
+        Opens the manifest of a run, or creates it if it does not exist yet.
+
+        Parameters:
+        ----------
+        path (str):
+            Path of the manifest file.
+        seed (int, optional):
+            Seed of the run. When resuming, it must match the stored one (or be None).
+        target (int):
+            Number of maps of the run. A resumed run can be extended with a larger target.
+        config (dict, optional):
+            Output options of the run, compared with the stored ones when resuming.
+        flush_every (int):
+            Completed samples between two writes of the manifest.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.unsaved = 0
+        config = config or {}
+
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != RUN_VERSION:
+                raise ValueError(f"❌ Versión de manifiesto no soportada en '{path}'")
+            if seed is not None and seed != data["seed"]:
+                raise ValueError(f"❌ '{path}' es una ejecución con semilla {data['seed']}, no {seed}. "
+                                 "Usa otro nombre de ejecución para empezar una nueva.")
+            if data["config"] != config:
+                raise ValueError(f"❌ Las opciones de salida no coinciden con las de '{path}': {data['config']}")
+            self.seed = data["seed"]
+            self.target = max(target, data["target"])
+            self.config = data["config"]
+            self.created = data["created"]
+            self.completed = from_ranges(data["completed"])
+            self.resumed = True
+        else:
+            self.seed = seed if seed is not None else random.getrandbits(63)
+            self.target = target
+            self.config = config
+            self.created = time.time()
+            self.completed = set()
+            self.resumed = False
+            self.save()
+
+    def save(self):
+        """
+        Writes the manifest atomically (temporary file + rename).
+        """
+        data = {
+            "version": RUN_VERSION,
+            "seed": self.seed,
+            "target": self.target,
+            "config": self.config,
+            "created": self.created,
+            "updated": time.time(),
+            "completed": to_ranges(self.completed),
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+        self.unsaved = 0
+
+    def mark_done(self, index):
+        """
+        Records a finished sample; the manifest is written every flush_every samples.
+        """
+        self.completed.add(index)
+        self.unsaved += 1
+        if self.unsaved >= self.flush_every:
+            self.save()
+
+    def pending(self):
+        """
+        Returns the indices still to generate, in order.
+        """
+        return [i for i in range(self.target) if i not in self.completed]
+
+    def image_id(self, index):
+        """
+        Returns the name of the files of a sample (the same one Minimap uses for this seed).
+        """
+        return f"{derive_seed(self.seed, index):016x}"
+
+    def outputs(self, output_folder, index):
+        """
+        Returns the paths of the image and label files of a sample.
+        """
+        sizes = self.config.get("sizes")
+        folders = [output_folder] if not sizes else [
+            os.path.join(output_folder, str(s) if isinstance(s, int) else f"{s[0]}x{s[1]}") for s in sizes]
+        name = self.image_id(index)
+        return [os.path.join(folder, f"{name}{ext}") for folder in folders for ext in (".png", ".txt")]
+
+    def verify(self, output_folder):
+        """
+        Checks the files of the completed samples and marks again as pending the ones with a
+        missing label or a missing or truncated image.
+
+        Returns:
+        -------
+        int:
+            Number of samples that have to be generated again.
+        """
+        broken = set()
+        for index in self.completed:
+            for path in self.outputs(output_folder, index):
+                ok = is_complete_png(path) if path.endswith(".png") else os.path.isfile(path)
+                if not ok:
+                    broken.add(index)
+                    break
+        if broken:
+            self.completed -= broken
+            self.save()
+        return len(broken)
+
+    def compact_recipe_log(self, log_path):
+        """
+        Rewrites the recipe log keeping one record per completed index, dropping the records
+        of samples that were interrupted or generated twice.
+        """
+        if not os.path.isfile(log_path):
+            return
+        others, records = [], {}
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # last line cut by the interruption
+                line = line if line.endswith("\n") else line + "\n"
+                if record.get("seed") != self.seed:
+                    others.append(line)
+                elif record.get("index") in self.completed:
+                    records[record["index"]] = line
+        tmp = log_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(others)
+            f.writelines(records[i] for i in sorted(records))
+        os.replace(tmp, log_path)
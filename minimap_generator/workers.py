@@ -0,0 +1,96 @@
+import io
+import os
+from minimap import Minimap
+from batch_render import BatchRenderer, save_batch
+from resources import ImagePool, ResourceMonitor
+
+
+def render_sample(index, seed, output_folder, sizes=None, sampler=None, manifest=None,
+                  squares_dir="./utils/character_items", pool=None, extract=False):
+    """
+    Generates and saves one sample of a run and releases its images.
+
+    Returns:
+    -------
+    str:
+        Recipe line of the sample, to be appended to the run's recipe log.
+    """
+    with Minimap(extract_s=extract, seed=seed, index=index, sampler=sampler, manifest=manifest,
+                 destination_square=squares_dir, pool=pool) as minimap:
+        if sizes:
+            minimap.save_resolutions(output_folder, sizes, image=True)
+        else:
+            minimap.save_yolo_labels(output_folder, image=True)
+        line = io.StringIO()
+        minimap.write_recipe(line)
+    return line.getvalue()
+
+
+def render_batch(indices, seed, output_folder, renderer, sizes=None, sampler=None, manifest=None,
+                 squares_dir="./utils/character_items"):
+    """
+    Samples the scenes of several indices of a run and renders them together with a BatchRenderer.
+
+    Returns:
+    -------
+    list:
+        (index, recipe line) of every sample, in the order of indices.
+    """
+    scenes = []
+    for index in indices:
+        with Minimap(seed=seed, index=index, sampler=sampler, manifest=manifest,
+                     destination_square=squares_dir, render=False) as scene:
+            scenes.append(scene)
+    recipes = [scene.recipe for scene in scenes]
+    save_batch(renderer.render(recipes), renderer.targets(recipes, scenes[0].character_dir),
+               [scene.image_id for scene in scenes], output_folder, sizes)
+    lines = []
+    for index, scene in zip(indices, scenes):
+        line = io.StringIO()
+        scene.write_recipe(line)
+        lines.append((index, line.getvalue()))
+    return lines
+
+
+def generate_chunk(job):
+    """
+    Worker of a parallel run: generates a chunk of sample indices in a fresh process.
+    It stops early when its RSS passes the threshold, so the parent can hand the rest of
+    the chunk to a new process.
+
+    Parameters:
+    ----------
+    job (dict):
+        indices, seed, output_folder, the render_sample options (sizes, sampler, manifest,
+        squares_dir), use_pool, max_rss_mb, report_every, log_path and batch_size
+        (if given, the maps are rendered in batches of that size with a BatchRenderer).
+
+    Returns:
+    -------
+    tuple:
+        (list of (index, recipe line) generated, list of indices left to generate).
+    """
+    pool = ImagePool() if job["use_pool"] else None
+    monitor = ResourceMonitor(job["report_every"], job["max_rss_mb"], job["log_path"],
+                              label=f"worker {os.getpid()}")
+    indices = job["indices"]
+    done = []
+    batch_size = job.get("batch_size")
+    if batch_size:
+        renderer = BatchRenderer()
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            done.extend(render_batch(batch, job["seed"], job["output_folder"], renderer, job["sizes"],
+                                     job["sampler"], job["manifest"], job["squares_dir"]))
+            monitor.tick(len(batch))
+            if monitor.over_limit():
+                return done, indices[start + batch_size:]
+        return done, []
+    for n, index in enumerate(indices):
+        line = render_sample(index, job["seed"], job["output_folder"], job["sizes"], job["sampler"],
+                             job["manifest"], job["squares_dir"], pool)
+        done.append((index, line))
+        monitor.tick()
+        if monitor.over_limit():
+            return done, indices[n + 1:]
+    return done, []
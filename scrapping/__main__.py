@@ -1,10 +1,11 @@
 from champion_downloader import ChampionDownloader
-from others_downloader import OtherDownloader
+from others_downloader import download_all
 from downloader import download
+from normalize_assets import normalize_assets
 import os
 import argparse
 
-def main(parent_path):
+def main(parent_path, workers=8, rate=10.0, normalize=True):
     """
     Main function to initiate the downloading of various game assets.
     It sets up the necessary directories and calls the download methods for different asset types.
@@ -13,26 +14,20 @@ def main(parent_path):
     ----------
     parent_path (str):
         The directory where the downloaded assets will be saved.
+    workers (int):
+        Number of concurrent downloads for summoners, items, icons and pings.
+    rate (float):
+        Maximum number of requests per second to the CDN.
+    normalize (bool):
+        If True, normalizes the downloaded assets and writes the manifest the generator reads.
     """
     
     os.makedirs(parent_path,exist_ok=True)
     print("Iniciando descargas...")
-    print("\nSummoners\n")
+    print("\nSummoners, items, iconos y pings\n")
     
-    # Downloading summoners
-    OtherDownloader(f"{parent_path}/summoners").downloader()
-
-    print("\nItems\n")
-    # Downloading items
-    OtherDownloader(f"{parent_path}/items",kind="items").downloader()
-    
-    print("\nItems\n")
-    # Downloading minimap icons
-    OtherDownloader(f"{parent_path}/minimap/icons",kind="minimap_icons").downloader()
-
-    print("\nPings\n")
-    # Downloading minimap icons
-    OtherDownloader(f"{parent_path}/minimap/pings",kind="minimap_pings").downloader()
+    # Downloading summoners, items, minimap icons and pings in parallel
+    download_all(parent_path, workers=workers, rate=rate)
 
     # Downloading characters
     print("\nCampeones\n")
@@ -43,11 +38,19 @@ def main(parent_path):
     print("Descargando minimapa...")
     download("https://static.wikia.nocookie.net/leagueoflegends/images/0/04/Summoner%27s_Rift_Minimap.png/revision/latest?cb=20240527145536",f"{parent_path}/utils","minimap.png")
 
+    # Normalizing assets (RGBA, generator sizes, no duplicates) and writing the manifest
+    if normalize:
+        print("\nNormalizando recursos...")
+        normalize_assets(parent_path)
+
 if __name__ == "__main__":
     """
     Entry point for the script. It parses command line arguments and calls the main function.
     """
     parser = argparse.ArgumentParser(description="Scraper Lol")
     parser.add_argument("--path", type=str, default="./data_train", help="Ruta donde guardar los datos.")
+    parser.add_argument("--workers", type=int, default=8, help="Descargas simultáneas.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Peticiones por segundo como máximo.")
+    parser.add_argument("--no-normalize", action="store_true", help="No normaliza los recursos al terminar.")
     args = parser.parse_args()
-    main(args.path)
\ No newline at end of file
+    main(args.path, workers=args.workers, rate=args.rate, normalize=not args.no_normalize)
\ No newline at end of file
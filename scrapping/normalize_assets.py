@@ -0,0 +1,235 @@
+import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+MANIFEST_VERSION = 1
+
+# Sizes (width, height) the minimap generator draws each category at.
+TARGET_SIZES = {
+    "champions": [(45, 45)],
+    "pings": [(30, 30)],
+}
+
+# Hamming distance between dHashes under which two assets of a category are the same picture.
+PERCEPTUAL_THRESHOLD = 4
+
+# Categories whose names are classes: only byte-identical copies are dropped.
+NAMED_CATEGORIES = {"champions"}
+
+
+def collect_assets(parent_path):
+    """
+    Lists the scraped assets and their category.
+
+    Parameters:
+    ----------
+    parent_path (str):
+        Folder the scraper downloaded to.
+
+    Returns:
+    -------
+    list:
+        Sorted (category, name, path) tuples. Champion squares are named after the champion.
+    """
+    assets = []
+    folders = {"summoners": "summoners", "items": "items",
+               "minimap_icons": os.path.join("minimap", "icons"), "pings": os.path.join("minimap", "pings")}
+    for category, folder in folders.items():
+        folder = os.path.join(parent_path, folder)
+        if os.path.isdir(folder):
+            assets += [(category, os.path.splitext(fn)[0], os.path.join(folder, fn))
+                       for fn in os.listdir(folder) if fn.lower().endswith(".png")]
+
+    characters = os.path.join(parent_path, "characters")
+    if os.path.isdir(characters):
+        for root, _, files in os.walk(characters):
+            for fn in files:
+                if not fn.lower().endswith(".png"):
+                    continue
+                if fn.startswith("square_") and "generic" not in fn.lower():
+                    assets.append(("champions", fn.removeprefix("square_").removesuffix(".png"), os.path.join(root, fn)))
+                elif os.path.basename(root) == "abilitys":
+                    assets.append(("abilities", os.path.splitext(fn)[0], os.path.join(root, fn)))
+    return sorted(assets)
+
+
+def dhash(image, size=8):
+    """
+    Returns the 64-bit difference hash of an RGBA image (composited over black), which stays
+    the same when an icon is re-encoded or slightly resized.
+    """
+    background = Image.new("RGBA", image.size, (0, 0, 0, 255))
+    gray = Image.alpha_composite(background, image).convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = gray.tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            bits = (bits << 1) | (pixels[row * (size + 1) + col] > pixels[row * (size + 1) + col + 1])
+    return bits
+
+
+def normalize_asset(job):
+    """
+    Converts one asset to RGBA and writes it, plus one pre-scaled copy per target size.
+
+    Parameters:
+    ----------
+    job (tuple):
+        (category, name, source path, output folder, target sizes).
+
+    Returns:
+    -------
+    dict:
+        Manifest entry of the asset, or an entry with an "error" key if it could not be read.
+    """
+    category, name, src, out_dir, sizes = job
+    stat = os.stat(src)
+    entry = {"category": category, "name": name, "source": src,
+             "mtime": stat.st_mtime, "size_bytes": stat.st_size}
+    try:
+        with open(src, "rb") as f:
+            data = f.read()
+        entry["sha256"] = hashlib.sha256(data).hexdigest()
+        with Image.open(src) as img:
+            icon = img.convert("RGBA")
+    except Exception as e:
+        entry["error"] = str(e)
+        return entry
+
+    folder = os.path.join(out_dir, category)
+    os.makedirs(folder, exist_ok=True)
+    entry["path"] = os.path.join(category, f"{name}.png")
+    icon.save(os.path.join(out_dir, entry["path"]))
+    entry["width"], entry["height"] = icon.size
+    entry["dhash"] = f"{dhash(icon):016x}"
+    entry["sizes"] = {}
+    for w, h in sizes:
+        key = f"{w}x{h}"
+        os.makedirs(os.path.join(folder, key), exist_ok=True)
+        rel = os.path.join(category, key, f"{name}.png")
+        icon.resize((w, h), Image.LANCZOS).save(os.path.join(out_dir, rel))
+        entry["sizes"][key] = rel
+    return entry
+
+
+def deduplicate(entries, threshold=PERCEPTUAL_THRESHOLD):
+    """
+    Splits the entries into kept assets and duplicates: byte-identical files anywhere in a
+    category and, outside the named categories, pictures whose dHash differs in at most
+    threshold bits from an asset already kept. The first asset in name order is kept.
+
+    Returns:
+    -------
+    tuple:
+        (kept entries, duplicate records).
+    """
+    kept, duplicates = [], []
+    seen_hashes, seen_dhashes = {}, {}
+    for entry in entries:
+        category = entry["category"]
+        key = (category, entry["sha256"])
+        if key in seen_hashes:
+            duplicates.append({"source": entry["source"], "duplicate_of": seen_hashes[key], "kind": "exact"})
+            continue
+        match = None
+        value = int(entry["dhash"], 16)
+        # Nearly flat pictures (few gradients) all hash alike: only exact copies are dropped
+        if category not in NAMED_CATEGORIES and 8 <= bin(value).count("1") <= 56:
+            match = next((src for other, src in seen_dhashes.get(category, [])
+                          if bin(value ^ other).count("1") <= threshold), None)
+        if match:
+            duplicates.append({"source": entry["source"], "duplicate_of": match, "kind": "perceptual"})
+            continue
+        seen_hashes[key] = entry["source"]
+        seen_dhashes.setdefault(category, []).append((int(entry["dhash"], 16), entry["source"]))
+        kept.append(entry)
+    return kept, duplicates
+
+
+def normalize_assets(parent_path, out_dir=None, workers=None, threshold=PERCEPTUAL_THRESHOLD):
+    """
+    Normalizes every scraped asset in parallel and writes manifest.json in out_dir.
+    Assets whose source file did not change since the previous manifest are not processed again.
+
+    Parameters:
+    ----------
+    parent_path (str):
+        Folder the scraper downloaded to.
+    out_dir (str, optional):
+        Output folder. Defaults to parent_path/normalized.
+    workers (int, optional):
+        Number of worker processes. Defaults to the number of CPUs.
+    threshold (int):
+        Maximum dHash distance of perceptual duplicates.
+
+    Returns:
+    -------
+    dict:
+        The manifest.
+    """
+    out_dir = out_dir or os.path.join(parent_path, "normalized")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+
+    previous = {}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("version") == MANIFEST_VERSION:
+            previous = {e["source"]: e for e in old.get("entries", [])}
+
+    entries, jobs = [], []
+    for category, name, src in collect_assets(parent_path):
+        sizes = TARGET_SIZES.get(category, [])
+        old = previous.get(src)
+        stat = os.stat(src)
+        if (old and "error" not in old and old["mtime"] == stat.st_mtime and old["size_bytes"] == stat.st_size
+                and sorted(old["sizes"]) == sorted(f"{w}x{h}" for w, h in sizes)
+                and os.path.isfile(os.path.join(out_dir, old["path"]))):
+            entries.append(old)
+        else:
+            jobs.append((category, name, src, out_dir, sizes))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries += list(executor.map(normalize_asset, jobs, chunksize=16))
+    entries.sort(key=lambda e: (e["category"], e["name"], e["source"]))
+
+    errors = [e for e in entries if "error" in e]
+    kept, duplicates = deduplicate([e for e in entries if "error" not in e], threshold)
+
+    assets = {}
+    for entry in kept:
+        assets.setdefault(entry["category"], {})[entry["name"]] = {
+            "path": entry["path"], "sizes": entry["sizes"],
+            "width": entry["width"], "height": entry["height"],
+            "sha256": entry["sha256"], "dhash": entry["dhash"],
+        }
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "root": os.path.abspath(out_dir),
+        "assets": assets,
+        "duplicates": duplicates,
+        "errors": [{"source": e["source"], "error": e["error"]} for e in errors],
+        "entries": entries,
+    }
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, manifest_path)
+
+    print(f"🧼 {len(kept)} recursos normalizados ({len(jobs)} procesados, {len(entries) - len(jobs)} sin cambios), "
+          f"{len(duplicates)} duplicados descartados, {len(errors)} ilegibles → '{manifest_path}'")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normaliza los recursos descargados")
+    parser.add_argument("--path", type=str, default="./data_train", help="Ruta de los datos descargados.")
+    parser.add_argument("--output", type=str, default=None, help="Carpeta de salida (por defecto <path>/normalized).")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo.")
+    args = parser.parse_args()
+    normalize_assets(args.path, args.output, workers=args.workers)
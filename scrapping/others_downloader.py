@@ -1,19 +1,133 @@
 import random
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from fake_useragent import UserAgent
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 import os
 import requests
 
+KINDS = {
+    "summoners": "summoners",
+    "items": "items",
+    "minimap_icons": "minimap/icons",
+    "minimap_pings": "minimap/pings",
+}
+
+
+def chrome_driver(headless=True):
+    """
+    Starts a Chrome WebDriver. Selenium is imported here so that it is only loaded
+    when a listing is actually fetched with a browser.
+    
+    Parameters:
+    ----------
+    headless (bool):
+        If True, runs the browser in headless mode (no GUI).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    return webdriver.Chrome(options=options)
+
+
+@lru_cache(maxsize=None)
+def user_agent():
+    """
+    Returns the UserAgent generator, built once because loading its data is slow.
+    """
+    return UserAgent()
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces requests so that at most `rate` of them start per second.
+    It replaces the fixed sleeps between requests.
+    """
+
+    def __init__(self, rate=10.0):
+        """
+        Parameters:
+        ----------
+        rate (float):
+            Maximum number of requests per second. If 0 or None, there is no limit.
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Blocks until the next request is allowed.
+        """
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class BrowserSession:
+    """
+    Single Selenium browser shared by every downloader, started on first use.
+    Page loads are serialized because a WebDriver is not thread-safe.
+    """
+
+    def __init__(self, headless=True):
+        """
+        Parameters:
+        ----------
+        headless (bool):
+            If True, runs the browser in headless mode (no GUI).
+        """
+        self.headless = headless
+        self.driver = None
+        self.lock = threading.Lock()
+
+    def fetch(self, url):
+        """
+        Returns the HTML content of a given URL, starting the browser if needed.
+        """
+        with self.lock:
+            if self.driver is None:
+                self.driver = chrome_driver(self.headless)
+            self.driver.get(url)
+            return self.driver.page_source
+
+    def close(self):
+        """
+        Closes the browser if it was started.
+        """
+        with self.lock:
+            if self.driver is not None:
+                self.driver.quit()
+                self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
 class OtherDownloader:
     """
     Class to download various game assets like summoner spells, items, minimap icons, and pings.
     It supports both direct HTTP requests and Selenium for scraping.
     """
     
-    def __init__(self, parent_path,kind="summoners"):
+    def __init__(self, parent_path,kind="summoners",session=None,browser=None,rate_limiter=None,workers=8):
         """
         Initializes the downloader with the specified parent path and kind of assets to download.
         Parameters:
@@ -22,6 +136,14 @@ class OtherDownloader:
             The directory where the downloaded assets will be saved.
         kind (str):
             The type of assets to download. Options are "summoners", "items", "minimap_icons", or "minimap_pings".
+        session (requests.Session, optional):
+            HTTP session shared between downloaders. If None, a new one is created.
+        browser (BrowserSession, optional):
+            Browser shared between downloaders when USE_SELENIUM is True.
+        rate_limiter (RateLimiter, optional):
+            Limiter shared between downloaders. If None, requests are not limited.
+        workers (int):
+            Number of concurrent downloads.
         """
         
         self.kind = kind
@@ -37,6 +159,11 @@ class OtherDownloader:
         self.items_scrapped = []
         self.parent_path = parent_path
         self.len_summs = 0
+        self.session = session or requests.Session()
+        self.browser = browser
+        self.rate_limiter = rate_limiter or RateLimiter(None)
+        self.workers = workers
+        self.count_lock = threading.Lock()
         os.makedirs(parent_path,exist_ok=True)
         
     def get_headers(self):
@@ -49,9 +176,8 @@ class OtherDownloader:
         dict: 
             A dictionary containing headers for the HTTP request.
         """
-        ua = UserAgent()
         return {
-            "User-Agent": ua.random,
+            "User-Agent": user_agent().random,
             "Accept-Language": "en-US,en;q=0.9",
             "Connection": "keep-alive"
         }
@@ -83,31 +209,34 @@ class OtherDownloader:
         str: 
             The HTML content of the page.
         """
-        options = Options()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        driver = webdriver.Chrome(options=options)
+        if self.browser is not None:
+            return self.browser.fetch(url)
+        
+        driver = chrome_driver(headless)
         driver.get(url)
 
         html = driver.page_source
         driver.quit()
         return html
     
-    def scrapping(self):
+    def iter_links(self):
         """
-        Scrapes the specified kind of assets from the Community Dragon CDN.
+        Scrapes the specified kind of assets from the Community Dragon CDN and yields
+        every asset as soon as its row of the listing is parsed.
         It uses either direct HTTP requests or Selenium based on the USE_SELENIUM flag.
+        
+        Yields:
+        --------
+        tuple: 
+            (name, url) of each asset.
         """
+        self.rate_limiter.wait()
         if self.USE_SELENIUM:
             html = self.fetch_with_selenium(self.CDN_URL)
         else:
-            html = requests.get(self.CDN_URL, headers=self.get_headers(), proxies={"http": self.get_proxy(), "https": self.get_proxy()}).text
+            html = self.session.get(self.CDN_URL, headers=self.get_headers(), proxies={"http": self.get_proxy(), "https": self.get_proxy()}).text
 
         soup = BeautifulSoup(html, "html.parser")
-        time.sleep(3)
         
         table = soup.find("table", id="list")
         if not table:
@@ -136,7 +265,7 @@ class OtherDownloader:
                         url = self.CDN_URL.rstrip("/") + "/" + href.lstrip("/")
                     
                     print(f"Summoner EXTRA {name} scrapeado correctamente")
-                    self.items_scrapped.append((name, url))
+                    yield name, url
             else:
                 if not text.endswith("/"):
                     name = title  
@@ -146,31 +275,74 @@ class OtherDownloader:
                     else:
                         url = self.CDN_URL.rstrip("/") + "/" + href.lstrip("/")
                     print(f"Elemento {name} scrapeado correctamente")
-                    self.items_scrapped.append((name, url))
-                    
+                    yield name, url
+
+    def scrapping(self):
+        """
+        Scrapes the whole listing of the specified kind of assets into self.items_scrapped.
+        """
+        self.items_scrapped.extend(self.iter_links())
         self.len_summs = self.items_scrapped.__len__()
 
-    def downloader(self):
+    def download_item(self, name, url):
+        """
+        Downloads one asset to the parent path.
+        
+        Parameters:
+        --------
+        name (str): 
+            File name of the asset.
+        url (str):
+            URL of the asset.
+        """
+        self.rate_limiter.wait()
+        try:
+            resp = self.session.get(url, headers=self.get_headers())
+        except requests.RequestException as e:
+            # Un fallo de red solo pierde este elemento, no el resto de descargas del pool
+            print(f"Error descargando {name}: {e}")
+            return
+        with self.count_lock:
+            self.count += 1
+            count = self.count
+        if resp.status_code == 200:
+            with open(os.path.join(self.parent_path,name), "wb") as f:
+                f.write(resp.content)
+            print(f"Elemento {name} {count}/{self.len_summs or '?'}")
+        else:
+            print(f"Error descargando {name}: {resp.status_code}")
+
+    def downloader(self, executor=None):
         """
         Downloads the scraped assets to the specified parent path.
-        It iterates over the scraped items and saves them to files.
+        Links are sent to a pool of download threads while the listing is still being parsed,
+        so downloads start before the scraping finishes.
+        
+        Parameters:
+        --------
+        executor (ThreadPoolExecutor, optional):
+            Pool shared between downloaders. If None, a pool with self.workers threads is used.
         """
         
-        print(f"Scrapeando {self.kind}...")
-        self.scrapping()
-        print(f"Descargando {self.kind}...")
-        for name, url in self.items_scrapped:
-            resp = requests.get(url, headers=self.get_headers())
-            if resp.status_code == 200:
-                with open(os.path.join(self.parent_path,name), "wb") as f:
-                    f.write(resp.content)
-                print(f"Elemento {name} {self.count}/{self.len_summs}")
-            else:
-                print(f"Error descargando {name}: {resp.status_code}")
-            self.count += 1
+        print(f"Scrapeando y descargando {self.kind}...")
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = []
+            for name, url in self.iter_links():
+                self.items_scrapped.append((name, url))
+                futures.append(executor.submit(self.download_item, name, url))
+            self.len_summs = self.items_scrapped.__len__()
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
             
         if self.kind == "summoners":
-            smite_normal = requests .get("https://raw.communitydragon.org/latest/game/assets/characters/zoe/hud/icons2d/summoner_smite.png",stream=True)
+            self.rate_limiter.wait()
+            smite_normal = self.session.get("https://raw.communitydragon.org/latest/game/assets/characters/zoe/hud/icons2d/summoner_smite.png",stream=True)
             if smite_normal.status_code == 200:
                 with open(os.path.join(self.parent_path,"smite_summoner.png"), "wb") as f:
                     f.write(smite_normal.content)
@@ -179,3 +351,33 @@ class OtherDownloader:
         print(f"✅ {self.kind} descargados correctamente")
 
 
+def download_all(parent_path, workers=8, rate=10.0, use_selenium=False):
+    """
+    Downloads summoners, items, minimap icons and pings in parallel.
+    The four downloaders share one HTTP session, one browser, one rate limiter
+    and one pool of download threads.
+    
+    Parameters:
+    --------
+    parent_path (str): 
+        The directory where the downloaded assets will be saved.
+    workers (int):
+        Number of concurrent downloads shared by all the kinds.
+    rate (float):
+        Maximum number of requests per second to the CDN.
+    use_selenium (bool):
+        If True, the listings are fetched with the shared Selenium browser.
+    """
+    session = requests.Session()
+    limiter = RateLimiter(rate)
+    with BrowserSession() as browser, ThreadPoolExecutor(max_workers=workers) as executor:
+        downloaders = []
+        for kind, folder in KINDS.items():
+            downloader = OtherDownloader(os.path.join(parent_path, folder), kind=kind, session=session,
+                                         browser=browser, rate_limiter=limiter)
+            downloader.USE_SELENIUM = use_selenium
+            downloaders.append(downloader)
+
+        with ThreadPoolExecutor(max_workers=len(downloaders)) as listing:
+            for future in [listing.submit(d.downloader, executor) for d in downloaders]:
+                future.result()
@@ -0,0 +1,83 @@
+"""
+Cold-start budget of the lightweight CLI subcommands: they must not import the heavy
+dependencies (torch, ultralytics, cv2, selenium, mss) and must start in a few hundred ms.
+"""
+import os
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = {"torch", "ultralytics", "cv2", "selenium", "mss"}
+BUDGET_S = 0.5
+
+
+def write_png(path, width=4, height=4):
+    """
+    Writes a small gray PNG with the standard library only.
+    """
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\x80" * width for _ in range(height))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    for i in range(10):
+        write_png(images / f"m{i}.png")
+        (images / f"m{i}.txt").write_text(f"{i % 3} 0.5 0.5 0.1 0.1\n")
+    return tmp_path
+
+
+def commands(dataset):
+    return {
+        "help": ["--help"],
+        "split --help": ["split", "--help"],
+        "split": ["split", "--images", str(dataset / "images"), "--output", str(dataset / "prepared")],
+        "validate": ["validate", str(dataset / "images"), "--classes", "3"],
+    }
+
+
+def run(args, *flags):
+    return subprocess.run([sys.executable, *flags, ROOT, *args], cwd=ROOT, capture_output=True, text=True)
+
+
+def imported_modules(args):
+    """
+    Returns the top-level modules imported by a CLI run, from its -X importtime report.
+    """
+    result = run(args, "-X", "importtime")
+    assert result.returncode == 0, result.stdout + result.stderr
+    names = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            names.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return names
+
+
+@pytest.mark.parametrize("name", ["help", "split --help", "split", "validate"])
+def test_no_heavy_imports(dataset, name):
+    assert imported_modules(commands(dataset)[name]) & HEAVY_MODULES == set()
+
+
+@pytest.mark.parametrize("name", ["help", "split --help", "split", "validate"])
+def test_cold_start_budget(dataset, name):
+    args = commands(dataset)[name]
+    best = float("inf")
+    # The best of three runs, so a busy machine does not make the test flaky
+    for _ in range(3):
+        start = time.perf_counter()
+        result = run(args)
+        best = min(best, time.perf_counter() - start)
+        assert result.returncode == 0, result.stdout + result.stderr
+    assert best < BUDGET_S, f"'{name}' tardó {best * 1000:.0f} ms (máximo {BUDGET_S * 1000:.0f} ms)"
@@ -3,8 +3,8 @@ import random
 import shutil
 import yaml
 import subprocess
-from ultralytics import YOLO
 import json
+from dataset_index import DatasetIndex, print_report
 
 class TrainModelYOLO:
     def __init__(self,
@@ -68,6 +68,7 @@ class TrainModelYOLO:
             "test":  imgs[n_train + n_val:]
         }
 
+        missing_labels = 0
         for split, files in splits.items():
             for img in files:
                 label = os.path.splitext(img)[0] + ".txt"
@@ -90,8 +91,42 @@ class TrainModelYOLO:
                 else:
                     # Etiqueta ausente: crear vacío
                     open(dst_lbl, "w").close()
+                    missing_labels += 1
 
         print(f"📂 Dataset split: {n_train} train, {n_val} val, {n_test} test")
+        if missing_labels:
+            print(f"⚠️ {missing_labels} imágenes sin etiqueta: se han creado .txt vacíos")
+
+    def validate(self, num_classes: int = None, workers: int = None):
+        """
+        Validates the train, validation and test splits with a cached DatasetIndex and prints
+        the problems found (missing or empty labels, out-of-range boxes, unknown classes,
+        duplicated images) and the class imbalance.
+        Only files changed since the last validation are read again.
+        
+        Parameters:
+        ----------
+        num_classes (int, optional):
+            Number of classes, used to flag unknown class ids.
+        workers (int, optional):
+            Number of worker processes used to scan the changed files.
+        
+        Returns:
+        -------
+        dict:
+            Dictionary mapping each split to its report.
+        """
+        reports = {}
+        for split, images_dir, labels_dir in [("train", self.train_img, self.train_lbl),
+                                              ("val", self.val_img, self.val_lbl),
+                                              ("test", self.test_img, self.test_lbl)]:
+            if not os.path.isdir(images_dir):
+                continue
+            index = DatasetIndex(images_dir, labels_dir, num_classes=num_classes, workers=workers)
+            index.refresh()
+            reports[split] = index.report()
+            print_report(reports[split], split)
+        return reports
 
 
     def create_yaml(self,
@@ -125,6 +160,34 @@ class TrainModelYOLO:
             yaml.dump(data, f, default_flow_style=False)
         print(f"✅ YAML de entrenamiento creado en '{yaml_path}'")
 
+    def prepare_mmap(self, imgsz: int = 800, workers: int = 8):
+        """
+        Builds, for every split, a pre-decoded copy of the images at training resolution in a
+        single memory-mapped array (see build_mmap_dataset). Splits already built for the same
+        files and size are skipped.
+        
+        Parameters:
+        ----------
+        imgsz (int):
+            Image size for training.
+        workers (int):
+            Number of decoding threads.
+        """
+        # Import diferido: mmap_dataset carga OpenCV, que split o create_yaml no necesitan
+        from mmap_dataset import build_mmap_dataset, is_built, mmap_dir_for
+
+        for split, images_dir, labels_dir in [("train", self.train_img, self.train_lbl),
+                                              ("val", self.val_img, self.val_lbl),
+                                              ("test", self.test_img, self.test_lbl)]:
+            if not os.path.isdir(images_dir):
+                continue
+            out_dir = mmap_dir_for(images_dir, imgsz)
+            if is_built(out_dir, images_dir, imgsz, labels_dir):
+                print(f"✅ Dataset mmap de {split} ya preparado en '{out_dir}'")
+                continue
+            count = build_mmap_dataset(images_dir, labels_dir, out_dir, imgsz=imgsz, workers=workers)
+            print(f"💾 Dataset mmap de {split}: {count} imágenes en '{out_dir}'")
+
     def train(self,
               yaml_path: str,
               model: str = "yolo11s.pt",
@@ -132,7 +195,9 @@ class TrainModelYOLO:
               batch: int = 16,
               imgsz: int = 800,
               device: str = "cuda",
-              patience = 20):
+              patience = 20,
+              mmap: bool = False,
+              coreset: float = None):
         """
         Trains a YOLOv11 model using the specified configuration.
         Parameters:
@@ -151,7 +216,34 @@ class TrainModelYOLO:
             Device to use for training ('cpu' or 'cuda:0' for GPU).
         patience (int):
             Number of epochs with no improvement before early stopping.
+        mmap (bool):
+            If True, reads the images from pre-decoded memory-mapped arrays at imgsz
+            (built with prepare_mmap if needed) instead of decoding the PNGs every epoch.
+        coreset (float, optional):
+            If given, trains on a class-balanced and diverse subset of the train split of this
+            many images (or this fraction of the split if below 1) instead of the whole split,
+            for quick experiments (see build_coreset). val and test are not changed.
+        
+        Returns:
+        -------
+        str:
+            Path to the best weights of the run.
         """
+        if coreset:
+            from coreset import build_coreset
+            with open(yaml_path, "r", encoding="utf-8") as f:
+                nc = yaml.safe_load(f).get("nc")
+            yaml_path = build_coreset(self.train_img, yaml_path, coreset, labels_dir=self.train_lbl, num_classes=nc)
+
+        trainer = None
+        if mmap:
+            self.prepare_mmap(imgsz)
+            from mmap_trainer import MMapDetectionTrainer
+            trainer = MMapDetectionTrainer
+
+        # Import diferido: ultralytics (y torch) solo se carga al entrenar
+        from ultralytics import YOLO
+
         model = YOLO(model)
         
         print("🚀 Starting YOLOv11 training")
@@ -164,10 +256,130 @@ class TrainModelYOLO:
             name=self.name,     # Nombre del experimento
             project= self.project,   # Carpeta donde se guarda el experimento
             patience=patience,  # early stopping si no mejora
-            device=device       # Dispositivo a usar ('cpu' o 'cuda:0' para GPU, etc.)
+            device=device,      # Dispositivo a usar ('cpu' o 'cuda:0' para GPU, etc.)
+            trainer=trainer     # Trainer propio para leer del dataset mmap (None = por defecto)
         )
         
         print("✅ YOLOv11 training completed")
+        return str(model.trainer.best)
+
+    def distill(self,
+                teacher: str,
+                student: str = "yolo11n.pt",
+                extra_images: str = None,
+                conf: float = 0.25,
+                epochs: int = 200,
+                batch: int = 16,
+                imgsz: int = 800,
+                device: str = "cuda",
+                patience = 20):
+        """
+        Trains a small student model with the help of a larger trained teacher (e.g. BestLolNetModel2).
+        The student is trained on the ground truth of the train split plus the extra unlabeled
+        images labeled by the teacher, and then teacher and student are compared on the test split
+        (mAP with the ground truth and CPU latency).
+        
+        Parameters:
+        ----------
+        teacher (str):
+            Path to the teacher weights.
+        student (str):
+            Student model or architecture (e.g. "yolo11n.pt" or "yolo11n.yaml").
+        extra_images (str, optional):
+            Folder of unlabeled images the teacher labels and adds to the train split.
+        conf (float):
+            Minimum confidence of the teacher boxes.
+        epochs (int):
+            Number of training epochs of the student.
+        batch (int):
+            Batch size for training.
+        imgsz (int):
+            Image size for training.
+        device (str):
+            Device to use for labeling and training.
+        patience (int):
+            Number of epochs with no improvement before early stopping.
+        
+        Returns:
+        -------
+        list:
+            Accuracy/latency report of teacher and student (see tradeoff_report).
+        """
+        from distill import build_distill_dataset, tradeoff_report
+
+        distill_dir = os.path.join(self.output_dir, "distill")
+        yaml_path = build_distill_dataset(teacher, self.output_dir, distill_dir, extra_images=extra_images,
+                                          conf=conf, imgsz=imgsz, device=device)
+        name = self.name
+        self.name = f"{name}_student"
+        try:
+            student_weights = self.train(yaml_path, model=student, epochs=epochs, batch=batch,
+                                         imgsz=imgsz, device=device, patience=patience)
+        finally:
+            self.name = name
+        return tradeoff_report({"teacher": teacher, "student": student_weights}, self.output_dir,
+                               imgsz=imgsz, device="cpu",
+                               output_json=os.path.join(distill_dir, "tradeoff.json"))
+
+    def export_class_metrics(self,
+                             weights: str,
+                             yaml_path: str,
+                             output_json: str = "class_metrics.json",
+                             imgsz: int = 800,
+                             device: str = "cuda",
+                             recipes: list = None):
+        """
+        Validates a trained model and writes its per-class precision, recall and AP to a
+        JSON file. The minimap generator reads it (--feedback) to generate more examples
+        of the classes the model handles worst. With the recipe logs of the generation runs,
+        the recall of every champion style on the validation split is written too.
+        
+        Parameters:
+        ----------
+        weights (str):
+            Path to the trained weights (e.g. runs/detect/LeagueIAModel/weights/best.pt).
+        yaml_path (str):
+            Path to the YAML file containing dataset configuration.
+        output_json (str):
+            Path where the metrics will be saved.
+        imgsz (int):
+            Image size for validation.
+        device (str):
+            Device to use for validation.
+        recipes (list, optional):
+            recipes.jsonl files of the runs the dataset was generated with. If given, the
+            "styles" section (recall per champion style) is added.
+        
+        Returns:
+        -------
+        dict:
+            The metrics written.
+        """
+        from ultralytics import YOLO
+
+        metrics = YOLO(weights).val(data=yaml_path, imgsz=imgsz, device=device, plots=False)
+        box = metrics.box
+        classes = {}
+        for i, c in enumerate(box.ap_class_index):
+            classes[metrics.names[int(c)]] = {
+                "precision": float(box.p[i]),
+                "recall": float(box.r[i]),
+                "ap50": float(box.ap50[i]),
+                "ap": float(box.ap[i]),
+            }
+        data = {"source": weights, "classes": classes}
+        if recipes:
+            from evaluate import Evaluation, load_styles
+            evaluation = Evaluation(weights, self.val_img, self.val_lbl, metrics.names,
+                                    cache_dir=os.path.join(self.output_dir, ".eval_cache"),
+                                    imgsz=imgsz, device=device)
+            data["styles"] = evaluation.style_recall(load_styles(recipes))
+            print(f"🎨 Recall por estilo: " + ", ".join(f"{k} {v:.2f}" for k, v in data["styles"].items()))
+        os.makedirs(os.path.dirname(os.path.abspath(output_json)), exist_ok=True)
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"📊 Métricas por clase de {len(classes)} clases guardadas en '{output_json}'")
+        return data
 
 def load_class():
     """
@@ -196,6 +408,7 @@ def main():
     tm.shuffle()
     
     class_names, _= load_class() 
+    tm.validate(num_classes=len(class_names))
     tm.create_yaml("./prepared_data/data.yaml", names=class_names)
     
     tm.train("./prepared_data/data.yaml",model="yolo11n.pt")
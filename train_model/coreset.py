@@ -0,0 +1,285 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import yaml
+from dataset_index import DatasetIndex
+
+FEATURES_VERSION = 1
+
+
+def image_embedding(path, size=8):
+    """
+    Cheap embedding of an image: its size x size color thumbnail, mean-centered and
+    L2-normalized, so similar scenes (same zone, same fog) are close to each other.
+    The PNG is decoded at reduced resolution when the format allows it.
+
+    Returns:
+    -------
+    np.ndarray or None:
+        (size * size * 3,) float32 vector, or None if the image can't be read.
+    """
+    image = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_4)
+    if image is None:
+        return None
+    thumb = cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA).reshape(-1).astype(np.float32)
+    thumb -= thumb.mean()
+    return thumb / max(float(np.linalg.norm(thumb)), 1e-6)
+
+
+class CoresetSelector:
+    """
+    Picks a small, class-balanced and diverse subset of a train split for quick experiments
+    (architecture or hyperparameter checks) that should rank the model variants like the full set.
+
+    Every image is described by its class histogram (from the cached DatasetIndex) and a
+    thumbnail embedding (cached in coreset_features.npz next to the labels, only recomputed for
+    changed images). The selection runs in two passes of greedy k-center (farthest point first):
+    first, from the rarest class to the most common, every class gets images until it appears
+    in `per_class` of them; then the rest of the budget goes to the images farthest from
+    everything already chosen.
+
+    Attributes:
+    ----------
+    images_dir (str):
+        Directory containing the images of the split.
+    labels_dir (str):
+        Directory containing the YOLO labels of the split.
+    names (list):
+        Image file names, one per row of the features.
+    rows (dict):
+        Row of each image file name.
+    histograms (np.ndarray):
+        (N, C) float32 boxes of each class per image.
+    embeddings (np.ndarray):
+        (N, D) float32 image embeddings.
+    """
+
+    def __init__(self, images_dir, labels_dir=None, num_classes=None, workers=8, embed_size=8):
+        """
+        Parameters:
+        ----------
+        images_dir (str):
+            Directory containing the images of the split.
+        labels_dir (str, optional):
+            Directory containing the labels (see DatasetIndex).
+        num_classes (int, optional):
+            Number of classes. If None, it is taken from the labels.
+        workers (int):
+            Number of decoding threads for the embeddings.
+        embed_size (int):
+            Side of the thumbnails used as embeddings.
+        """
+        self.index = DatasetIndex(images_dir, labels_dir, num_classes=num_classes)
+        self.images_dir = images_dir
+        self.labels_dir = self.index.labels_dir
+        self.num_classes = num_classes
+        self.workers = workers
+        self.embed_size = embed_size
+        self.cache_path = os.path.join(self.labels_dir, "coreset_features.npz")
+        self.names = []
+        self.rows = {}
+        self.histograms = np.zeros((0, 0), np.float32)
+        self.embeddings = np.zeros((0, 0), np.float32)
+
+    def load_cache(self):
+        """
+        Returns the cached embeddings as {name: (stat, vector)}, or {} if the cache is stale.
+        """
+        if not os.path.isfile(self.cache_path):
+            return {}
+        with np.load(self.cache_path) as data:
+            if int(data["version"]) != FEATURES_VERSION or int(data["size"]) != self.embed_size:
+                return {}
+            return {str(name): (stat.tolist(), vector)
+                    for name, stat, vector in zip(data["names"], data["stats"], data["embeddings"])}
+
+    def refresh(self):
+        """
+        Updates the DatasetIndex and the embeddings of the new or changed images.
+
+        Returns:
+        -------
+        int:
+            Number of embeddings computed again.
+        """
+        self.index.refresh()
+        cache = self.load_cache()
+        names = sorted(name for name, entry in self.index.entries.items() if entry["width"])
+        stats = [self.index.entries[name]["image_stat"] for name in names]
+        pending = [i for i, (name, stat) in enumerate(zip(names, stats))
+                   if name not in cache or cache[name][0] != stat]
+
+        dim = self.embed_size * self.embed_size * 3
+        embeddings = np.zeros((len(names), dim), np.float32)
+        for i, name in enumerate(names):
+            if name in cache and cache[name][0] == stats[i]:
+                embeddings[i] = cache[name][1]
+        if pending:
+            with ThreadPoolExecutor(self.workers) as executor:
+                vectors = executor.map(lambda i: image_embedding(os.path.join(self.images_dir, names[i]),
+                                                                 self.embed_size), pending)
+                for i, vector in zip(pending, vectors):
+                    if vector is not None:
+                        embeddings[i] = vector
+            tmp_path = self.cache_path + ".tmp.npz"
+            np.savez(tmp_path, version=FEATURES_VERSION, size=self.embed_size, names=np.array(names),
+                     stats=np.array(stats, dtype=np.int64).reshape(-1, 2), embeddings=embeddings)
+            os.replace(tmp_path, self.cache_path)
+
+        classes = [{int(k): v for k, v in self.index.entries[name]["classes"].items()} for name in names]
+        num_classes = self.num_classes or 1 + max((max(c, default=-1) for c in classes), default=-1)
+        self.histograms = np.zeros((len(names), num_classes), np.float32)
+        for i, counts in enumerate(classes):
+            for cls, n in counts.items():
+                if 0 <= cls < num_classes:
+                    self.histograms[i, cls] = n
+        self.names, self.embeddings = names, embeddings
+        self.rows = {name: i for i, name in enumerate(names)}
+        return len(pending)
+
+    def features(self, class_weight=1.0):
+        """
+        Returns the (N, D + C) vectors the distances are measured on: the embedding and the
+        L2-normalized class histogram, weighted by class_weight.
+        """
+        hist = self.histograms / np.maximum(np.linalg.norm(self.histograms, axis=1, keepdims=True), 1e-6)
+        return np.hstack([self.embeddings, class_weight * hist]).astype(np.float32)
+
+    def select(self, size, per_class=None, class_weight=1.0, seed=0):
+        """
+        Selects the coreset.
+
+        Parameters:
+        ----------
+        size (int or float):
+            Number of images, or fraction of the split if below 1.
+        per_class (int, optional):
+            Images each class should appear in. Defaults to half the budget split evenly
+            between the classes present.
+        class_weight (float):
+            Weight of the class histogram against the embedding in the distances.
+        seed (int):
+            Seed of the first image picked.
+
+        Returns:
+        -------
+        list:
+            Names of the selected images, in selection order.
+        """
+        if not self.names:
+            self.refresh()
+        n = len(self.names)
+        size = min(n, int(round(size * n)) if size < 1 else int(size))
+        if size <= 0:
+            return []
+        features = self.features(class_weight)
+        sq_norms = (features ** 2).sum(axis=1)
+        min_dist = np.full(n, np.inf, np.float32)
+        chosen = np.zeros(n, bool)
+        order = []
+
+        def pick(i):
+            chosen[i] = True
+            order.append(i)
+            dist = sq_norms + sq_norms[i] - 2 * (features @ features[i])
+            np.minimum(min_dist, dist, out=min_dist)
+
+        pick(np.random.default_rng(seed).integers(n))
+
+        present = self.histograms > 0
+        counts = present.sum(axis=0)
+        classes = [c for c in np.argsort(counts, kind="stable") if counts[c]]
+        if per_class is None:
+            per_class = max(1, size // (2 * max(len(classes), 1)))
+        for cls in classes:
+            need = min(per_class, counts[cls]) - present[chosen, cls].sum()
+            candidates = np.flatnonzero(present[:, cls])
+            while need > 0 and len(order) < size:
+                free = candidates[~chosen[candidates]]
+                pick(free[min_dist[free].argmax()])
+                need -= 1
+
+        while len(order) < size:
+            pick(int(np.where(chosen, -np.inf, min_dist).argmax()))
+        return [self.names[i] for i in order]
+
+    def balance(self, names):
+        """
+        Returns the number of images each class appears in among the given ones.
+        """
+        rows = [self.rows[name] for name in names]
+        return (self.histograms[rows] > 0).sum(axis=0)
+
+
+def build_coreset(images_dir, yaml_path, size, labels_dir=None, per_class=None, class_weight=1.0,
+                  num_classes=None, seed=0):
+    """
+    Selects a coreset of a train split and writes the files to train on it: the list of its
+    images (coreset_<n>.txt, next to the images folder, so the mmap copy of the split is still
+    found) and a copy of the dataset YAML whose train entry points to that list.
+
+    Parameters:
+    ----------
+    images_dir (str):
+        Directory containing the train images.
+    yaml_path (str):
+        Dataset YAML of the full split.
+    size (int or float):
+        Number of images, or fraction of the split if below 1.
+    labels_dir (str, optional):
+        Directory containing the train labels.
+    per_class (int, optional):
+        Images each class should appear in (see CoresetSelector.select).
+    class_weight (float):
+        Weight of the class histogram against the embedding.
+    num_classes (int, optional):
+        Number of classes of the dataset.
+    seed (int):
+        Seed of the selection.
+
+    Returns:
+    -------
+    str:
+        Path to the YAML of the coreset.
+    """
+    selector = CoresetSelector(images_dir, labels_dir, num_classes=num_classes)
+    updated = selector.refresh()
+    names = selector.select(size, per_class=per_class, class_weight=class_weight, seed=seed)
+
+    split_dir = os.path.dirname(os.path.normpath(images_dir))
+    list_path = os.path.join(split_dir, f"coreset_{len(names)}.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for name in sorted(names):
+            f.write(os.path.join(os.path.abspath(images_dir), name) + "\n")
+
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    data["train"] = os.path.abspath(list_path)
+    coreset_yaml = os.path.join(os.path.dirname(yaml_path), f"data_coreset_{len(names)}.yaml")
+    with open(coreset_yaml, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, default_flow_style=False)
+
+    balance = selector.balance(names)
+    present = selector.histograms.any(axis=0)
+    print(f"🎯 Coreset de {len(names)}/{len(selector.names)} imágenes ({updated} embeddings nuevos), "
+          f"{int((balance > 0).sum())}/{int(present.sum())} clases, mínimo {int(balance[present].min()) if present.any() else 0} "
+          f"imágenes por clase, en '{coreset_yaml}'")
+    return coreset_yaml
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Selecciona un subconjunto equilibrado y diverso del split de train")
+    parser.add_argument("images", type=str, help="Carpeta de imágenes de train.")
+    parser.add_argument("--data", type=str, required=True, help="YAML del dataset completo.")
+    parser.add_argument("--size", type=float, default=0.1, help="Número de imágenes o fracción del split.")
+    parser.add_argument("--labels", type=str, default=None, help="Carpeta de etiquetas.")
+    parser.add_argument("--per-class", type=int, default=None, help="Imágenes mínimas por clase.")
+    parser.add_argument("--class-weight", type=float, default=1.0, help="Peso del histograma de clases.")
+    parser.add_argument("--classes", type=int, default=None, help="Número de clases.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    build_coreset(args.images, args.data, args.size, labels_dir=args.labels, per_class=args.per_class,
+                  class_weight=args.class_weight, num_classes=args.classes, seed=args.seed)
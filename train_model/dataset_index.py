@@ -0,0 +1,324 @@
+import os
+import json
+import struct
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def image_size(data):
+    """
+    Reads the size of a PNG or JPEG image from its header, without decoding it.
+
+    Parameters:
+    ----------
+    data (bytes):
+        Content of the image file.
+
+    Returns:
+    -------
+    tuple or None:
+        (width, height) of the image, or None if the format is not recognized.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def scan_sample(args):
+    """
+    Reads one image and its label file and returns its index entry.
+    It runs in the worker processes, so it only takes and returns plain data.
+
+    Parameters:
+    ----------
+    args (tuple):
+        (image_path, label_path, num_classes).
+
+    Returns:
+    -------
+    dict:
+        Image size, box count, class histogram, image hash and the problems found.
+    """
+    image_path, label_path, num_classes = args
+    entry = {"width": None, "height": None, "boxes": 0, "classes": {}, "hash": None, "problems": []}
+
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        entry["hash"] = hashlib.blake2b(data, digest_size=16).hexdigest()
+        size = image_size(data)
+        if size is None:
+            entry["problems"].append("unreadable_image")
+        else:
+            entry["width"], entry["height"] = size
+    except OSError:
+        entry["problems"].append("unreadable_image")
+
+    if not os.path.isfile(label_path):
+        entry["problems"].append("missing_label")
+        return entry
+
+    classes = Counter()
+    with open(label_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            try:
+                cls = int(parts[0])
+                xc, yc, w, h = map(float, parts[1:5])
+            except ValueError:
+                entry["problems"].append("malformed_line")
+                continue
+            if len(parts) != 5:
+                entry["problems"].append("malformed_line")
+            if cls < 0 or (num_classes is not None and cls >= num_classes):
+                entry["problems"].append("bad_class")
+            eps = 1e-6
+            if (w <= 0 or h <= 0
+                    or xc - w / 2 < -eps or xc + w / 2 > 1 + eps
+                    or yc - h / 2 < -eps or yc + h / 2 > 1 + eps):
+                entry["problems"].append("out_of_range")
+            classes[cls] += 1
+
+    entry["boxes"] = sum(classes.values())
+    entry["classes"] = {str(k): v for k, v in classes.items()}
+    if not entry["boxes"]:
+        entry["problems"].append("empty_label")
+    entry["problems"] = sorted(set(entry["problems"]))
+    return entry
+
+
+class DatasetIndex:
+    """
+    Cached index of a YOLO dataset folder, to validate it and get its statistics quickly.
+    The first scan reads every image and label in parallel; later refreshes only re-read
+    the files whose mtime or size changed, so checking an unchanged dataset is almost free.
+
+    Attributes:
+    ----------
+    images_dir (str):
+        Directory containing the images.
+    labels_dir (str):
+        Directory containing the YOLO labels.
+    cache_path (str):
+        Path of the JSON file where the index is stored.
+    num_classes (int or None):
+        Number of classes, used to flag out-of-range class ids.
+    entries (dict):
+        Dictionary mapping each image file name to its index entry.
+    """
+
+    def __init__(self, images_dir, labels_dir=None, cache_path=None, num_classes=None, workers=None):
+        """
+        Initializes the index and loads the cache if it exists.
+
+        Parameters:
+        ----------
+        images_dir (str):
+            Directory containing the images.
+        labels_dir (str, optional):
+            Directory containing the labels. If None, the sibling "labels" folder is used when
+            images_dir is called "images", otherwise the labels are expected next to the images.
+        cache_path (str, optional):
+            Path of the cache. Defaults to "index.json" next to the labels.
+        num_classes (int, optional):
+            Number of classes of the dataset.
+        workers (int, optional):
+            Number of worker processes. If None, it uses the number of CPUs.
+        """
+        self.images_dir = images_dir
+        if labels_dir is None:
+            parent, leaf = os.path.split(os.path.normpath(images_dir))
+            labels_dir = os.path.join(parent, "labels") if leaf == "images" else images_dir
+        self.labels_dir = labels_dir
+        self.cache_path = cache_path or os.path.join(labels_dir, "index.json")
+        self.num_classes = num_classes
+        self.workers = workers
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """
+        Loads the cached index, discarding it if it was built with another version or class count.
+        """
+        if not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("version") == INDEX_VERSION and cache.get("num_classes") == self.num_classes:
+            self.entries = cache["entries"]
+
+    def save(self):
+        """
+        Writes the index to the cache file atomically.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "num_classes": self.num_classes, "entries": self.entries},
+                      f, separators=(",", ":"))
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size]
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """
+        Updates the index with the files added, changed or removed since the last refresh
+        and saves it.
+
+        Returns:
+        -------
+        dict:
+            Number of images scanned again, reused from the cache and removed.
+        """
+        images = {}
+        with os.scandir(self.images_dir) as it:
+            for e in it:
+                if e.is_file() and e.name.lower().endswith(IMAGE_EXTENSIONS):
+                    st = e.stat()
+                    images[e.name] = [st.st_mtime_ns, st.st_size]
+
+        removed = [name for name in self.entries if name not in images]
+        for name in removed:
+            del self.entries[name]
+
+        pending = []
+        for name, image_stat in images.items():
+            label_path = os.path.join(self.labels_dir, os.path.splitext(name)[0] + ".txt")
+            label_stat = self._stat(label_path)
+            entry = self.entries.get(name)
+            if entry and entry["image_stat"] == image_stat and entry["label_stat"] == label_stat:
+                continue
+            pending.append((name, image_stat, label_stat, label_path))
+
+        if pending:
+            jobs = [(os.path.join(self.images_dir, name), label_path, self.num_classes)
+                    for name, _, _, label_path in pending]
+            if len(jobs) >= 64:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    results = list(executor.map(scan_sample, jobs, chunksize=64))
+            else:
+                results = [scan_sample(job) for job in jobs]
+            for (name, image_stat, label_stat, _), entry in zip(pending, results):
+                entry["image_stat"] = image_stat
+                entry["label_stat"] = label_stat
+                self.entries[name] = entry
+
+        if pending or removed:
+            self.save()
+        return {"scanned": len(pending), "cached": len(images) - len(pending), "removed": len(removed)}
+
+    def report(self, imbalance_ratio=10.0):
+        """
+        Summarizes the problems and statistics of the indexed dataset.
+
+        Parameters:
+        ----------
+        imbalance_ratio (float):
+            Classes with fewer boxes than the most frequent one divided by this ratio are reported.
+
+        Returns:
+        -------
+        dict:
+            Image and box counts, the files with each problem, duplicated images,
+            the class histogram and the under-represented or missing classes.
+        """
+        problems = {}
+        hashes = {}
+        histogram = Counter()
+        sizes = Counter()
+        boxes = 0
+        for name, entry in sorted(self.entries.items()):
+            for problem in entry["problems"]:
+                problems.setdefault(problem, []).append(name)
+            if entry["hash"]:
+                hashes.setdefault(entry["hash"], []).append(name)
+            histogram.update({int(k): v for k, v in entry["classes"].items()})
+            sizes[(entry["width"], entry["height"])] += 1
+            boxes += entry["boxes"]
+
+        duplicates = [names for names in hashes.values() if len(names) > 1]
+        if duplicates:
+            problems["duplicate_image"] = [name for names in duplicates for name in names[1:]]
+
+        top = max(histogram.values(), default=0)
+        classes = range(self.num_classes) if self.num_classes else sorted(histogram)
+        rare = sorted(c for c in classes if 0 < histogram[c] < top / imbalance_ratio)
+        missing = sorted(c for c in classes if histogram[c] == 0)
+
+        return {
+            "images": len(self.entries),
+            "boxes": boxes,
+            "image_sizes": {f"{w}x{h}": n for (w, h), n in sizes.items()},
+            "problems": problems,
+            "class_histogram": dict(sorted(histogram.items())),
+            "rare_classes": rare,
+            "missing_classes": missing,
+        }
+
+
+def print_report(report, name="dataset"):
+    """
+    Prints a short human-readable summary of a dataset report.
+
+    Parameters:
+    ----------
+    report (dict):
+        Report returned by DatasetIndex.report().
+    name (str):
+        Name shown in the summary.
+    """
+    print(f"📊 {name}: {report['images']} imágenes, {report['boxes']} cajas, tamaños {report['image_sizes']}")
+    for problem, files in sorted(report["problems"].items()):
+        print(f"  ⚠️ {problem}: {len(files)} (p. ej. {', '.join(files[:3])})")
+    if report["missing_classes"]:
+        print(f"  ⚠️ Clases sin ejemplos: {report['missing_classes']}")
+    if report["rare_classes"]:
+        print(f"  ⚠️ Clases poco representadas: {report['rare_classes']}")
+    if not report["problems"] and not report["missing_classes"]:
+        print("  ✅ Sin problemas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validación y estadísticas de un dataset YOLO")
+    parser.add_argument("images", type=str, help="Carpeta de imágenes.")
+    parser.add_argument("--labels", type=str, default=None, help="Carpeta de etiquetas.")
+    parser.add_argument("--classes", type=int, default=None, help="Número de clases.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo.")
+    parser.add_argument("--json", action="store_true", help="Imprime el informe completo en JSON.")
+    args = parser.parse_args()
+
+    index = DatasetIndex(args.images, args.labels, num_classes=args.classes, workers=args.workers)
+    stats = index.refresh()
+    report = index.report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"🔄 {stats['scanned']} escaneadas, {stats['cached']} en caché, {stats['removed']} eliminadas")
+        print_report(report, args.images)
@@ -0,0 +1,341 @@
+import os
+import json
+import argparse
+import numpy as np
+
+STORE_VERSION = 1
+
+# Fixed-width columns of a detection: game id, game time (s), class, confidence and the box
+# (x1, y1, x2, y2) normalized to the minimap frame.
+COLUMNS = {
+    "game": np.uint32,
+    "t": np.float32,
+    "cls": np.uint16,
+    "conf": np.float32,
+    "x1": np.float32,
+    "y1": np.float32,
+    "x2": np.float32,
+    "y2": np.float32,
+}
+
+
+class DetectionStore:
+    """
+    Append-only columnar store of detections for long VOD sets (tens of millions of rows).
+    Every column is a raw fixed-width binary file, written in chunks of chunk_rows rows; a small
+    index keeps, per chunk, the min/max game, time and class and a bitmap of the classes in it.
+    Queries only memory-map and read the chunks the index can't rule out.
+
+    Files in the store folder:
+        <column>.bin  raw little-endian values of one column
+        index.npy     per-chunk structured array (start, rows, min/max of game, t and cls, class bitmap)
+        meta.json     version, chunk_rows, num_classes and the number of committed rows
+
+    index.npy and meta.json are replaced atomically after every chunk (meta.json last), so rows
+    past its count (a chunk cut by a crash) are dropped when the store is opened again.
+
+    Attributes:
+    ----------
+    path (str):
+        Folder of the store.
+    chunk_rows (int):
+        Rows per chunk.
+    num_classes (int):
+        Class ids allowed, for the class bitmap of the index.
+    rows (int):
+        Committed rows (without the ones still buffered).
+    """
+
+    def __init__(self, path, chunk_rows=65536, num_classes=None):
+        """
+        Opens a store, or creates it if the folder has none.
+
+        Parameters:
+        ----------
+        path (str):
+            Folder of the store.
+        chunk_rows (int):
+            Rows per chunk of a new store (an existing one keeps its own).
+        num_classes (int, optional):
+            Number of classes of a new store (256 if None). An existing store created with a
+            different number raises ValueError.
+        """
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self.index_path = os.path.join(path, "index.npy")
+        self.buffer = {name: [] for name in COLUMNS}
+        self.buffered = 0
+        self._maps = None
+
+        if os.path.isfile(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != STORE_VERSION:
+                raise ValueError(f"❌ Versión de almacén no soportada en '{path}'")
+            if num_classes is not None and num_classes != meta["num_classes"]:
+                raise ValueError(f"❌ El almacén '{path}' se creó para {meta['num_classes']} clases, "
+                                 f"no {num_classes}: usa otra carpeta")
+            self.chunk_rows = meta["chunk_rows"]
+            self.num_classes = meta["num_classes"]
+            self.rows = meta["rows"]
+            self.index = np.load(self.index_path)[:meta["chunks"]]
+            # Drop the rows of a chunk that was being written when the process stopped
+            for name, dtype in COLUMNS.items():
+                column = self.column_path(name)
+                if os.path.getsize(column) > self.rows * np.dtype(dtype).itemsize:
+                    os.truncate(column, self.rows * np.dtype(dtype).itemsize)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.chunk_rows = chunk_rows
+            self.num_classes = num_classes or 256
+            self.rows = 0
+            self.index = np.zeros(0, dtype=self.index_dtype())
+            for name in COLUMNS:
+                open(self.column_path(name), "wb").close()
+            self.save_meta()
+
+    def index_dtype(self):
+        words = (self.num_classes + 63) // 64
+        return np.dtype([("start", np.int64), ("rows", np.int64),
+                         ("game_min", np.uint32), ("game_max", np.uint32),
+                         ("t_min", np.float32), ("t_max", np.float32),
+                         ("cls_min", np.uint16), ("cls_max", np.uint16),
+                         ("classes", np.uint64, (words,))])
+
+    def column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def save_meta(self):
+        """
+        Writes the index and the metadata (each one atomically, the metadata last).
+        """
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, self.index)
+        os.replace(tmp, self.index_path)
+        meta = {"version": STORE_VERSION, "chunk_rows": self.chunk_rows, "num_classes": self.num_classes,
+                "rows": self.rows, "chunks": len(self.index), "columns": {k: np.dtype(v).str for k, v in COLUMNS.items()}}
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def append(self, game, t, cls, conf, x1, y1, x2, y2):
+        """
+        Buffers detections given as arrays (or scalars broadcast to the detections) and writes
+        every full chunk.
+
+        Parameters:
+        ----------
+        game (int or array-like):
+            Game id of each detection.
+        t (float or array-like):
+            Game time in seconds.
+        cls (array-like):
+            Class ids.
+        conf (array-like):
+            Confidences.
+        x1, y1, x2, y2 (array-like):
+            Box corners normalized to the minimap (0-1).
+        """
+        cls = np.asarray(cls).ravel()
+        if not cls.size:
+            return
+        if cls.max() >= self.num_classes:
+            raise ValueError(f"❌ Clase {int(cls.max())} fuera del rango del almacén ({self.num_classes} clases)")
+        values = {"game": game, "t": t, "cls": cls, "conf": conf, "x1": x1, "y1": y1, "x2": x2, "y2": y2}
+        for name, dtype in COLUMNS.items():
+            self.buffer[name].append(np.broadcast_to(np.asarray(values[name], dtype=dtype).ravel(), cls.shape))
+        self.buffered += cls.size
+        if self.buffered >= self.chunk_rows:
+            self.flush(full_only=True)
+
+    def add_detections(self, detections, frame_shape, t, game=0):
+        """
+        Adds the detections of one frame, as returned by the realtime loop or the inference
+        service: an (n, 6) array or list of (x1, y1, x2, y2, conf, cls) in pixels.
+
+        Parameters:
+        ----------
+        detections (array-like):
+            Detections of the frame.
+        frame_shape (tuple):
+            (height, width) of the minimap frame the boxes refer to.
+        t (float):
+            Game time of the frame in seconds.
+        game (int):
+            Game id.
+        """
+        dets = np.asarray(detections, dtype=np.float64).reshape(-1, 6)
+        h, w = frame_shape[:2]
+        self.append(game, t, dets[:, 5].astype(np.int64), dets[:, 4],
+                    dets[:, 0] / w, dets[:, 1] / h, dets[:, 2] / w, dets[:, 3] / h)
+
+    def flush(self, full_only=False):
+        """
+        Writes the buffered rows as chunks of chunk_rows rows. With full_only, a last partial
+        chunk stays in the buffer; otherwise it is written as a shorter chunk.
+        """
+        if not self.buffered:
+            return
+        columns = {name: np.concatenate(parts) for name, parts in self.buffer.items()}
+        total = self.buffered
+        end = total - total % self.chunk_rows if full_only else total
+        if not end:
+            return
+        starts = range(0, end, self.chunk_rows)
+        chunks = np.zeros(len(starts), dtype=self.index.dtype)
+        for k, start in enumerate(starts):
+            stop = min(start + self.chunk_rows, end)
+            cls = columns["cls"][start:stop].astype(np.int64)
+            chunks["start"][k], chunks["rows"][k] = self.rows + start, stop - start
+            chunks["game_min"][k], chunks["game_max"][k] = columns["game"][start:stop].min(), columns["game"][start:stop].max()
+            chunks["t_min"][k], chunks["t_max"][k] = columns["t"][start:stop].min(), columns["t"][start:stop].max()
+            chunks["cls_min"][k], chunks["cls_max"][k] = cls.min(), cls.max()
+            present = np.unique(cls)
+            np.bitwise_or.at(chunks["classes"][k], present // 64,
+                             np.left_shift(np.uint64(1), (present % 64).astype(np.uint64)))
+
+        for name in COLUMNS:
+            with open(self.column_path(name), "ab") as f:
+                columns[name][:end].tofile(f)
+        self.index = np.concatenate([self.index, chunks])
+        self.rows += end
+        self.buffer = {name: [columns[name][end:]] if end < total else [] for name in COLUMNS}
+        self.buffered = total - end
+        self._maps = None
+        self.save_meta()
+
+    def close(self):
+        """
+        Writes the remaining buffered rows.
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """
+        Returns a read-only memory map of a whole column (committed rows only).
+        """
+        if self._maps is None:
+            self._maps = {}
+        if name not in self._maps:
+            self._maps[name] = (np.memmap(self.column_path(name), dtype=COLUMNS[name], mode="r", shape=(self.rows,))
+                                if self.rows else np.zeros(0, dtype=COLUMNS[name]))
+        return self._maps[name]
+
+    def chunks_for(self, cls=None, game=None, start_s=None, end_s=None):
+        """
+        Returns the positions in the index of the chunks that may hold matching rows.
+        """
+        index = self.index
+        keep = np.ones(len(index), dtype=bool)
+        if game is not None:
+            games = np.atleast_1d(game)
+            keep &= ((index["game_min"][:, None] <= games) & (index["game_max"][:, None] >= games)).any(axis=1)
+        if start_s is not None:
+            keep &= index["t_max"] >= start_s
+        if end_s is not None:
+            keep &= index["t_min"] < end_s
+        if cls is not None:
+            classes = np.atleast_1d(cls).astype(np.int64)
+            # Las clases fuera del almacén no están en ningún chunk
+            classes = classes[(classes >= 0) & (classes < self.num_classes)]
+            bits = np.left_shift(np.uint64(1), (classes % 64).astype(np.uint64))
+            keep &= ((index["classes"][:, classes // 64] & bits) != 0).any(axis=1)
+        return np.flatnonzero(keep)
+
+    def query(self, cls=None, game=None, start_s=None, end_s=None, columns=None):
+        """
+        Returns the detections of some champions, games and/or a time window [start_s, end_s).
+        Only the chunks selected by the index are read; the rows still buffered are filtered in
+        memory, so querying a live store does not write any chunk.
+
+        Parameters:
+        ----------
+        cls (int or list, optional):
+            Class id(s).
+        game (int or list, optional):
+            Game id(s).
+        start_s, end_s (float, optional):
+            Time window in seconds.
+        columns (list, optional):
+            Columns to return. Defaults to all of them.
+
+        Returns:
+        -------
+        dict:
+            Column name -> NumPy array of the matching rows, in insertion order.
+        """
+        columns = list(columns or COLUMNS)
+        filters = {"cls": cls, "game": game}
+        needed = set(columns) | {k for k, v in filters.items() if v is not None}
+        if start_s is not None or end_s is not None:
+            needed.add("t")
+
+        def select(data, rows):
+            mask = np.ones(rows, dtype=bool)
+            for name, value in filters.items():
+                if value is not None:
+                    mask &= np.isin(data[name], np.atleast_1d(value))
+            if start_s is not None:
+                mask &= data["t"] >= start_s
+            if end_s is not None:
+                mask &= data["t"] < end_s
+            for name in columns:
+                parts[name].append(data[name][mask])
+
+        parts = {name: [] for name in columns}
+        for c in self.chunks_for(cls, game, start_s, end_s):
+            s = slice(int(self.index["start"][c]), int(self.index["start"][c] + self.index["rows"][c]))
+            select({name: self.column(name)[s] for name in needed}, s.stop - s.start)
+        if self.buffered:
+            select({name: np.concatenate(self.buffer[name]) for name in needed}, self.buffered)
+        return {name: np.concatenate(p) if p else np.zeros(0, dtype=COLUMNS[name]) for name, p in parts.items()}
+
+    def centers(self, **filters):
+        """
+        Returns the class ids, normalized box centers and times of a query, ready for
+        HeatmapAggregator.add(cls, x, y, t).
+        """
+        rows = self.query(columns=["cls", "t", "x1", "y1", "x2", "y2"], **filters)
+        return rows["cls"], (rows["x1"] + rows["x2"]) / 2, (rows["y1"] + rows["y2"]) / 2, rows["t"]
+
+    def stats(self):
+        """
+        Returns the size of the store: rows, chunks, games and bytes on disk.
+        """
+        return {
+            "rows": self.rows,
+            "chunks": len(self.index),
+            "games": int(len(np.unique(self.column("game")))) if self.rows else 0,
+            "bytes": sum(os.path.getsize(self.column_path(name)) for name in COLUMNS),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta un almacén de detecciones")
+    parser.add_argument("path", help="Carpeta del almacén.")
+    parser.add_argument("--champion", type=int, nargs="*", default=None, help="Clases a consultar.")
+    parser.add_argument("--game", type=int, nargs="*", default=None, help="Partidas a consultar.")
+    parser.add_argument("--start", type=float, default=None, help="Inicio de la ventana (s).")
+    parser.add_argument("--end", type=float, default=None, help="Fin de la ventana (s).")
+    args = parser.parse_args()
+
+    store = DetectionStore(args.path)
+    stats = store.stats()
+    print(f"🗄️ {stats['rows']} detecciones en {stats['chunks']} bloques, {stats['games']} partidas, "
+          f"{stats['bytes'] / 1e6:.1f} MB")
+    if args.champion or args.game or args.start is not None or args.end is not None:
+        chunks = store.chunks_for(args.champion, args.game, args.start, args.end)
+        rows = store.query(args.champion, args.game, args.start, args.end)
+        print(f"🔎 {len(rows['cls'])} detecciones ({len(chunks)}/{stats['chunks']} bloques leídos)")
@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+import yaml
+from dataset_index import IMAGE_EXTENSIONS
+from evaluate import Evaluation
+
+
+def link_or_copy(src, dst):
+    """
+    Hard-links a file (no extra disk space) or copies it if linking is not possible.
+    A different file already at dst (e.g. the labels of a previous run) is replaced.
+    """
+    if os.path.exists(dst):
+        src_stat, dst_stat = os.stat(src), os.stat(dst)
+        if os.path.samestat(src_stat, dst_stat) or (src_stat.st_size, src_stat.st_mtime_ns) == \
+                (dst_stat.st_size, dst_stat.st_mtime_ns):
+            return
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def link_split(src_dir, dst_dir):
+    """
+    Links (or copies) the images and labels of a split of the prepared dataset, ground truth included.
+
+    Returns:
+    -------
+    set:
+        Names of the images of the split.
+    """
+    names = set()
+    for kind, extensions in (("images", IMAGE_EXTENSIONS), ("labels", (".txt",))):
+        src = os.path.join(src_dir, kind)
+        if not os.path.isdir(src):
+            continue
+        dst = os.path.join(dst_dir, kind)
+        os.makedirs(dst, exist_ok=True)
+        # Solo imágenes y etiquetas: las cachés del split (labels.cache, índices...) no valen aquí
+        for f in os.listdir(src):
+            if f.lower().endswith(extensions):
+                link_or_copy(os.path.join(src, f), os.path.join(dst, f))
+                if kind == "images":
+                    names.add(f)
+    return names
+
+
+def pseudo_label(teacher, images_dir, out_images, out_labels, skip=(), conf=0.25,
+                 imgsz=800, batch=32, device=None):
+    """
+    Labels a folder of unlabeled images with the predictions of a teacher model, in YOLO format.
+
+    Parameters:
+    ----------
+    teacher (YOLO):
+        Loaded teacher model.
+    images_dir (str):
+        Directory containing the images to label.
+    out_images (str):
+        Directory where the images are linked.
+    out_labels (str):
+        Directory where the labels are written.
+    skip (set):
+        Image names left out, so the ground truth of images with the same name is not replaced.
+    conf (float):
+        Minimum confidence of the teacher boxes.
+    imgsz (int):
+        Inference image size.
+    batch (int):
+        Images per inference batch.
+    device (str, optional):
+        Device to run the teacher on.
+
+    Returns:
+    -------
+    int:
+        Number of boxes added by the teacher.
+    """
+    os.makedirs(out_images, exist_ok=True)
+    os.makedirs(out_labels, exist_ok=True)
+    files = sorted(f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS) and f not in skip)
+    added = 0
+    for start in range(0, len(files), batch):
+        chunk = files[start:start + batch]
+        results = teacher([os.path.join(images_dir, f) for f in chunk], imgsz=imgsz, conf=conf,
+                          device=device, verbose=False)
+        for name, r in zip(chunk, results):
+            xywhn = r.boxes.xywhn.cpu().numpy()
+            rows = np.concatenate([r.boxes.cls.cpu().numpy()[:, None], xywhn], axis=1)
+            added += len(rows)
+            with open(os.path.join(out_labels, os.path.splitext(name)[0] + ".txt"), "w", encoding="utf-8") as f:
+                for c, x, y, w, h in rows:
+                    f.write(f"{int(c)} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n")
+            link_or_copy(os.path.join(images_dir, name), os.path.join(out_images, name))
+        print(f"🧑‍🏫 {min(start + batch, len(files))}/{len(files)} imágenes etiquetadas por el profesor")
+    return added
+
+
+def build_distill_dataset(teacher_weights, data_dir, out_dir, extra_images=None,
+                          conf=0.25, imgsz=800, batch=32, device=None):
+    """
+    Builds the training set of a student model: every split keeps its ground truth, which is
+    exact for the generated minimaps (hard teacher predictions could only add misses and false
+    positives to it), and the teacher labels the extra unlabeled images (e.g. real frames or
+    new generated minimaps without labels), which are added to the train split.
+
+    Parameters:
+    ----------
+    teacher_weights (str):
+        Path to the teacher weights.
+    data_dir (str):
+        Prepared dataset folder (with data.yaml and the split folders).
+    out_dir (str):
+        Folder of the distillation dataset.
+    extra_images (str, optional):
+        Folder of unlabeled images labeled by the teacher and added to the train split.
+    conf (float):
+        Minimum confidence of the teacher boxes.
+    imgsz (int):
+        Inference image size.
+    batch (int):
+        Images per inference batch.
+    device (str, optional):
+        Device to run the teacher on.
+
+    Returns:
+    -------
+    str:
+        Path to the data.yaml of the distillation dataset.
+    """
+    train_names = set()
+    for split in ("train", "val", "test"):
+        names = link_split(os.path.join(data_dir, split), os.path.join(out_dir, split))
+        if split == "train":
+            train_names = names
+
+    added = 0
+    if extra_images:
+        from ultralytics import YOLO
+
+        teacher = YOLO(teacher_weights)
+        added = pseudo_label(teacher, extra_images, os.path.join(out_dir, "train", "images"),
+                             os.path.join(out_dir, "train", "labels"), skip=train_names,
+                             conf=conf, imgsz=imgsz, batch=batch, device=device)
+
+    with open(os.path.join(data_dir, "data.yaml"), "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    data["path"] = os.path.abspath(out_dir)
+    yaml_path = os.path.join(out_dir, "data.yaml")
+    with open(yaml_path, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, default_flow_style=False)
+    print(f"✅ Dataset de destilación en '{out_dir}' ({added} cajas del profesor)")
+    return yaml_path
+
+
+def measure_latency(weights, imgsz=800, device="cpu", runs=30, warmup=5):
+    """
+    Measures the single-image inference latency of a model, as in the realtime loop.
+
+    Returns:
+    -------
+    dict:
+        Median and 90th percentile latency in ms.
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+    frame = np.random.default_rng(0).integers(0, 255, (imgsz, imgsz, 3), dtype=np.uint8)
+    times = []
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        model(frame, imgsz=imgsz, device=device, verbose=False)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return {"latency_ms": float(np.median(times)), "latency_ms_p90": float(np.percentile(times, 90))}
+
+
+def tradeoff_report(models, data_dir, split="test", imgsz=800, device="cpu", output_json=None):
+    """
+    Compares the accuracy and the latency of several models (e.g. teacher and students):
+    mAP on a split of the prepared dataset (with the cached evaluation harness) and
+    single-image latency on the given device.
+
+    Parameters:
+    ----------
+    models (dict):
+        Name -> weights path.
+    data_dir (str):
+        Prepared dataset folder with ground truth labels.
+    split (str):
+        Split to evaluate.
+    imgsz (int):
+        Image size.
+    device (str):
+        Device of the latency measurement (CPU for deployment on analyst machines).
+    output_json (str, optional):
+        If given, the report is also written to this file.
+
+    Returns:
+    -------
+    list:
+        One row per model with mAP50, mAP50-95, latency and size.
+    """
+    with open(os.path.join(data_dir, "data.yaml"), "r", encoding="utf-8") as f:
+        names = yaml.safe_load(f)["names"]
+    rows = []
+    for name, weights in models.items():
+        evaluation = Evaluation(weights, os.path.join(data_dir, split, "images"),
+                                os.path.join(data_dir, split, "labels"), names,
+                                os.path.join(data_dir, ".eval_cache"), imgsz=imgsz)
+        score = evaluation.score()
+        rows.append({"model": name, "weights": weights,
+                     "map50": score["map50"], "map50_95": score["map50_95"],
+                     "size_mb": os.path.getsize(weights) / 1e6,
+                     **measure_latency(weights, imgsz=imgsz, device=device)})
+
+    best = max(r["map50_95"] for r in rows) or 1.0
+    print(f"{'modelo':<20}{'mAP50':>8}{'mAP50-95':>10}{'% mejor':>9}{f'ms ({device})':>12}{'MB':>7}")
+    for r in rows:
+        print(f"{r['model']:<20}{r['map50']:8.3f}{r['map50_95']:10.3f}{r['map50_95'] / best:9.0%}"
+              f"{r['latency_ms']:12.1f}{r['size_mb']:7.1f}")
+    if output_json:
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return rows
@@ -0,0 +1,447 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+import yaml
+from dataset_index import IMAGE_EXTENSIONS
+from mmap_dataset import read_labels
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Returns the first 16 hex digits of the sha256 of a file (the key of the cached predictions).
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def box_iou(a, b):
+    """
+    Returns the (len(a), len(b)) IoU matrix of two sets of xyxy boxes.
+    """
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match_predictions(pred_boxes, pred_cls, gt_boxes, gt_cls, iou_thresholds):
+    """
+    Marks every prediction of one image as true positive or not at each IoU threshold,
+    matching each ground truth box with at most one prediction of its class (highest IoU first).
+
+    Returns:
+    -------
+    np.ndarray:
+        (len(pred_boxes), len(iou_thresholds)) bool array.
+    """
+    correct = np.zeros((len(pred_boxes), len(iou_thresholds)), dtype=bool)
+    if not len(pred_boxes) or not len(gt_boxes):
+        return correct
+    iou = box_iou(gt_boxes, pred_boxes) * (gt_cls[:, None] == pred_cls[None, :])
+    for i, t in enumerate(iou_thresholds):
+        gi, pi = np.nonzero(iou >= t)
+        if not len(gi):
+            continue
+        order = np.argsort(-iou[gi, pi], kind="stable")
+        gi, pi = gi[order], pi[order]
+        _, first = np.unique(pi, return_index=True)
+        gi, pi = gi[first], pi[first]
+        order = np.argsort(-iou[gi, pi], kind="stable")
+        gi, pi = gi[order], pi[order]
+        _, first = np.unique(gi, return_index=True)
+        correct[pi[first], i] = True
+    return correct
+
+
+def compute_ap(recall, precision):
+    """
+    Area under the precision-recall curve with the 101-point interpolation of COCO.
+    """
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precision, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    x = np.linspace(0, 1, 101)
+    trapezoid = getattr(np, "trapezoid", None) or np.trapz  # renamed in NumPy 2.0
+    return float(trapezoid(np.interp(x, mrec, mpre), x))
+
+
+def load_styles(recipe_paths):
+    """
+    Reads the style (outline or recall effect) of every champion drawn by the minimap generator
+    from its recipe logs. A champion appears at most once per minimap, so (image, champion)
+    identifies its ground truth box.
+
+    Parameters:
+    ----------
+    recipe_paths (list):
+        recipes.jsonl files of the generation runs the split was made from.
+
+    Returns:
+    -------
+    dict:
+        (image_id, champion name) -> style.
+    """
+    styles = {}
+    for path in recipe_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                for element in record["elements"]:
+                    if element.get("style"):
+                        styles[(record["image_id"], element["name"])] = element["style"]
+    return styles
+
+
+class Evaluation:
+    """
+    Evaluation of one model on one split. The predictions are computed once, with a very low
+    confidence threshold, and cached in an .npz file keyed by the hash of the weights, the image
+    size and the list of images; every score() call (other IoU or confidence thresholds) only
+    re-matches the cached boxes.
+
+    Attributes:
+    ----------
+    files (list):
+        Image file names of the split, in order.
+    names (dict):
+        Class names.
+    preds (dict):
+        Cached predictions: boxes (M, 4) xyxy in pixels, conf (M,), cls (M,) and
+        offsets (N + 1,) so the predictions of image i are [offsets[i]:offsets[i + 1]].
+    gt (dict):
+        Ground truth with the same layout (boxes, cls, offsets).
+    """
+
+    def __init__(self, weights, images_dir, labels_dir, names, cache_dir=".eval_cache",
+                 imgsz=800, batch=32, device=None):
+        """
+        Loads the cached predictions or runs the model on the split.
+
+        Parameters:
+        ----------
+        weights (str):
+            Path to the trained weights.
+        images_dir (str):
+            Directory containing the images of the split.
+        labels_dir (str):
+            Directory containing the YOLO labels of the split.
+        names (dict or list):
+            Class names.
+        cache_dir (str):
+            Directory of the cached predictions.
+        imgsz (int):
+            Inference image size.
+        batch (int):
+            Images per inference batch.
+        device (str, optional):
+            Device to run on.
+        """
+        self.weights = weights
+        self.names = dict(enumerate(names)) if isinstance(names, list) else dict(names)
+        self.files = sorted(f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+        files_key = hashlib.sha256("\n".join(self.files).encode("utf-8")).hexdigest()[:8]
+        self.cache_path = os.path.join(cache_dir, f"preds_{file_hash(weights)}_{imgsz}_{files_key}.npz")
+
+        if os.path.isfile(self.cache_path):
+            with np.load(self.cache_path) as data:
+                self.preds = {k: data[k] for k in data.files}
+            print(f"♻️ Predicciones en caché: '{self.cache_path}'")
+        else:
+            self.preds = self.predict(images_dir, imgsz, batch, device)
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = self.cache_path + ".tmp.npz"
+            np.savez_compressed(tmp, **self.preds)
+            os.replace(tmp, self.cache_path)
+            print(f"💾 Predicciones guardadas en '{self.cache_path}'")
+        self.gt = self.load_ground_truth(labels_dir)
+        self._matches = {}
+
+    def predict(self, images_dir, imgsz, batch, device):
+        """
+        Runs the model in batches over the split, keeping every box with confidence >= 0.001.
+        """
+        from ultralytics import YOLO
+
+        model = YOLO(self.weights)
+        boxes, conf, cls, counts, shapes = [], [], [], [], []
+        paths = [os.path.join(images_dir, f) for f in self.files]
+        for start in range(0, len(paths), batch):
+            results = model(paths[start:start + batch], imgsz=imgsz, conf=0.001,
+                            device=device, verbose=False)
+            for r in results:
+                data = r.boxes.data.cpu().numpy()
+                boxes.append(data[:, :4])
+                conf.append(data[:, 4])
+                cls.append(data[:, 5])
+                counts.append(len(data))
+                shapes.append(r.orig_shape)
+            print(f"🔎 {min(start + batch, len(paths))}/{len(paths)} imágenes")
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        return {
+            "boxes": np.concatenate(boxes).astype(np.float32) if boxes else np.zeros((0, 4), np.float32),
+            "conf": np.concatenate(conf).astype(np.float32) if conf else np.zeros(0, np.float32),
+            "cls": np.concatenate(cls).astype(np.int32) if cls else np.zeros(0, np.int32),
+            "offsets": offsets,
+            "shapes": np.array(shapes, dtype=np.int32).reshape(-1, 2),
+        }
+
+    def load_ground_truth(self, labels_dir):
+        """
+        Reads the YOLO labels of the split as pixel xyxy boxes, using the image sizes
+        stored with the predictions.
+        """
+        boxes, cls, counts = [], [], []
+        for name, (h, w) in zip(self.files, self.preds["shapes"]):
+            labels = read_labels(os.path.join(labels_dir, os.path.splitext(name)[0] + ".txt"))
+            xywh = labels[:, 1:] * np.array([w, h, w, h], dtype=np.float32)
+            boxes.append(np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], axis=1))
+            cls.append(labels[:, 0].astype(np.int32))
+            counts.append(len(labels))
+        offsets = np.zeros(len(self.files) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        return {
+            "boxes": np.concatenate(boxes) if boxes else np.zeros((0, 4), np.float32),
+            "cls": np.concatenate(cls) if cls else np.zeros(0, np.int32),
+            "offsets": offsets,
+        }
+
+    def matches(self, iou_thresholds):
+        """
+        True positive matrix (M, len(iou_thresholds)) of all predictions, memoized per thresholds.
+        """
+        key = tuple(np.round(iou_thresholds, 4))
+        if key not in self._matches:
+            p, g = self.preds, self.gt
+            correct = [match_predictions(p["boxes"][p["offsets"][i]:p["offsets"][i + 1]],
+                                         p["cls"][p["offsets"][i]:p["offsets"][i + 1]],
+                                         g["boxes"][g["offsets"][i]:g["offsets"][i + 1]],
+                                         g["cls"][g["offsets"][i]:g["offsets"][i + 1]],
+                                         iou_thresholds)
+                       for i in range(len(self.files))]
+            self._matches[key] = np.concatenate(correct) if correct else np.zeros((0, len(key)), bool)
+        return self._matches[key]
+
+    def score(self, iou=0.5, conf=0.25):
+        """
+        Computes the metrics from the cached predictions.
+
+        Parameters:
+        ----------
+        iou (float):
+            IoU threshold of the per-class precision/recall and of the confusion matrix.
+        conf (float):
+            Confidence threshold of the per-class precision/recall and of the confusion matrix
+            (mAP always uses every cached prediction).
+
+        Returns:
+        -------
+        dict:
+            map50, map50_95, per-class precision, recall, ap50, ap and number of instances,
+            and the (nc + 1, nc + 1) confusion matrix (rows predicted, columns true,
+            last row/column background).
+        """
+        tp = self.matches(IOU_THRESHOLDS)
+        tp_iou = tp[:, 0] if iou == 0.5 else self.matches(np.array([iou]))[:, 0]
+        order = np.argsort(-self.preds["conf"], kind="stable")
+        tp, tp_iou = tp[order], tp_iou[order]
+        pred_conf, pred_cls = self.preds["conf"][order], self.preds["cls"][order]
+        gt_cls = self.gt["cls"]
+
+        classes = {}
+        for c in np.unique(np.concatenate([gt_cls, pred_cls])):
+            mask = pred_cls == c
+            n_gt = int((gt_cls == c).sum())
+            tpc = np.cumsum(tp[mask], axis=0)
+            fpc = np.cumsum(~tp[mask], axis=0)
+            ap = np.zeros(len(IOU_THRESHOLDS))
+            if n_gt and mask.any():
+                recall = tpc / n_gt
+                precision = tpc / (tpc + fpc)
+                ap = np.array([compute_ap(recall[:, j], precision[:, j]) for j in range(len(IOU_THRESHOLDS))])
+            kept = mask & (pred_conf >= conf)
+            hits = int(tp_iou[kept].sum())
+            classes[self.names.get(int(c), str(int(c)))] = {
+                "instances": n_gt,
+                "precision": hits / int(kept.sum()) if kept.any() else 0.0,
+                "recall": hits / n_gt if n_gt else 0.0,
+                "ap50": float(ap[0]),
+                "ap": float(ap.mean()),
+            }
+
+        evaluated = [v for v in classes.values() if v["instances"]]
+        return {
+            "weights": self.weights,
+            "iou": iou,
+            "conf": conf,
+            "map50": float(np.mean([v["ap50"] for v in evaluated])) if evaluated else 0.0,
+            "map50_95": float(np.mean([v["ap"] for v in evaluated])) if evaluated else 0.0,
+            "classes": classes,
+            "confusion": self.confusion_matrix(iou, conf),
+        }
+
+    def style_recall(self, styles, iou=0.5, conf=0.25):
+        """
+        Recall of the ground truth boxes grouped by the style they were drawn with: a box is found
+        when a prediction of its class with confidence >= conf overlaps it with IoU >= iou.
+
+        Parameters:
+        ----------
+        styles (dict):
+            (image_id, champion name) -> style, from load_styles().
+        iou (float):
+            IoU threshold.
+        conf (float):
+            Confidence threshold.
+
+        Returns:
+        -------
+        dict:
+            Style -> recall, for the styles with at least one box in the split.
+        """
+        found, total = {}, {}
+        p, g = self.preds, self.gt
+        for i, name in enumerate(self.files):
+            image_id = os.path.splitext(name)[0]
+            keep = p["conf"][p["offsets"][i]:p["offsets"][i + 1]] >= conf
+            pb = p["boxes"][p["offsets"][i]:p["offsets"][i + 1]][keep]
+            pc = p["cls"][p["offsets"][i]:p["offsets"][i + 1]][keep]
+            gb = g["boxes"][g["offsets"][i]:g["offsets"][i + 1]]
+            gc = g["cls"][g["offsets"][i]:g["offsets"][i + 1]]
+            hit = ((box_iou(gb, pb) >= iou) & (gc[:, None] == pc[None, :])).any(axis=1) if len(pb) else np.zeros(len(gb), bool)
+            for c, h in zip(gc, hit):
+                style = styles.get((image_id, self.names.get(int(c))))
+                if style is None:
+                    continue
+                total[style] = total.get(style, 0) + 1
+                found[style] = found.get(style, 0) + int(h)
+        return {style: found[style] / total[style] for style in sorted(total)}
+
+    def confusion_matrix(self, iou=0.5, conf=0.25):
+        """
+        Confusion matrix of the predictions with confidence >= conf, matching boxes of any
+        class with IoU >= iou.
+        """
+        nc = max(self.names) + 1 if self.names else int(max(self.gt["cls"].max(initial=0), self.preds["cls"].max(initial=0))) + 1
+        matrix = np.zeros((nc + 1, nc + 1), dtype=np.int64)
+        p, g = self.preds, self.gt
+        for i in range(len(self.files)):
+            keep = p["conf"][p["offsets"][i]:p["offsets"][i + 1]] >= conf
+            pb = p["boxes"][p["offsets"][i]:p["offsets"][i + 1]][keep]
+            pc = p["cls"][p["offsets"][i]:p["offsets"][i + 1]][keep]
+            gb = g["boxes"][g["offsets"][i]:g["offsets"][i + 1]]
+            gc = g["cls"][g["offsets"][i]:g["offsets"][i + 1]]
+            matched_p = np.zeros(len(pb), dtype=bool)
+            matched_g = np.zeros(len(gb), dtype=bool)
+            if len(pb) and len(gb):
+                ious = box_iou(gb, pb)
+                gi, pi = np.nonzero(ious >= iou)
+                order = np.argsort(-ious[gi, pi], kind="stable")
+                gi, pi = gi[order], pi[order]
+                _, first = np.unique(pi, return_index=True)
+                gi, pi = gi[first], pi[first]
+                _, first = np.unique(gi, return_index=True)
+                gi, pi = gi[first], pi[first]
+                np.add.at(matrix, (pc[pi], gc[gi]), 1)
+                matched_p[pi] = True
+                matched_g[gi] = True
+            np.add.at(matrix, (pc[~matched_p], nc), 1)
+            np.add.at(matrix, (nc, gc[~matched_g]), 1)
+        return matrix
+
+
+def print_comparison(scores, top=15):
+    """
+    Prints the global metrics of several models and the per-class metrics of the classes
+    where they differ most (or the worst classes, for a single model).
+    """
+    for s in scores:
+        print(f"📊 {s['weights']}: mAP50 {s['map50']:.3f} | mAP50-95 {s['map50_95']:.3f} "
+              f"(IoU {s['iou']}, conf {s['conf']})")
+    names = sorted(set().union(*(s["classes"] for s in scores)))
+    rows = []
+    for name in names:
+        values = [s["classes"].get(name, {}) for s in scores]
+        ap50 = [v.get("ap50", 0.0) for v in values]
+        rows.append((max(ap50) - min(ap50), name, values))
+    if len(scores) > 1:
+        rows.sort(key=lambda r: -r[0])
+    else:
+        rows.sort(key=lambda r: r[2][0].get("ap50", 0.0))
+    print(f"{'clase':<16}" + "".join(f"{'P':>7}{'R':>7}{'AP50':>7} |" for _ in scores))
+    for _, name, values in rows[:top]:
+        print(f"{name:<16}" + "".join(f"{v.get('precision', 0):7.2f}{v.get('recall', 0):7.2f}{v.get('ap50', 0):7.2f} |"
+                                      for v in values))
+
+
+def evaluate(weights_list, data_dir="./prepared_data", split="test", iou=0.5, conf=0.25,
+             imgsz=800, batch=32, device=None, output_json=None):
+    """
+    Evaluates one or more models on a split of the prepared dataset and prints a comparison.
+
+    Parameters:
+    ----------
+    weights_list (list):
+        Paths to the weights to compare.
+    data_dir (str):
+        Prepared dataset folder (with data.yaml and the split folders).
+    split (str):
+        Split to evaluate.
+    iou (float):
+        IoU threshold of precision/recall and of the confusion matrix.
+    conf (float):
+        Confidence threshold of precision/recall and of the confusion matrix.
+    imgsz (int):
+        Inference image size.
+    batch (int):
+        Images per inference batch.
+    device (str, optional):
+        Device to run on.
+    output_json (str, optional):
+        If given, the scores are also written to this file.
+
+    Returns:
+    -------
+    list:
+        Scores of every model (see Evaluation.score).
+    """
+    with open(os.path.join(data_dir, "data.yaml"), "r", encoding="utf-8") as f:
+        names = yaml.safe_load(f)["names"]
+    images_dir = os.path.join(data_dir, split, "images")
+    labels_dir = os.path.join(data_dir, split, "labels")
+    cache_dir = os.path.join(data_dir, ".eval_cache")
+    scores = [Evaluation(w, images_dir, labels_dir, names, cache_dir, imgsz, batch, device).score(iou, conf)
+              for w in weights_list]
+    print_comparison(scores)
+    if output_json:
+        with open(output_json, "w", encoding="utf-8") as f:
+            json.dump([{**s, "confusion": s["confusion"].tolist()} for s in scores], f)
+    return scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evalúa y compara modelos con predicciones en caché")
+    parser.add_argument("weights", nargs="+", help="Pesos de los modelos a comparar.")
+    parser.add_argument("--data", type=str, default="./prepared_data", help="Carpeta del dataset preparado.")
+    parser.add_argument("--split", type=str, default="test")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU para precisión, recall y matriz de confusión.")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confianza para precisión, recall y matriz de confusión.")
+    parser.add_argument("--imgsz", type=int, default=800)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--device", type=str, default=None)
+    parser.add_argument("--output", type=str, default=None, help="JSON con los resultados.")
+    args = parser.parse_args()
+    evaluate(args.weights, args.data, args.split, args.iou, args.conf,
+             args.imgsz, args.batch, args.device, args.output)
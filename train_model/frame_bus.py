@@ -0,0 +1,265 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+
+# Control block: write sequence, slots, height, width, channels, then one sequence per slot.
+HEADER_FIELDS = 5
+
+
+class FrameBus:
+    """
+    Ring buffer of frames in shared memory, written by one capture process and read by any
+    number of consumers (detector, recorder, analytics...) in other processes.
+    Every frame gets an increasing sequence number. Readers get zero-copy NumPy views of the
+    slots and never block the producer: a slow reader just skips the frames it missed.
+
+    Attributes:
+    ----------
+    name (str):
+        Name of the shared memory block.
+    shape (tuple):
+        (height, width, channels) of the frames.
+    slots (int):
+        Number of frames kept in the ring.
+    frames (np.ndarray):
+        (slots, height, width, channels) uint8 view of the shared frames.
+    timestamps (np.ndarray):
+        Capture time of each slot.
+    """
+
+    def __init__(self, name, shape=None, slots=8, create=False):
+        """
+        Creates a new bus or attaches to an existing one.
+
+        Parameters:
+        ----------
+        name (str):
+            Name of the shared memory block.
+        shape (tuple, optional):
+            (height, width, channels) of the frames. Required when creating the bus.
+        slots (int):
+            Number of frames kept in the ring when creating the bus.
+        create (bool):
+            If True, creates the bus (producer); otherwise attaches to it (consumer).
+        """
+        self.name = name
+        self.owner = create
+        if create:
+            if shape is None:
+                raise ValueError("shape es obligatorio al crear el bus")
+            h, w, c = shape
+            size = self._header_bytes(slots) + slots * 8 + slots * h * w * c
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            header = np.ndarray((HEADER_FIELDS + slots,), dtype=np.int64, buffer=self.shm.buf)
+            header[:] = 0
+            header[1:HEADER_FIELDS] = (slots, h, w, c)
+        elif sys.version_info >= (3, 13):
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self._untrack()
+
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        slots, h, w, c = (int(v) for v in header[1:HEADER_FIELDS])
+        self.slots = slots
+        self.shape = (h, w, c)
+
+        offset = 0
+        self._header = np.ndarray((HEADER_FIELDS + slots,), dtype=np.int64, buffer=self.shm.buf, offset=offset)
+        self._slot_seq = self._header[HEADER_FIELDS:]
+        offset += self._header_bytes(slots)
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=self.shm.buf, offset=offset)
+        offset += slots * 8
+        self.frames = np.ndarray((slots, h, w, c), dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+
+    @staticmethod
+    def _header_bytes(slots):
+        return (HEADER_FIELDS + slots) * 8
+
+    def _untrack(self):
+        # Before Python 3.13 attaching registers the block in the resource tracker, which
+        # would destroy it when this consumer exits. Only the producer must unlink it.
+        # Consumers are expected to be separate scripts, each with its own tracker.
+        if os.name != "nt":
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            except Exception:
+                pass
+
+    @classmethod
+    def create(cls, name, shape, slots=8):
+        """
+        Creates a bus for frames of the given shape.
+        """
+        return cls(name, shape=shape, slots=slots, create=True)
+
+    @classmethod
+    def attach(cls, name, timeout=None):
+        """
+        Attaches to an existing bus, waiting for the producer to create it if a timeout is given.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return cls(name)
+            except FileNotFoundError:
+                if deadline is None or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    @property
+    def latest_seq(self):
+        """
+        Sequence number of the last published frame (0 if none).
+        """
+        return int(self._header[0])
+
+    @contextmanager
+    def writing(self, timestamp=None):
+        """
+        Gives the producer the next slot to fill in place (e.g. as the dst of cv2.cvtColor),
+        so frames are written once, directly into shared memory.
+
+        Yields:
+        -------
+        tuple:
+            (seq, slot) where slot is a writable view of the frame.
+        """
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        # Negative sequence: readers know the slot is being written
+        self._slot_seq[slot] = -seq
+        yield seq, self.frames[slot]
+        self.timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._slot_seq[slot] = seq
+        self._header[0] = seq
+
+    def publish(self, frame, timestamp=None):
+        """
+        Copies a frame into the next slot and publishes it.
+
+        Returns:
+        -------
+        int:
+            Sequence number of the frame.
+        """
+        with self.writing(timestamp) as (seq, slot):
+            slot[...] = frame
+        return seq
+
+    def is_valid(self, seq):
+        """
+        Returns True if the frame with this sequence is still in its slot, i.e. a view
+        obtained with get() has not been overwritten by the producer.
+        """
+        return seq > 0 and int(self._slot_seq[seq % self.slots]) == seq
+
+    def get(self, seq):
+        """
+        Returns a zero-copy view of a frame, or None if it was already overwritten.
+        Check is_valid(seq) after using the view to make sure it was not overwritten meanwhile.
+        """
+        if not self.is_valid(seq):
+            return None
+        return self.frames[seq % self.slots]
+
+    def copy(self, seq):
+        """
+        Returns a private copy of a frame, or None if it was overwritten before or during the copy.
+        """
+        view = self.get(seq)
+        if view is None:
+            return None
+        frame = view.copy()
+        return frame if self.is_valid(seq) else None
+
+    def close(self):
+        """
+        Detaches from the shared memory; the producer also destroys it.
+        """
+        self.frames = self.timestamps = self._header = self._slot_seq = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class FrameReader:
+    """
+    Sequential consumer of a FrameBus. It returns every frame in order while it keeps up
+    and jumps to the newest frames when it falls behind, counting the dropped ones.
+
+    Attributes:
+    ----------
+    bus (FrameBus):
+        Bus to read from.
+    next_seq (int):
+        Sequence of the next frame to return.
+    dropped (int):
+        Frames overwritten before this reader could get them.
+    """
+
+    def __init__(self, bus, from_latest=True):
+        """
+        Parameters:
+        ----------
+        bus (FrameBus):
+            Bus to read from.
+        from_latest (bool):
+            If True, starts with the newest frame instead of the oldest one in the ring.
+        """
+        self.bus = bus
+        latest = bus.latest_seq
+        self.next_seq = max(latest, 1) if from_latest else max(latest - bus.slots + 1, 1)
+        self.dropped = 0
+
+    def next(self, timeout=None, copy=False, poll=0.001):
+        """
+        Waits for the next frame.
+
+        Parameters:
+        ----------
+        timeout (float, optional):
+            Maximum seconds to wait. If None, waits forever.
+        copy (bool):
+            If True, returns a private copy instead of a zero-copy view.
+        poll (float):
+            Seconds between checks while waiting.
+
+        Returns:
+        -------
+        tuple or None:
+            (seq, frame, timestamp), or None on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            latest = self.bus.latest_seq
+            if latest >= self.next_seq:
+                oldest = latest - self.bus.slots + 1
+                if self.next_seq < oldest:
+                    self.dropped += oldest - self.next_seq
+                    self.next_seq = oldest
+                seq = self.next_seq
+                frame = self.bus.copy(seq) if copy else self.bus.get(seq)
+                self.next_seq += 1
+                if frame is None:
+                    self.dropped += 1
+                    continue
+                return seq, frame, float(self.bus.timestamps[seq % self.bus.slots])
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(poll)
+
+    def __iter__(self):
+        while True:
+            yield self.next()
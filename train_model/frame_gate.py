@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+
+
+class FrameGate:
+    """
+    Cheap change detector that decides, frame by frame, whether the model has to run
+    or the previous detections can be reused.
+    Frames are reduced to a small grayscale thumbnail and compared with the thumbnail of
+    the last frame that went through the model, both globally (mean absolute difference)
+    and per block, so a single champion icon moving is not averaged away.
+
+    Attributes:
+    ----------
+    threshold (float):
+        Mean absolute difference (0-255) above which the model runs.
+    block_threshold (float):
+        Mean absolute difference of any single block above which the model runs.
+    size (tuple):
+        (width, height) of the thumbnail.
+    block (int):
+        Side of the blocks of the thumbnail, in pixels.
+    max_skip (int):
+        Maximum consecutive frames reusing detections, to bound staleness.
+    frames (int):
+        Frames checked.
+    inferences (int):
+        Frames that went through the model.
+    skipped (int):
+        Frames that reused the previous detections.
+    """
+
+    def __init__(self, threshold=4.0, block_threshold=12.0, size=(64, 64), block=8, max_skip=30):
+        """
+        Initializes the gate. With threshold 0 every frame goes through the model.
+
+        Parameters:
+        ----------
+        threshold (float):
+            Mean absolute difference (0-255) above which the model runs.
+        block_threshold (float):
+            Mean absolute difference of any single block above which the model runs.
+        size (tuple):
+            (width, height) of the thumbnail, multiple of block.
+        block (int):
+            Side of the blocks of the thumbnail, in pixels.
+        max_skip (int):
+            Maximum consecutive frames reusing detections.
+        """
+        self.threshold = threshold
+        self.block_threshold = block_threshold
+        self.size = size
+        self.block = block
+        self.max_skip = max_skip
+        self.reference = None
+        self.run_skipped = 0
+        self.frames = 0
+        self.inferences = 0
+        self.skipped = 0
+
+    def thumbnail(self, frame):
+        """
+        Reduces a BGR or grayscale frame to the small grayscale thumbnail used for comparisons.
+        """
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY if frame.shape[2] == 3 else cv2.COLOR_BGRA2GRAY)
+        return cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def difference(self, thumb):
+        """
+        Returns the global and the maximum per-block mean absolute difference with the reference.
+        """
+        diff = np.abs(thumb - self.reference)
+        w, h = self.size
+        b = self.block
+        blocks = diff[:h - h % b, :w - w % b].reshape(h // b, b, w // b, b).mean(axis=(1, 3))
+        return float(diff.mean()), float(blocks.max())
+
+    def should_infer(self, frame):
+        """
+        Decides whether the model must run on this frame and updates the counters.
+
+        Parameters:
+        ----------
+        frame (np.ndarray):
+            Current frame.
+
+        Returns:
+        -------
+        bool:
+            True if the model must run, False if the previous detections can be reused.
+        """
+        self.frames += 1
+        thumb = self.thumbnail(frame)
+
+        run = (self.reference is None
+               or not self.threshold
+               or self.run_skipped >= self.max_skip)
+        if not run:
+            mean_diff, block_diff = self.difference(thumb)
+            run = mean_diff > self.threshold or block_diff > self.block_threshold
+
+        if run:
+            self.reference = thumb
+            self.run_skipped = 0
+            self.inferences += 1
+        else:
+            self.run_skipped += 1
+            self.skipped += 1
+        return run
+
+    def stats(self):
+        """
+        Returns the counters of the gate.
+
+        Returns:
+        -------
+        dict:
+            Frames checked, inferences run, frames skipped and the skipped ratio.
+        """
+        return {
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,238 @@
+import argparse
+import cv2
+import numpy as np
+
+HEATMAP_VERSION = 1
+
+
+class HeatmapAggregator:
+    """
+    Streaming aggregation of champion detections into positional heatmaps and timelines.
+    Every detection is added once to fixed-size NumPy arrays, so memory does not grow with
+    the number of games and any heatmap can be read at any time without reprocessing.
+    Aggregators of different games (or processes) are combined with merge().
+
+    Positions are the box centers normalized to the minimap (0-1, origin top-left).
+
+    Attributes:
+    ----------
+    num_classes (int):
+        Number of classes (champions) of the model.
+    grid (int):
+        Side of the per-class position histograms.
+    bucket_s (float):
+        Seconds of game time per timeline bucket.
+    counts (np.ndarray):
+        (num_classes, grid, grid) uint32 position histograms.
+    total (np.ndarray):
+        (grid, grid) uint32 histogram of all classes.
+    timeline (np.ndarray):
+        (buckets, num_classes, time_grid, time_grid) uint32 coarse histograms per time bucket.
+    series (np.ndarray):
+        (buckets, num_classes, 3) float64 count, sum of x and sum of y per time bucket.
+    games (int):
+        Games aggregated.
+    """
+
+    def __init__(self, num_classes, grid=64, time_grid=8, bucket_s=60.0, buckets=60, names=None):
+        """
+        Parameters:
+        ----------
+        num_classes (int):
+            Number of classes of the model.
+        grid (int):
+            Side of the per-class position histograms.
+        time_grid (int):
+            Side of the coarse histograms of each time bucket.
+        bucket_s (float):
+            Seconds of game time per timeline bucket.
+        buckets (int):
+            Number of time buckets; later detections go to the last one.
+        names (dict or list, optional):
+            Class names, to address classes by name.
+        """
+        self.num_classes = num_classes
+        self.grid = grid
+        self.time_grid = time_grid
+        self.bucket_s = bucket_s
+        self.names = dict(enumerate(names)) if isinstance(names, list) else dict(names or {})
+        self.ids = {name: i for i, name in self.names.items()}
+        self.counts = np.zeros((num_classes, grid, grid), dtype=np.uint32)
+        self.total = np.zeros((grid, grid), dtype=np.uint32)
+        self.timeline = np.zeros((buckets, num_classes, time_grid, time_grid), dtype=np.uint32)
+        self.series = np.zeros((buckets, num_classes, 3), dtype=np.float64)
+        self.games = 0
+
+    def class_id(self, cls):
+        """
+        Returns the class id of a class given by id or by name.
+        """
+        return self.ids[cls] if isinstance(cls, str) else int(cls)
+
+    def add(self, cls, x, y, t=0.0):
+        """
+        Adds detections given as arrays (or scalars) of class ids, normalized centers and game time.
+
+        Parameters:
+        ----------
+        cls (array-like):
+            Class ids.
+        x, y (array-like):
+            Normalized box centers (0-1).
+        t (float or array-like):
+            Game time in seconds of each detection.
+        """
+        cls = np.asarray(cls, dtype=np.int64).ravel()
+        if not cls.size:
+            return
+        x = np.clip(np.asarray(x, dtype=np.float64).ravel(), 0.0, 1.0 - 1e-9)
+        y = np.clip(np.asarray(y, dtype=np.float64).ravel(), 0.0, 1.0 - 1e-9)
+        t = np.broadcast_to(np.asarray(t, dtype=np.float64), cls.shape)
+        valid = (cls >= 0) & (cls < self.num_classes)
+        cls, x, y, t = cls[valid], x[valid], y[valid], t[valid]
+
+        gx, gy = (x * self.grid).astype(np.int64), (y * self.grid).astype(np.int64)
+        np.add.at(self.counts, (cls, gy, gx), 1)
+        np.add.at(self.total, (gy, gx), 1)
+
+        b = np.clip((t / self.bucket_s).astype(np.int64), 0, len(self.timeline) - 1)
+        tx, ty = (x * self.time_grid).astype(np.int64), (y * self.time_grid).astype(np.int64)
+        np.add.at(self.timeline, (b, cls, ty, tx), 1)
+        np.add.at(self.series, (b, cls, 0), 1.0)
+        np.add.at(self.series, (b, cls, 1), x)
+        np.add.at(self.series, (b, cls, 2), y)
+
+    def add_detections(self, detections, frame_shape, t=0.0):
+        """
+        Adds the detections of one frame, as returned by the realtime loop or the inference
+        service: an (n, 6) array or list of (x1, y1, x2, y2, conf, cls) in pixels.
+
+        Parameters:
+        ----------
+        detections (array-like):
+            Detections of the frame.
+        frame_shape (tuple):
+            (height, width) of the minimap frame the boxes refer to.
+        t (float):
+            Game time of the frame in seconds.
+        """
+        dets = np.asarray(detections, dtype=np.float64).reshape(-1, 6)
+        h, w = frame_shape[:2]
+        self.add(dets[:, 5], (dets[:, 0] + dets[:, 2]) / 2 / w, (dets[:, 1] + dets[:, 3]) / 2 / h, t)
+
+    def end_game(self):
+        """
+        Marks the end of a game (only the games counter is kept; positions are already aggregated).
+        """
+        self.games += 1
+
+    def merge(self, other):
+        """
+        Adds the histograms of another aggregator with the same configuration.
+        """
+        if (self.counts.shape != other.counts.shape or self.timeline.shape != other.timeline.shape
+                or self.bucket_s != other.bucket_s):
+            raise ValueError("❌ Los agregadores tienen configuraciones distintas")
+        self.counts += other.counts
+        self.total += other.total
+        self.timeline += other.timeline
+        self.series += other.series
+        self.games += other.games
+        return self
+
+    def heatmap(self, cls=None, normalize=False):
+        """
+        Returns the position histogram of a class, or of all classes if cls is None. Without
+        normalize it is a view of the aggregated array (no copy).
+
+        Parameters:
+        ----------
+        cls (int or str, optional):
+            Class id or name.
+        normalize (bool):
+            If True, returns a float copy that sums to 1.
+        """
+        hist = self.total if cls is None else self.counts[self.class_id(cls)]
+        if not normalize:
+            return hist
+        s = hist.sum()
+        return hist / s if s else hist.astype(np.float64)
+
+    def heatmap_at(self, cls, start_s, end_s):
+        """
+        Returns the coarse histogram of a class between two game times (e.g. 0-900 s for laning phase).
+        """
+        b0 = int(start_s // self.bucket_s)
+        b1 = max(b0 + 1, int(np.ceil(end_s / self.bucket_s)))
+        return self.timeline[b0:b1, self.class_id(cls)].sum(axis=0)
+
+    def mean_positions(self, cls):
+        """
+        Returns the (buckets, 2) mean normalized position of a class per time bucket
+        (NaN where it was not detected), e.g. to follow a jungler's pathing.
+        """
+        s = self.series[:, self.class_id(cls)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return s[:, 1:] / s[:, :1]
+
+    def render(self, cls=None, size=512, background=None):
+        """
+        Renders a heatmap as a BGR color image, optionally blended over a minimap image.
+        """
+        hist = np.log1p(self.heatmap(cls).astype(np.float32))
+        if hist.max() > 0:
+            hist /= hist.max()
+        color = cv2.applyColorMap(cv2.resize((hist * 255).astype(np.uint8), (size, size),
+                                             interpolation=cv2.INTER_CUBIC), cv2.COLORMAP_JET)
+        if background is not None:
+            color = cv2.addWeighted(cv2.resize(background, (size, size)), 0.5, color, 0.5, 0)
+        return color
+
+    def save(self, path):
+        """
+        Saves the aggregator as a compressed .npz file.
+        """
+        names = np.array([self.names.get(i, str(i)) for i in range(self.num_classes)])
+        np.savez_compressed(path, version=HEATMAP_VERSION, counts=self.counts, total=self.total,
+                            timeline=self.timeline, series=self.series, names=names,
+                            bucket_s=self.bucket_s, games=self.games)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an aggregator saved with save().
+        """
+        with np.load(path) as data:
+            if int(data["version"]) != HEATMAP_VERSION:
+                raise ValueError(f"❌ Versión de heatmap no soportada en '{path}'")
+            buckets, num_classes, time_grid, _ = data["timeline"].shape
+            agg = cls(num_classes, grid=data["counts"].shape[1], time_grid=time_grid,
+                      bucket_s=float(data["bucket_s"]), buckets=buckets, names=list(data["names"]))
+            agg.counts[...] = data["counts"]
+            agg.total[...] = data["total"]
+            agg.timeline[...] = data["timeline"]
+            agg.series[...] = data["series"]
+            agg.games = int(data["games"])
+        return agg
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combina y dibuja heatmaps de detecciones")
+    parser.add_argument("inputs", nargs="+", help="Ficheros .npz guardados por HeatmapAggregator.")
+    parser.add_argument("--merge", type=str, default=None, help="Guarda la suma de todos en este .npz.")
+    parser.add_argument("--render", type=str, default=None, help="Guarda el heatmap como imagen.")
+    parser.add_argument("--champion", type=str, default=None, help="Campeón a dibujar (por defecto todos).")
+    parser.add_argument("--minimap", type=str, default=None, help="Imagen del minimapa de fondo.")
+    args = parser.parse_args()
+
+    agg = HeatmapAggregator.load(args.inputs[0])
+    for path in args.inputs[1:]:
+        agg.merge(HeatmapAggregator.load(path))
+    print(f"🗺️ {agg.games} partidas, {int(agg.total.sum())} detecciones")
+    if args.merge:
+        agg.save(args.merge)
+        print(f"💾 Guardado en '{args.merge}'")
+    if args.render:
+        background = cv2.imread(args.minimap) if args.minimap else None
+        cv2.imwrite(args.render, agg.render(args.champion, background=background))
+        print(f"🖼️ Heatmap guardado en '{args.render}'")
@@ -0,0 +1,507 @@
+import argparse
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Client, Listener
+import numpy as np
+
+# Pesos por defecto de detect y serve
+WEIGHTS = "E:/Repositorios/LeagueIA/train_model/models/characters_models/FirstModelWorking/LeagueIAModel/weights/best.pt"
+ADDRESS = ("127.0.0.1", 6010)
+# Clave del servicio en hexadecimal; si no está definida, cada ejecución genera una aleatoria
+KEY_ENV = "LEAGUEIA_SERVICE_KEY"
+
+
+def key_file(port):
+    """
+    Returns the file where the service listening on a port publishes its key for the clients
+    of the same user.
+    """
+    return os.path.join(os.path.expanduser("~"), ".leagueia", f"inference_{port}.key")
+
+
+def service_key():
+    """
+    Returns the key of a new service: the one in the KEY_ENV variable, or a random one for this run.
+    The connections are pickled, so whoever knows the key can run code in the service.
+    """
+    key = os.environ.get(KEY_ENV)
+    return bytes.fromhex(key) if key else secrets.token_bytes(32)
+
+
+def publish_key(port, key):
+    """
+    Writes the key of the service to its key file, readable only by the current user.
+    """
+    path = key_file(port)
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(key.hex())
+    os.chmod(path, 0o600)
+
+
+def read_key(port):
+    """
+    Returns the key of the service listening on a port: the one in the KEY_ENV variable or,
+    if it is not set, the one the service published in its key file.
+    """
+    key = os.environ.get(KEY_ENV)
+    if key:
+        return bytes.fromhex(key)
+    with open(key_file(port), "r", encoding="utf-8") as f:
+        return bytes.fromhex(f.read().strip())
+
+
+def yolo_predictor(weights, imgsz=800, device=None, conf=0.25):
+    """
+    Loads a YOLO model once and returns a batched predict function for InferenceService.
+
+    Parameters:
+    ----------
+    weights (str):
+        Path to the trained weights.
+    imgsz (int):
+        Inference image size.
+    device (str, optional):
+        Device to run on ('cpu', 'cuda:0'...). If None, ultralytics chooses.
+    conf (float):
+        Minimum confidence of the detections.
+
+    Returns:
+    -------
+    tuple:
+        (predict, names) where predict(frames) returns, for every frame, an (n, 6) float32
+        array [x1, y1, x2, y2, conf, cls], and names maps class ids to names.
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+
+    def predict(frames):
+        results = model(frames, imgsz=imgsz, device=device, conf=conf, verbose=False)
+        return [r.boxes.data.cpu().numpy().astype(np.float32) for r in results]
+
+    return predict, model.names
+
+
+def synthetic_predictor(base_ms=20.0, per_image_ms=2.0):
+    """
+    Returns a fake predict function whose cost, like a GPU forward pass, is a fixed
+    overhead plus a small cost per image. Used to test the service without a model.
+    """
+    def predict(frames):
+        time.sleep((base_ms + per_image_ms * len(frames)) / 1000)
+        return [np.array([[0, 0, 10, 10, 0.9, i % 3]], dtype=np.float32) for i in range(len(frames))]
+
+    return predict, {0: "a", 1: "b", 2: "c"}
+
+
+class InferenceService:
+    """
+    Local inference server shared by several streams (one per game being watched).
+    The model is loaded once; producers connect through a multiprocessing Listener and
+    send minimap crops, which are grouped in batches of up to max_batch frames, waiting at
+    most max_wait seconds after the oldest queued frame. Detections go back to the
+    connection that sent each frame, tagged with its stream and sequence number.
+
+    Messages from clients:
+        ("frame", stream, seq, frame)   frame to detect
+        ("metrics",)                    asks for the service metrics
+    Messages to clients:
+        ("hello", names)                sent on connect
+        ("detections", stream, seq, detections, latency)
+        ("dropped", stream, seq)        the queue was full
+        ("error", stream, seq, message) the model failed on the batch of the frame
+        ("metrics", dict)
+
+    Attributes:
+    ----------
+    predict (callable):
+        Function mapping a list of frames to a list of (n, 6) detection arrays.
+    names (dict):
+        Class names of the model.
+    max_batch (int):
+        Maximum frames per batch.
+    max_wait (float):
+        Latency budget: seconds the oldest frame may wait for the batch to fill.
+    requests (queue.Queue):
+        Pending frames.
+    """
+
+    def __init__(self, predict, names=None, address=ADDRESS, authkey=None,
+                 max_batch=16, max_wait=0.01, max_queue=256):
+        """
+        Parameters:
+        ----------
+        predict (callable):
+            Batched predict function (see yolo_predictor and synthetic_predictor).
+        names (dict, optional):
+            Class names of the model, sent to clients.
+        address (tuple):
+            (host, port) to listen on.
+        authkey (bytes, optional):
+            Key clients must use to connect. If None, see service_key.
+        max_batch (int):
+            Maximum frames per batch.
+        max_wait (float):
+            Maximum seconds the oldest frame waits for more frames.
+        max_queue (int):
+            Maximum pending frames; new frames are dropped beyond it.
+        """
+        self.predict = predict
+        self.names = names or {}
+        self.address = address
+        self.authkey = authkey or service_key()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue(maxsize=max_queue)
+        self.listener = None
+        self.running = False
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.frames = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.latencies = deque(maxlen=1000)
+        self.recent = deque(maxlen=1000)
+        self.streams = {}
+
+    def start(self):
+        """
+        Starts listening and batching in background threads and returns the service.
+        """
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.address = self.listener.address
+        self.running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        return self
+
+    def serve_forever(self, report_every=10.0):
+        """
+        Runs the service in the current thread, printing its metrics periodically.
+        Its key is published in key_file(port) while it runs, for the clients of the same user.
+        """
+        self.start()
+        publish_key(self.address[1], self.authkey)
+        print(f"🛰️ Servicio de inferencia en {self.address[0]}:{self.address[1]}, clave en "
+              f"'{key_file(self.address[1])}'. Ctrl+C para salir.")
+        try:
+            while True:
+                time.sleep(report_every)
+                print_metrics(self.metrics())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            if os.path.isfile(key_file(self.address[1])):
+                os.remove(key_file(self.address[1]))
+
+    def stop(self):
+        self.running = False
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+    def _accept(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                continue  # a client with a wrong key is rejected, the rest keep connecting
+            except (OSError, EOFError):
+                break
+            conn.send(("hello", self.names))
+            threading.Thread(target=self._serve, args=(conn, threading.Lock()), daemon=True).start()
+
+    def _serve(self, conn, send_lock):
+        # One thread per client: only receives; replies are sent by the batcher
+        try:
+            while self.running:
+                msg = conn.recv()
+                if msg[0] == "frame":
+                    _, stream, seq, frame = msg
+                    try:
+                        self.requests.put_nowait((time.monotonic(), conn, send_lock, stream, seq, frame))
+                    except queue.Full:
+                        with self.lock:
+                            self.dropped += 1
+                        with send_lock:
+                            conn.send(("dropped", stream, seq))
+                    depth = self.requests.qsize()
+                    if depth > self.max_depth:
+                        self.max_depth = depth
+                elif msg[0] == "metrics":
+                    with send_lock:
+                        conn.send(("metrics", self.metrics()))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def next_batch(self):
+        """
+        Waits for the first pending frame and collects more until the batch is full or the
+        latency budget of that first frame runs out.
+
+        Returns:
+        -------
+        list:
+            Pending requests of the batch (empty if nothing arrived within a second).
+        """
+        try:
+            first = self.requests.get(timeout=1.0)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first[0] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.requests.get(timeout=remaining) if remaining > 0
+                             else self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self):
+        while self.running:
+            batch = self.next_batch()
+            if not batch:
+                continue
+            try:
+                detections = self.predict([req[5] for req in batch])
+            except Exception as e:
+                # Un lote fallido no puede tumbar el servicio: se avisa a sus clientes y se sigue
+                print(f"[ERROR] Fallo del modelo en un lote de {len(batch)} frames: {e!r}")
+                with self.lock:
+                    self.errors += len(batch)
+                self._reply(batch, [("error", req[3], req[4], repr(e)) for req in batch])
+                continue
+            now = time.monotonic()
+            with self.lock:
+                self.frames += len(batch)
+                self.batches += 1
+                self.recent.extend([now] * len(batch))
+                for arrived, _, _, stream, _, _ in batch:
+                    self.latencies.append(now - arrived)
+                    self.streams[stream] = self.streams.get(stream, 0) + 1
+            self._reply(batch, [("detections", stream, seq, dets, now - arrived)
+                                for (arrived, _, _, stream, seq, _), dets in zip(batch, detections)])
+
+    def _reply(self, batch, messages):
+        # Sends its reply to the client of every request of a batch
+        for (_, conn, send_lock, _, _, _), msg in zip(batch, messages):
+            try:
+                with send_lock:
+                    conn.send(msg)
+            except (OSError, EOFError):
+                pass  # the client left
+
+    def metrics(self):
+        """
+        Returns the service metrics.
+
+        Returns:
+        -------
+        dict:
+            Frames processed, batches, mean batch size, throughput over the last
+            seconds and overall, queue depth (current and maximum), dropped frames,
+            latency percentiles in ms and frames per stream.
+        """
+        with self.lock:
+            now = time.monotonic()
+            window = [t for t in self.recent if now - t <= 5.0]
+            latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+            return {
+                "frames": self.frames,
+                "batches": self.batches,
+                "mean_batch": self.frames / self.batches if self.batches else 0.0,
+                "fps": len(window) / 5.0,
+                "fps_total": self.frames / (now - self.started),
+                "queue_depth": self.requests.qsize(),
+                "max_queue_depth": self.max_depth,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "latency_ms_p50": float(np.percentile(latencies, 50)),
+                "latency_ms_p95": float(np.percentile(latencies, 95)),
+                "streams": dict(self.streams),
+            }
+
+
+class InferenceClient:
+    """
+    Connection of one stream to an InferenceService.
+
+    Attributes:
+    ----------
+    stream (str):
+        Name of the stream, returned with every detection.
+    names (dict):
+        Class names of the model served.
+    """
+
+    def __init__(self, stream, address=ADDRESS, authkey=None, timeout=10.0):
+        """
+        Connects to the service, retrying until timeout seconds.
+
+        Parameters:
+        ----------
+        stream (str):
+            Name of the stream.
+        address (tuple):
+            (host, port) of the service.
+        authkey (bytes, optional):
+            Key of the service. If None, it is read with read_key.
+        timeout (float):
+            Seconds to keep retrying while the service starts.
+        """
+        self.stream = stream
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.conn = Client(tuple(address), authkey=authkey or read_key(address[1]))
+                break
+            except (ConnectionRefusedError, FileNotFoundError, AuthenticationError) as e:
+                # Al arrancar, el servicio puede no haber publicado aún su clave (o quedar la de
+                # una ejecución anterior)
+                if time.monotonic() > deadline:
+                    if isinstance(e, FileNotFoundError):
+                        raise FileNotFoundError(f"❌ No hay clave del servicio en '{key_file(address[1])}' "
+                                                f"ni en la variable {KEY_ENV}") from e
+                    raise
+                time.sleep(0.1)
+        _, self.names = self.conn.recv()
+        self.seq = 0
+
+    def submit(self, frame):
+        """
+        Sends a frame without waiting for its detections and returns its sequence number.
+        """
+        self.seq += 1
+        self.conn.send(("frame", self.stream, self.seq, frame))
+        return self.seq
+
+    def receive(self, timeout=None):
+        """
+        Returns the next reply, ("detections", stream, seq, detections, latency),
+        ("dropped", stream, seq) or ("error", stream, seq, message), or None on timeout.
+        """
+        if timeout is not None and not self.conn.poll(timeout):
+            return None
+        return self.conn.recv()
+
+    def infer(self, frame, timeout=5.0):
+        """
+        Sends a frame and waits for its detections.
+
+        Parameters:
+        ----------
+        frame (np.ndarray):
+            Frame to detect.
+        timeout (float):
+            Maximum seconds to wait for the reply.
+
+        Returns:
+        -------
+        np.ndarray or None:
+            (n, 6) array [x1, y1, x2, y2, conf, cls], or None if the service dropped the frame,
+            the model failed on it or no reply arrived within timeout.
+        """
+        seq = self.submit(frame)
+        deadline = time.monotonic() + timeout
+        while True:
+            reply = self.receive(max(0.0, deadline - time.monotonic()))
+            if reply is None:
+                return None
+            if reply[0] in ("detections", "dropped", "error") and reply[2] == seq:
+                return reply[3] if reply[0] == "detections" else None
+
+    def metrics(self, timeout=5.0):
+        """
+        Asks the service for its metrics, or returns None if they don't arrive within timeout seconds.
+        """
+        self.conn.send(("metrics",))
+        deadline = time.monotonic() + timeout
+        while True:
+            reply = self.receive(max(0.0, deadline - time.monotonic()))
+            if reply is None:
+                return None
+            if reply[0] == "metrics":
+                return reply[1]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def print_metrics(m):
+    print(f"📈 {m['fps']:.1f} fps ({m['frames']} frames, lote medio {m['mean_batch']:.1f}) | "
+          f"cola {m['queue_depth']} (máx {m['max_queue_depth']}) | "
+          f"latencia p50 {m['latency_ms_p50']:.1f} ms, p95 {m['latency_ms_p95']:.1f} ms | "
+          f"descartados {m['dropped']} | errores {m['errors']}")
+
+
+def synthetic_producer(stream, address=ADDRESS, authkey=None, frames=200, fps=30.0, shape=(256, 256, 3)):
+    """
+    Simulates one analyst stream: sends random minimap crops at a fixed rate, synchronously
+    like realtime_detection.py does, and prints its own latency.
+    """
+    rng = np.random.default_rng(abs(hash(stream)) % 2 ** 32)
+    latencies = []
+    with InferenceClient(stream, address, authkey) as client:
+        for _ in range(frames):
+            start = time.monotonic()
+            client.infer(rng.integers(0, 255, shape, dtype=np.uint8))
+            latencies.append(time.monotonic() - start)
+            time.sleep(max(0.0, 1 / fps - latencies[-1]))
+    print(f"🎮 {stream}: {frames} frames, latencia media {np.mean(latencies) * 1000:.1f} ms")
+
+
+def demo(streams=4, frames=200, fps=30.0, max_batch=16, max_wait=0.01):
+    """
+    Runs the service with synthetic_predictor and several synthetic producer processes.
+    """
+    predict, names = synthetic_predictor()
+    service = InferenceService(predict, names, address=("127.0.0.1", 0),
+                               max_batch=max_batch, max_wait=max_wait).start()
+    producers = [Process(target=synthetic_producer, args=(f"stream{i}", service.address, service.authkey, frames, fps))
+                 for i in range(streams)]
+    for p in producers:
+        p.start()
+    for p in producers:
+        p.join()
+    print_metrics(service.metrics())
+    service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de inferencia por lotes para varias partidas")
+    parser.add_argument("--weights", type=str, default=None, help="Pesos del modelo entrenado.")
+    parser.add_argument("--port", type=int, default=ADDRESS[1], help="Puerto local.")
+    parser.add_argument("--imgsz", type=int, default=800)
+    parser.add_argument("--device", type=str, default=None)
+    parser.add_argument("--max-batch", type=int, default=16, help="Frames máximos por lote.")
+    parser.add_argument("--max-wait", type=float, default=10.0, help="Espera máxima por lote en ms.")
+    parser.add_argument("--demo", type=int, default=0, help="Prueba con N productores sintéticos y un modelo falso.")
+    args = parser.parse_args()
+
+    if args.demo:
+        demo(args.demo, max_batch=args.max_batch, max_wait=args.max_wait / 1000)
+    else:
+        predict, names = yolo_predictor(args.weights or WEIGHTS, imgsz=args.imgsz, device=args.device)
+        InferenceService(predict, names, address=("127.0.0.1", args.port),
+                         max_batch=args.max_batch, max_wait=args.max_wait / 1000).serve_forever()
@@ -0,0 +1,201 @@
+import os
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+from dataset_index import IMAGE_EXTENSIONS
+
+MMAP_VERSION = 3
+
+
+def mmap_dir_for(images_dir, imgsz):
+    """
+    Returns the folder of the memory-mapped copy of a split, next to its images folder
+    (e.g. prepared_data/train/mmap_800 for prepared_data/train/images).
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(images_dir)), f"mmap_{imgsz}")
+
+
+def file_stats(images_dir, labels_dir, files):
+    """
+    Returns the [size, mtime_ns] of every image and of its label file ([-1, -1] if it has none),
+    so a split whose files were regenerated under the same names is built again.
+    """
+    stats = []
+    for f in files:
+        st = os.stat(os.path.join(images_dir, f))
+        label_path = os.path.join(labels_dir, os.path.splitext(f)[0] + ".txt")
+        lst = os.stat(label_path) if os.path.isfile(label_path) else None
+        stats.append([st.st_size, st.st_mtime_ns] + ([lst.st_size, lst.st_mtime_ns] if lst else [-1, -1]))
+    return stats
+
+
+def read_labels(label_path):
+    """
+    Reads a YOLO label file as a (n, 5) float32 array [cls, x, y, w, h].
+    """
+    if not os.path.isfile(label_path):
+        return np.zeros((0, 5), dtype=np.float32)
+    with open(label_path, "r", encoding="utf-8") as f:
+        rows = [line.split()[:5] for line in f if line.strip()]
+    return np.array(rows, dtype=np.float32).reshape(-1, 5)
+
+
+def build_mmap_dataset(images_dir, labels_dir, out_dir, imgsz=800, workers=8):
+    """
+    Decodes every image of a split once, resizes it to the training resolution and stores
+    all of them in a single uint8 memory-mapped array, with the labels in a companion array.
+    Training then reads the pixels straight from the page cache instead of decoding PNGs
+    every epoch, and all the dataloader workers share the same pages.
+
+    Files written in out_dir:
+        images.npy  (N, imgsz, imgsz, 3) uint8, BGR, each image at the top-left of its slot
+        shapes.npy  (N, 4) int32, original (h0, w0) and resized (h, w) size of each image
+        labels.npy  (M, 5) float32, [cls, x, y, w, h] normalized, for all images
+        offsets.npy (N + 1,) int64, labels of image i are labels[offsets[i]:offsets[i + 1]]
+        meta.json   version, imgsz, the image file names in order and the size and mtime
+                    of every image and label file (see is_built)
+
+    Parameters:
+    ----------
+    images_dir (str):
+        Directory containing the images of the split.
+    labels_dir (str):
+        Directory containing the YOLO labels of the split.
+    out_dir (str):
+        Directory where the arrays will be written.
+    imgsz (int):
+        Training image size; the long side of every image is resized to it.
+    workers (int):
+        Number of decoding threads (OpenCV releases the GIL while decoding).
+
+    Returns:
+    -------
+    int:
+        Number of images stored.
+    """
+    files = sorted(f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+    stats = file_stats(images_dir, labels_dir, files)
+    os.makedirs(out_dir, exist_ok=True)
+    meta_path = os.path.join(out_dir, "meta.json")
+    if os.path.isfile(meta_path):
+        os.remove(meta_path)  # marks the folder as incomplete until the end
+
+    images = np.lib.format.open_memmap(os.path.join(out_dir, "images.npy"), mode="w+",
+                                       dtype=np.uint8, shape=(len(files), imgsz, imgsz, 3))
+    shapes = np.zeros((len(files), 4), dtype=np.int32)
+
+    def load(i):
+        im = cv2.imread(os.path.join(images_dir, files[i]), cv2.IMREAD_COLOR)
+        if im is None:
+            raise FileNotFoundError(f"❌ No se pudo leer la imagen: {files[i]}")
+        h0, w0 = im.shape[:2]
+        r = imgsz / max(h0, w0)
+        if r != 1:
+            # Mismo redondeo e interpolación que YOLODataset.load_image
+            h, w = min(math.ceil(h0 * r), imgsz), min(math.ceil(w0 * r), imgsz)
+            im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+        h, w = im.shape[:2]
+        images[i, :h, :w] = im
+        shapes[i] = (h0, w0, h, w)
+        return read_labels(os.path.join(labels_dir, os.path.splitext(files[i])[0] + ".txt"))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        labels = list(executor.map(load, range(len(files))))
+
+    images.flush()
+    del images
+    offsets = np.zeros(len(files) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(lb) for lb in labels])
+    all_labels = np.concatenate(labels) if labels else np.zeros((0, 5), dtype=np.float32)
+    np.save(os.path.join(out_dir, "shapes.npy"), shapes)
+    np.save(os.path.join(out_dir, "labels.npy"), all_labels.astype(np.float32))
+    np.save(os.path.join(out_dir, "offsets.npy"), offsets)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MMAP_VERSION, "imgsz": imgsz, "files": files, "stats": stats}, f)
+    return len(files)
+
+
+class MMapDataset:
+    """
+    Read-only access to a split written by build_mmap_dataset().
+    The arrays are memory-mapped lazily in each process, so the object can be sent to
+    dataloader workers without copying the images.
+
+    Attributes:
+    ----------
+    path (str):
+        Folder of the memory-mapped split.
+    imgsz (int):
+        Size the images were stored at.
+    files (list):
+        Image file names, in the order of the arrays.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        ----------
+        path (str):
+            Folder written by build_mmap_dataset().
+        """
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != MMAP_VERSION:
+            raise ValueError(f"❌ Versión de dataset mmap no soportada en '{path}'")
+        self.imgsz = meta["imgsz"]
+        self.files = meta["files"]
+        self.index = {name: i for i, name in enumerate(self.files)}
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    @property
+    def arrays(self):
+        if self._arrays is None:
+            load = lambda name, mode: np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=mode)
+            self._arrays = {
+                "images": load("images", "r"),
+                "shapes": load("shapes", None),
+                "labels": load("labels", None),
+                "offsets": load("offsets", None),
+            }
+        return self._arrays
+
+    def image(self, i):
+        """
+        Returns a zero-copy view of image i at its stored size and its original (h0, w0) size.
+        """
+        h0, w0, h, w = (int(v) for v in self.arrays["shapes"][i])
+        return self.arrays["images"][i, :h, :w], (h0, w0)
+
+    def labels(self, i):
+        """
+        Returns the (n, 5) labels [cls, x, y, w, h] of image i.
+        """
+        offsets = self.arrays["offsets"]
+        return self.arrays["labels"][offsets[i]:offsets[i + 1]]
+
+
+def is_built(out_dir, images_dir, imgsz, labels_dir):
+    """
+    Returns True if out_dir holds a complete memory-mapped copy of images_dir at imgsz, built
+    from the same files: an image or label edited or regenerated since then (different size or
+    mtime) makes it stale.
+    """
+    meta_path = os.path.join(out_dir, "meta.json")
+    if not os.path.isfile(meta_path):
+        return False
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    files = sorted(f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+    return (meta.get("version") == MMAP_VERSION and meta.get("imgsz") == imgsz and meta.get("files") == files
+            and meta.get("stats") == file_stats(images_dir, labels_dir, files))
@@ -0,0 +1,98 @@
+import os
+import math
+import cv2
+import numpy as np
+from ultralytics.data.dataset import YOLODataset
+from ultralytics.utils import colorstr
+from ultralytics.models.yolo.detect import DetectionTrainer
+from mmap_dataset import MMapDataset, mmap_dir_for
+
+
+class MMapYOLODataset(YOLODataset):
+    """
+    YOLODataset that takes images and labels from an MMapDataset instead of decoding
+    the files.
+    """
+
+    def __init__(self, *args, mmap_path, **kwargs):
+        """
+        Parameters:
+        ----------
+        mmap_path (str):
+            Folder of the memory-mapped split (see build_mmap_dataset).
+        *args, **kwargs:
+            Arguments of YOLODataset.
+        """
+        self.mmap = MMapDataset(mmap_path)
+        super().__init__(*args, **kwargs)
+
+    def get_labels(self):
+        labels = []
+        for im_file in self.im_files:
+            i = self.mmap.index.get(os.path.basename(im_file))
+            if i is None:
+                raise FileNotFoundError(f"❌ '{im_file}' no está en el dataset mmap, vuelve a generarlo")
+            h0, w0 = (int(v) for v in self.mmap.arrays["shapes"][i][:2])
+            lb = np.array(self.mmap.labels(i), dtype=np.float32)
+            labels.append({
+                "im_file": im_file,
+                "shape": (h0, w0),
+                "cls": lb[:, 0:1],
+                "bboxes": lb[:, 1:],
+                "segments": [],
+                "keypoints": None,
+                "normalized": True,
+                "bbox_format": "xywh",
+            })
+        return labels
+
+    def load_image(self, i, rect_mode=True):
+        im, (h0, w0) = self.mmap.image(self.mmap.index[os.path.basename(self.im_files[i])])
+        # Copia propia: algunas aumentaciones trabajan in-place y el mapa es de solo lectura
+        im = np.array(im)
+        if not rect_mode:
+            im = cv2.resize(im, (self.imgsz, self.imgsz), interpolation=cv2.INTER_LINEAR)
+        elif max(im.shape[:2]) != self.imgsz:
+            # Mismo redondeo que YOLODataset.load_image, para que los tamaños coincidan
+            r = self.imgsz / max(h0, w0)
+            im = cv2.resize(im, (min(math.ceil(w0 * r), self.imgsz), min(math.ceil(h0 * r), self.imgsz)),
+                            interpolation=cv2.INTER_LINEAR)
+        if self.augment:
+            # El mosaico elige sus imágenes extra del buffer
+            self.buffer.append(i)
+            if 1 < len(self.buffer) >= self.max_buffer_length:
+                self.buffer.pop(0)
+        return im, (h0, w0), im.shape[:2]
+
+
+class MMapDetectionTrainer(DetectionTrainer):
+    """
+    DetectionTrainer that reads every split from its memory-mapped copy when it exists
+    (see build_mmap_dataset), and from the image files otherwise.
+    """
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        mmap_path = mmap_dir_for(img_path, self.args.imgsz)
+        if not os.path.isfile(os.path.join(mmap_path, "meta.json")):
+            return super().build_dataset(img_path, mode, batch)
+        # Mismos argumentos que ultralytics.data.build.build_yolo_dataset, con el dataset mmap
+        model = getattr(self.model, "module", self.model)
+        stride = max(int(model.stride.max() if model else 0), 32)
+        return MMapYOLODataset(
+            img_path=img_path,
+            mmap_path=mmap_path,
+            imgsz=self.args.imgsz,
+            batch_size=batch,
+            augment=mode == "train",
+            hyp=self.args,
+            rect=self.args.rect or mode == "val",
+            cache=self.args.cache or None,
+            single_cls=self.args.single_cls or False,
+            stride=stride,
+            pad=0.0 if mode == "train" else 0.5,
+            prefix=colorstr(f"{mode}: "),
+            task=self.args.task,
+            classes=self.args.classes,
+            data=self.data,
+            fraction=self.args.fraction if mode == "train" else 1.0,
+        )
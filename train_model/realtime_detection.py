@@ -1,11 +1,92 @@
+import argparse
+import time
+from contextlib import nullcontext
 import cv2
 import numpy as np
-import mss
-from ultralytics import YOLO
+from frame_bus import FrameBus, FrameReader
+from frame_gate import FrameGate
+from inference_service import InferenceClient, WEIGHTS
+from heatmap import HeatmapAggregator
+from detection_store import DetectionStore
 
-def main():
-    # Carga tu modelo entrenado
-    model = YOLO("E:/Repositorios/LeagueIA/train_model/models/characters_models/FirstModelWorking/LeagueIAModel/weights/best.pt")
+# mss y ultralytics (y con él torch) se importan solo donde se captura la pantalla o se carga el modelo
+
+def capture(bus_name, slots=8, monitor_index=0):
+    """
+    Captures the screen once and publishes every frame on a shared-memory FrameBus,
+    so the detector, a recorder or any other consumer can read it without grabbing the screen again.
+    
+    Parameters:
+    ----------
+    bus_name (str):
+        Name of the bus to create.
+    slots (int):
+        Number of frames kept in the ring buffer.
+    monitor_index (int):
+        Index of the mss monitor to capture (0 = all monitors).
+    """
+    import mss
+
+    with mss.mss() as sct:
+        monitor = sct.monitors[monitor_index]
+        shape = (monitor["height"], monitor["width"], 3)
+        with FrameBus.create(bus_name, shape, slots=slots) as bus:
+            print(f"📡 Publicando capturas en el bus '{bus_name}'. Ctrl+C para salir.")
+            try:
+                while True:
+                    sct_img = np.asarray(sct.grab(monitor))
+                    with bus.writing() as (_, slot):
+                        cv2.cvtColor(sct_img, cv2.COLOR_BGRA2BGR, dst=slot)
+            except KeyboardInterrupt:
+                pass
+
+def record(bus_name, output_path="capture.mp4", fps=30.0):
+    """
+    Records the frames of a FrameBus to a video file.
+    
+    Parameters:
+    ----------
+    bus_name (str):
+        Name of the bus to read from.
+    output_path (str):
+        Path of the video file.
+    fps (float):
+        Frame rate written in the video.
+    """
+    bus = FrameBus.attach(bus_name, timeout=10)
+    reader = FrameReader(bus)
+    h, w, _ = bus.shape
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    print(f"⏺️ Grabando el bus '{bus_name}' en '{output_path}'. Ctrl+C para salir.")
+    try:
+        for _, frame, _ in reader:
+            writer.write(frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.release()
+        bus.close()
+        print(f"✅ Grabación terminada ({reader.dropped} frames perdidos)")
+
+def main(weights=WEIGHTS, bus_name=None, diff_threshold=4.0, block_threshold=12.0, max_skip=30,
+         service=None, stream="detect", heatmap_path=None, store_path=None, game=0):
+    # Usa el servicio de inferencia compartido si se indica; si no, carga tu modelo entrenado
+    client = InferenceClient(stream, service) if service else None
+    model = None
+    if client is None:
+        from ultralytics import YOLO
+        model = YOLO(weights)
+    names = client.names if client else model.names
+
+    # Acumula las posiciones detectadas en un heatmap que se guarda al salir
+    heatmap = HeatmapAggregator(len(names), names=names) if heatmap_path else None
+    # Guarda cada detección en el almacén columnar para consultarla después por campeón o tiempo
+    store = DetectionStore(store_path, num_classes=max(len(names), 1)) if store_path else None
+    start = time.monotonic()
+
+    # Reutiliza las detecciones anteriores mientras el frame apenas cambie (0 = siempre predice)
+    gate = FrameGate(threshold=diff_threshold, block_threshold=block_threshold, max_skip=max_skip)
+    detections = []
 
     # Crear ventana redimensionable con tamaño inicial 1280x720 (16:9)
     win_name = "Detección Minimap LoL"
@@ -13,26 +94,45 @@ def main():
     cv2.resizeWindow(win_name, 500, 500)
     cv2.setWindowProperty(win_name, cv2.WND_PROP_ASPECT_RATIO, cv2.WINDOW_KEEPRATIO)
 
-    # Inicializa captura de pantalla con mss
-    with mss.mss() as sct:
-        monitor = sct.monitors[0]  # Monitor principal
+    # Lee del bus compartido si hay uno; si no, captura la pantalla con mss
+    bus = FrameBus.attach(bus_name, timeout=10) if bus_name else None
+    reader = FrameReader(bus) if bus else None
+
+    if not reader:
+        import mss
+    with mss.mss() if not reader else nullcontext() as sct:
+        monitor = sct.monitors[0] if sct else None  # Monitor principal
         print("🔍 Iniciando detección en tiempo real. Pulsa 'q' para salir.")
 
         while True:
-            # Captura la pantalla
-            sct_img = sct.grab(monitor)
-            frame = np.array(sct_img)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+            if reader:
+                # Copia propia: se dibuja sobre el frame
+                _, frame, _ = reader.next(copy=True)
+            else:
+                # Captura la pantalla
+                sct_img = sct.grab(monitor)
+                frame = np.array(sct_img)
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
 
-            # Realiza predicción
-            results = model(frame)[0]
+            # Realiza predicción solo si el frame ha cambiado
+            if gate.should_infer(frame):
+                if client:
+                    boxes = client.infer(frame)
+                    if boxes is not None:
+                        detections = [(*map(int, b[:4]), float(b[4]), int(b[5])) for b in boxes]
+                else:
+                    results = model(frame, verbose=False)[0]
+                    detections = [(*map(int, box.xyxy[0]), float(box.conf[0]), int(box.cls[0]))
+                                  for box in results.boxes]
+                # Solo los frames predichos: los reutilizados repetirían las mismas posiciones
+                if heatmap and detections:
+                    heatmap.add_detections(detections, frame.shape, time.monotonic() - start)
+                if store and detections:
+                    store.add_detections(detections, frame.shape, time.monotonic() - start, game=game)
 
             # Dibuja cajas y etiquetas
-            for box in results.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls = int(box.cls[0])
-                label = f"{model.names[cls]} {conf:.2f}"
+            for x1, y1, x2, y2, conf, cls in detections:
+                label = f"{names[cls]} {conf:.2f}"
 
                 cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
                 cv2.putText(frame, label, (x1, y1 - 10),
@@ -55,6 +155,46 @@ def main():
                 break
 
     cv2.destroyAllWindows()
+    if bus:
+        bus.close()
+    if client:
+        client.close()
+    if heatmap:
+        heatmap.end_game()
+        heatmap.save(heatmap_path)
+        print(f"🗺️ Heatmap guardado en '{heatmap_path}'")
+    if store:
+        store.close()
+        print(f"🗄️ {len(store)} detecciones en '{store_path}'")
+
+    stats = gate.stats()
+    print(f"📉 Inferencias: {stats['inferences']}/{stats['frames']} "
+          f"({stats['skipped']} reutilizadas, {stats['skip_ratio']:.0%})")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Detección del minimapa en tiempo real")
+    parser.add_argument("mode", nargs="?", default="detect", choices=["detect", "capture", "record"],
+                        help="detect: detecta; capture: publica la pantalla en el bus; record: graba el bus.")
+    parser.add_argument("--weights", type=str, default=WEIGHTS, help="Pesos del modelo entrenado.")
+    parser.add_argument("--bus", type=str, default=None, help="Nombre del bus de memoria compartida.")
+    parser.add_argument("--slots", type=int, default=8, help="Frames en el buffer circular (capture).")
+    parser.add_argument("--output", type=str, default="capture.mp4", help="Vídeo de salida (record).")
+    parser.add_argument("--diff-threshold", type=float, default=4.0, help="Diferencia media para volver a predecir (0 = siempre).")
+    parser.add_argument("--block-threshold", type=float, default=12.0, help="Diferencia de un bloque para volver a predecir.")
+    parser.add_argument("--max-skip", type=int, default=30, help="Frames seguidos máximos sin predecir.")
+    parser.add_argument("--service", type=int, default=None, help="Puerto del servicio de inferencia compartido.")
+    parser.add_argument("--stream", type=str, default="detect", help="Nombre de esta partida en el servicio.")
+    parser.add_argument("--heatmap", type=str, default=None, help="Guarda el heatmap de posiciones en este .npz.")
+    parser.add_argument("--store", type=str, default=None, help="Carpeta del almacén de detecciones.")
+    parser.add_argument("--game", type=int, default=0, help="Identificador de la partida en el almacén.")
+    args = parser.parse_args()
+
+    if args.mode == "capture":
+        capture(args.bus or "yolol_frames", slots=args.slots)
+    elif args.mode == "record":
+        record(args.bus or "yolol_frames", args.output)
+    else:
+        main(args.weights, bus_name=args.bus, diff_threshold=args.diff_threshold,
+             block_threshold=args.block_threshold, max_skip=args.max_skip,
+             service=("127.0.0.1", args.service) if args.service else None, stream=args.stream,
+             heatmap_path=args.heatmap, store_path=args.store, game=args.game)
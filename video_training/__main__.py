@@ -1,9 +1,24 @@
 
 import os
+import json
+import argparse
+from contextlib import nullcontext
 import cv2
 from tqdm import tqdm
+from adaptive_sampling import AdaptiveSampler, MINIMAP_REGION
+from hud_recognizer import HudRecognizer, HUD_LAYOUT, load_layout
+from frame_dedup import FrameDedupIndex
 
-def extract_frames_instant(video_path, interval_s: int = 30):
+def write_hud(log, out_path, t, frame, hud):
+    """
+    Appends the items and summoner spells read in a saved frame to the hud.jsonl of its video.
+    """
+    if hud:
+        record = {"frame": os.path.basename(out_path), "t": round(t, 3), "slots": hud.recognize(frame)}
+        log.write(json.dumps(record) + "\n")
+
+def extract_frames_instant(video_path, interval_s: int = 30, hud: HudRecognizer = None,
+                           dedup: FrameDedupIndex = None):
     """
     Extract frames from a video at specified intervals and save them as PNG files.
     Parameters:
@@ -12,6 +27,12 @@ def extract_frames_instant(video_path, interval_s: int = 30):
         Path to the video file.
     interval_s (int): 
         Interval in seconds at which to extract frames.
+    hud (HudRecognizer, optional):
+        If given, the HUD items and summoner spells of every saved frame are written to
+        frames/<video>/hud.jsonl.
+    dedup (FrameDedupIndex, optional):
+        If given, frames that are near-duplicates of a frame already in the index (of this
+        or any earlier video) are not saved.
     """
 
     parent = os.path.dirname(video_path)
@@ -35,25 +56,138 @@ def extract_frames_instant(video_path, interval_s: int = 30):
 
     print(f"📸 {name}: {len(frame_indices)} frames cada {interval_s}s")
 
-    for idx, frame_no in tqdm(enumerate(frame_indices, 1),
-                              total=len(frame_indices),
-                              desc=name):
-        
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
-        ret, frame = cap.read()
-        if not ret:
-            continue
+    duplicates = 0
+
+    with (open(os.path.join(frames_dir, "hud.jsonl"), "a", encoding="utf-8") if hud else nullcontext()) as log:
+        for idx, frame_no in tqdm(enumerate(frame_indices, 1),
+                                  total=len(frame_indices),
+                                  desc=name):
+            
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+            ret, frame = cap.read()
+            if not ret:
+                continue
 
-        out_path = os.path.join(frames_dir, f"{name}_{times[idx-1]:04d}.png")
-        cv2.imwrite(out_path, frame, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+            out_path = os.path.join(frames_dir, f"{name}_{times[idx-1]:04d}.png")
+            if dedup and dedup.add(frame, out_path) is not None:
+                duplicates += 1
+                continue
+            cv2.imwrite(out_path, frame, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+            write_hud(log, out_path, times[idx - 1], frame, hud)
 
     cap.release()
+    if dedup:
+        print(f"♻️ {duplicates} frames casi duplicados descartados")
     print(f"✅ Guardados en: {frames_dir}\n")
 
-def main():
+def extract_frames_adaptive(video_path, sampler: AdaptiveSampler = None, analysis_fps: float = 2.0,
+                            hud: HudRecognizer = None, dedup: FrameDedupIndex = None):
+    """
+    Extract frames from a video where the minimap shows activity, in a single sequential
+    decode pass (no seeking). Every frame is decoded, but only analysis_fps frames per
+    second are converted and scored by the sampler; the frames it keeps are saved as PNG.
+    Parameters:
+    ----------
+    video_path (str): 
+        Path to the video file.
+    sampler (AdaptiveSampler, optional):
+        Decides which frames to keep. If None, one with the default settings is used.
+    analysis_fps (float):
+        Frames per second scored by the sampler.
+    hud (HudRecognizer, optional):
+        If given, the HUD items and summoner spells of every saved frame are written to
+        frames/<video>/hud.jsonl.
+    dedup (FrameDedupIndex, optional):
+        If given, frames that are near-duplicates of a frame already in the index (of this
+        or any earlier video) are not saved.
+
+    Returns:
+    -------
+    dict:
+        Counters of the sampler, or None if the video could not be opened.
+    """
+    sampler = sampler or AdaptiveSampler()
+
+    parent = os.path.dirname(video_path)
+    frames_root = os.path.join(parent, "frames")
+    name, _ = os.path.splitext(os.path.basename(video_path))
+    frames_dir = os.path.join(frames_root, name)
+    os.makedirs(frames_dir, exist_ok=True)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] No se pudo abrir: {video_path}")
+        return None
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    step = max(1, round(fps / analysis_fps))
+
+    print(f"📸 {name}: muestreo adaptativo ({analysis_fps:g} fps analizados)")
+
+    frame_no = 0
+    duplicates = 0
+    with tqdm(total=total_frames or None, desc=name) as bar, \
+            (open(os.path.join(frames_dir, "hud.jsonl"), "a", encoding="utf-8") if hud else nullcontext()) as log:
+        while cap.grab():
+            if frame_no % step == 0:
+                ret, frame = cap.retrieve()
+                t = frame_no / fps
+                if ret and sampler.update(t, frame):
+                    out_path = os.path.join(frames_dir, f"{name}_{int(t):04d}_{frame_no:06d}.png")
+                    if dedup and dedup.add(frame, out_path) is not None:
+                        duplicates += 1
+                    else:
+                        cv2.imwrite(out_path, frame, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+                        write_hud(log, out_path, t, frame, hud)
+            frame_no += 1
+            bar.update(1)
+
+    cap.release()
+    stats = sampler.stats()
+    stats["duplicates"] = duplicates
+    print(f"✅ {stats['kept'] - duplicates} frames guardados en: {frames_dir} "
+          f"({stats['frames']} analizados, {stats['non_game']} fuera de partida, {duplicates} casi duplicados)\n")
+    return stats
+
+def main(adaptive: bool = True,
+         interval_s: int = 30,
+         min_spacing: float = 2.0,
+         max_spacing: float = 30.0,
+         analysis_fps: float = 2.0,
+         hud_index: str = None,
+         dedup: bool = False,
+         dedup_distance: int = 5,
+         dedup_minimap: bool = False,
+         hud_layout: str = None):
     """
     Main function to extract frames from all .mkv files in the 'video' directory.
     It processes each video file, extracting frames at specified intervals and saving them in a structured directory
+    Parameters:
+    ----------
+    adaptive (bool):
+        If True, frames are chosen by minimap activity (extract_frames_adaptive);
+        otherwise one frame is taken every interval_s seconds.
+    interval_s (int):
+        Interval in seconds of the fixed extraction.
+    min_spacing (float):
+        Minimum seconds between two frames of the adaptive extraction.
+    max_spacing (float):
+        Maximum seconds between two frames of the adaptive extraction while the game is not static.
+    analysis_fps (float):
+        Frames per second scored by the adaptive extraction.
+    hud_index (str, optional):
+        HUD icon index built by hud_recognizer.py. If given, the items and summoner spells
+        of every saved frame are recognized too.
+    dedup (bool):
+        If True, near-duplicate frames are skipped with the FrameDedupIndex of frames/dedup.jsonl,
+        shared by all the videos and kept between runs.
+    dedup_distance (int):
+        Largest Hamming distance between the hashes of two duplicate frames.
+    dedup_minimap (bool):
+        If True, only the minimap region is compared instead of the whole frame.
+    hud_layout (str, optional):
+        JSON with the HUD slots (see hud_recognizer.load_layout). If None, HUD_LAYOUT is used.
     """
     
     video_folder = os.path.join(os.getcwd(), "video")
@@ -66,11 +200,39 @@ def main():
         print("[INFO] No hay archivos .mkv en 'video/'.")
         return
 
+    layout = load_layout(hud_layout) if hud_layout else HUD_LAYOUT
+    hud = HudRecognizer.load(hud_index, layout=layout) if hud_index else None
+    dedup_index = None
+    if dedup:
+        os.makedirs(os.path.join(video_folder, "frames"), exist_ok=True)
+        dedup_index = FrameDedupIndex(os.path.join(video_folder, "frames", "dedup.jsonl"), dedup_distance,
+                                      MINIMAP_REGION if dedup_minimap else None)
+        print(f"♻️ Índice de duplicados con {len(dedup_index.frames)} frames")
+
     print(f"🎬 {len(mkvs)} .mkv en 'video/'.\n")
-    for mkv in mkvs:
-        extract_frames_instant(os.path.join(video_folder, mkv), interval_s=30)
+    with dedup_index or nullcontext():
+        for mkv in mkvs:
+            video_path = os.path.join(video_folder, mkv)
+            if adaptive:
+                sampler = AdaptiveSampler(min_spacing=min_spacing, max_spacing=max_spacing)
+                extract_frames_adaptive(video_path, sampler, analysis_fps=analysis_fps, hud=hud, dedup=dedup_index)
+            else:
+                extract_frames_instant(video_path, interval_s=interval_s, hud=hud, dedup=dedup_index)
 
     print("🏁 Hecho.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Extrae frames de los .mkv de la carpeta 'video/'.")
+    parser.add_argument("--fixed", action="store_true", help="Extrae un frame cada --interval segundos.")
+    parser.add_argument("--interval", type=int, default=30, help="Segundos entre frames en modo fijo.")
+    parser.add_argument("--min-spacing", type=float, default=2.0, help="Segundos mínimos entre frames.")
+    parser.add_argument("--max-spacing", type=float, default=30.0, help="Segundos máximos entre frames.")
+    parser.add_argument("--analysis-fps", type=float, default=2.0, help="Frames por segundo analizados.")
+    parser.add_argument("--hud", type=str, default=None, help="Índice de iconos para reconocer objetos y hechizos.")
+    parser.add_argument("--layout", type=str, default=None, help="JSON con las casillas del HUD.")
+    parser.add_argument("--dedup", action="store_true", help="No guarda frames casi iguales a otros ya extraídos.")
+    parser.add_argument("--dedup-distance", type=int, default=5, help="Distancia de Hamming máxima de un duplicado.")
+    parser.add_argument("--dedup-minimap", action="store_true", help="Compara solo la región del minimapa.")
+    args = parser.parse_args()
+    main(not args.fixed, args.interval, args.min_spacing, args.max_spacing, args.analysis_fps, args.hud,
+         args.dedup, args.dedup_distance, args.dedup_minimap, args.layout)
@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+
+# Minimap area of a 16:9 League of Legends capture with the default HUD, as fractions
+# (x0, y0, x1, y1) of the frame.
+MINIMAP_REGION = (0.83, 0.70, 1.0, 1.0)
+
+
+class AdaptiveSampler:
+    """
+    Decides, frame by frame during one sequential decode pass, which frames of a match are
+    worth saving. Only the minimap region is scored: a frame is kept when its minimap changed
+    enough since the last kept frame (teamfights, rotations), never closer than min_spacing
+    and at least every max_spacing while the game is not static. Frames whose minimap region
+    does not look like a minimap (loading screen, menus, black frames) and static stretches
+    (pauses, replays frozen on one frame) are skipped.
+
+    Attributes:
+    ----------
+    region (tuple):
+        Minimap area as fractions (x0, y0, x1, y1) of the frame.
+    min_spacing (float):
+        Minimum seconds between two kept frames.
+    max_spacing (float):
+        Seconds after which a frame is kept even with little activity.
+    change_threshold (float):
+        Fraction of changed minimap pixels that makes a frame worth keeping.
+    duplicate_threshold (float):
+        Fraction of changed pixels below which a frame is a duplicate of the last kept one.
+    frames (int):
+        Frames scored.
+    kept (int):
+        Frames kept.
+    non_game (int):
+        Frames skipped because they are not gameplay.
+    """
+
+    def __init__(self,
+                 region=MINIMAP_REGION,
+                 min_spacing=2.0,
+                 max_spacing=30.0,
+                 change_threshold=0.03,
+                 duplicate_threshold=0.002,
+                 pixel_threshold=25,
+                 size=(96, 96),
+                 min_std=18.0,
+                 min_brightness=15.0):
+        """
+        Parameters:
+        ----------
+        region (tuple):
+            Minimap area as fractions (x0, y0, x1, y1) of the frame.
+        min_spacing (float):
+            Minimum seconds between two kept frames.
+        max_spacing (float):
+            Seconds after which a frame is kept even with little activity.
+        change_threshold (float):
+            Fraction of changed minimap pixels that makes a frame worth keeping.
+        duplicate_threshold (float):
+            Fraction of changed pixels below which a frame is a duplicate of the last kept one.
+        pixel_threshold (int):
+            Gray level difference (0-255) above which a pixel counts as changed, so
+            compression noise is ignored.
+        size (tuple):
+            (width, height) of the minimap thumbnail used for scoring.
+        min_std (float):
+            Minimum gray level deviation of the region for it to be a minimap.
+        min_brightness (float):
+            Minimum mean gray level of the region for it to be a minimap.
+        """
+        self.region = region
+        self.min_spacing = min_spacing
+        self.max_spacing = max_spacing
+        self.change_threshold = change_threshold
+        self.duplicate_threshold = duplicate_threshold
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.min_std = min_std
+        self.min_brightness = min_brightness
+        self.reference = None
+        self.last_time = None
+        self.frames = 0
+        self.kept = 0
+        self.non_game = 0
+
+    def crop(self, frame):
+        """
+        Returns a view of the minimap region of a frame.
+        """
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.region
+        return frame[int(y0 * h):int(y1 * h), int(x0 * w):int(x1 * w)]
+
+    def thumbnail(self, frame):
+        """
+        Reduces the minimap region of a BGR frame to the small grayscale thumbnail used for scoring.
+        """
+        region = self.crop(frame)
+        if region.ndim == 3:
+            region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(region, self.size, interpolation=cv2.INTER_AREA)
+
+    def is_game(self, thumb):
+        """
+        Returns True if the thumbnail looks like a minimap: not black and textured, unlike
+        the flat or dark regions of loading screens, menus and fades.
+        """
+        return float(thumb.mean()) >= self.min_brightness and float(thumb.std()) >= self.min_std
+
+    def change(self, thumb):
+        """
+        Returns the fraction of pixels that changed since the last kept frame.
+        """
+        diff = cv2.absdiff(thumb, self.reference)
+        return float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+
+    def update(self, t, frame):
+        """
+        Scores a frame and decides whether to keep it.
+
+        Parameters:
+        ----------
+        t (float):
+            Time of the frame in seconds.
+        frame (np.ndarray):
+            BGR frame.
+
+        Returns:
+        -------
+        bool:
+            True if the frame must be saved.
+        """
+        self.frames += 1
+        thumb = self.thumbnail(frame)
+        if not self.is_game(thumb):
+            self.non_game += 1
+            return False
+
+        if self.reference is None:
+            keep = True
+        else:
+            elapsed = t - self.last_time
+            if elapsed < self.min_spacing:
+                return False
+            score = self.change(thumb)
+            keep = (score >= self.change_threshold
+                    or (elapsed >= self.max_spacing and score >= self.duplicate_threshold))
+
+        if keep:
+            self.reference = thumb
+            self.last_time = t
+            self.kept += 1
+        return keep
+
+    def stats(self):
+        """
+        Returns the counters of the sampler.
+
+        Returns:
+        -------
+        dict:
+            Frames scored, frames kept and frames skipped as non-gameplay.
+        """
+        return {"frames": self.frames, "kept": self.kept, "non_game": self.non_game}
@@ -0,0 +1,225 @@
+import os
+import json
+import argparse
+from itertools import combinations
+import cv2
+import numpy as np
+from adaptive_sampling import MINIMAP_REGION
+
+DEDUP_VERSION = 1
+
+# Bits set in every byte value, to count differing bits without np.bitwise_count (NumPy 2 only)
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash(image, region=None):
+    """
+    64-bit difference hash of a BGR image: the gray image (or its region) is reduced to 9x8 and
+    every bit tells whether a pixel is brighter than its right neighbour. Frames that only differ
+    by compression noise, small brightness changes or a few moving pixels get hashes a few bits apart.
+
+    Parameters:
+    ----------
+    image (np.ndarray):
+        BGR image.
+    region (tuple, optional):
+        Area hashed, as fractions (x0, y0, x1, y1) of the image. None hashes the whole image.
+
+    Returns:
+    -------
+    int:
+        The hash.
+    """
+    if region is not None:
+        h, w = image.shape[:2]
+        x0, y0, x1, y1 = region
+        image = image[int(y0 * h):int(y1 * h), int(x0 * w):int(x1 * w)]
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).reshape(-1)
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(hashes, h):
+    """
+    Returns the Hamming distance between every hash of a uint64 array and h.
+    """
+    return POPCOUNT[(hashes ^ np.uint64(h)).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class FrameDedupIndex:
+    """
+    Persistent index of the perceptual hashes of the frames already extracted, to skip the
+    near-duplicates (pauses, shop screens, similar laning states) across videos and runs.
+
+    Lookups use multi-index hashing: the 64-bit hash is split in `tables` substrings, each one
+    the key of a hash table. Two hashes at most max_distance bits apart share, in at least one
+    of the substrings, a key at most max_distance // tables bits apart, so only the buckets of
+    those keys are probed and the full distance is only computed for the few candidates found,
+    instead of for every frame of the index.
+
+    The index is a JSON Lines file: a header with the settings and one line per frame, appended
+    (and flushed) as frames are written, so an interrupted run keeps what it saved.
+
+    Attributes:
+    ----------
+    path (str):
+        JSON Lines file of the index.
+    max_distance (int):
+        Largest Hamming distance at which two frames are duplicates.
+    region (tuple or None):
+        Area of the frame hashed (e.g. MINIMAP_REGION), or None for the whole frame.
+    frames (list):
+        Frame of each hash, relative to the folder of the index.
+    """
+
+    def __init__(self, path, max_distance=5, region=None, tables=4):
+        """
+        Parameters:
+        ----------
+        path (str):
+            JSON Lines file of the index. It is created if it does not exist.
+        max_distance (int):
+            Largest Hamming distance at which two frames are duplicates.
+        region (tuple, optional):
+            Area of the frame hashed, as fractions (x0, y0, x1, y1).
+        tables (int):
+            Number of substrings of the hash (1, 2, 4 or 8).
+        """
+        self.path = path
+        self.max_distance = max_distance
+        self.region = None if region is None else tuple(region)
+        self.tables = tables
+        self.bits = 64 // tables
+        self.radius = max_distance // tables
+        self.flips = [sum(1 << b for b in bits) for r in range(self.radius + 1)
+                      for bits in combinations(range(self.bits), r)]
+        self.buckets = [{} for _ in range(tables)]
+        self.hashes = np.zeros(1024, dtype=np.uint64)
+        self.frames = []
+        self.log = None
+        self.load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def keys(self, h):
+        mask = (1 << self.bits) - 1
+        return [(h >> (self.bits * i)) & mask for i in range(self.tables)]
+
+    def load(self):
+        """
+        Reads the index file, or creates it with its header.
+        """
+        header = {"version": DEDUP_VERSION, "hash": "dhash64", "region": self.region}
+        if os.path.isfile(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            # Solo cuentan las líneas completas: la última puede haber quedado a medias si una
+            # ejecución se interrumpió mientras escribía, y se recorta para no pegarle la siguiente
+            complete = data.rfind(b"\n") + 1
+            lines = data[:complete].decode("utf-8").splitlines()
+            saved = json.loads(lines[0]) if lines else header
+            if saved.get("region") is not None:
+                saved["region"] = tuple(saved["region"])
+            if saved != header:
+                raise ValueError(f"❌ El índice '{self.path}' se creó con otros ajustes: {saved}")
+            for line in lines[1:]:
+                record = json.loads(line)
+                self.insert(int(record["hash"], 16), record["frame"])
+            if complete < len(data):
+                with open(self.path, "r+b") as f:
+                    f.truncate(complete)
+        self.log = open(self.path, "a", encoding="utf-8")
+        if self.log.tell() == 0:
+            self.log.write(json.dumps(header) + "\n")
+            self.log.flush()
+
+    def insert(self, h, frame):
+        n = len(self.frames)
+        if n == len(self.hashes):
+            self.hashes = np.concatenate([self.hashes, np.zeros_like(self.hashes)])
+        self.hashes[n] = h
+        self.frames.append(frame)
+        for bucket, key in zip(self.buckets, self.keys(h)):
+            bucket.setdefault(key, []).append(n)
+
+    def find(self, h):
+        """
+        Returns the frame of the index closest to a hash within max_distance, or None.
+        """
+        candidates = set()
+        for bucket, key in zip(self.buckets, self.keys(h)):
+            for flip in self.flips:
+                candidates.update(bucket.get(key ^ flip, ()))
+        if not candidates:
+            return None
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        distances = hamming(self.hashes[candidates], h)
+        best = distances.argmin()
+        return self.frames[candidates[best]] if distances[best] <= self.max_distance else None
+
+    def add(self, frame, path):
+        """
+        Adds a frame unless it is a near-duplicate of one already in the index.
+
+        Parameters:
+        ----------
+        frame (np.ndarray):
+            BGR frame.
+        path (str):
+            Path the frame is saved to.
+
+        Returns:
+        -------
+        str or None:
+            Frame of the index it duplicates (the frame was not added), or None if it was added
+            and has to be saved.
+        """
+        h = dhash(frame, self.region)
+        duplicate = self.find(h)
+        if duplicate is not None:
+            return duplicate
+        frame_name = os.path.relpath(os.path.abspath(path), os.path.dirname(os.path.abspath(self.path)))
+        self.insert(h, frame_name)
+        self.log.write(json.dumps({"hash": f"{h:016x}", "frame": frame_name}) + "\n")
+        self.log.flush()
+        return None
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indexa frames y lista los casi duplicados")
+    parser.add_argument("frames", nargs="+", help="Frames o carpetas de frames a indexar.")
+    parser.add_argument("--index", type=str, default="frames/dedup.jsonl", help="Índice de hashes (.jsonl).")
+    parser.add_argument("--distance", type=int, default=5, help="Distancia de Hamming máxima de un duplicado.")
+    parser.add_argument("--minimap", action="store_true", help="Compara solo la región del minimapa.")
+    args = parser.parse_args()
+
+    paths = []
+    for item in args.frames:
+        if os.path.isdir(item):
+            paths += [os.path.join(item, f) for f in sorted(os.listdir(item)) if f.lower().endswith(".png")]
+        else:
+            paths.append(item)
+
+    duplicates = 0
+    with FrameDedupIndex(args.index, args.distance, MINIMAP_REGION if args.minimap else None) as index:
+        for path in paths:
+            frame = cv2.imread(path)
+            if frame is None:
+                print(f"[ERROR] No se pudo leer: {path}")
+                continue
+            duplicate = index.add(frame, path)
+            if duplicate is not None and duplicate != os.path.relpath(os.path.abspath(path),
+                                                                      os.path.dirname(os.path.abspath(args.index))):
+                duplicates += 1
+                print(f"♻️ {path} ≈ {duplicate}")
+        print(f"✅ {duplicates} duplicados de {len(paths)} frames, {len(index.frames)} en el índice '{args.index}'")
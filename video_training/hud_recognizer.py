@@ -0,0 +1,259 @@
+import os
+import json
+import argparse
+import cv2
+import numpy as np
+
+HUD_INDEX_VERSION = 1
+
+# HUD slots of a 16:9 capture with the default HUD at 100% scale, as fractions (x0, y0, x1, y1)
+# of the frame, and the icon set each slot is matched against. Other HUD scales need their own
+# layout (see HudRecognizer(layout=...) and --layout).
+HUD_LAYOUT = {
+    "summoner_d": ("summoners", (0.5270, 0.9170, 0.5490, 0.9560)),
+    "summoner_f": ("summoners", (0.5510, 0.9170, 0.5730, 0.9560)),
+    "item_1": ("items", (0.5850, 0.9120, 0.6040, 0.9460)),
+    "item_2": ("items", (0.6060, 0.9120, 0.6250, 0.9460)),
+    "item_3": ("items", (0.6270, 0.9120, 0.6460, 0.9460)),
+    "item_4": ("items", (0.5850, 0.9510, 0.6040, 0.9850)),
+    "item_5": ("items", (0.6060, 0.9510, 0.6250, 0.9850)),
+    "item_6": ("items", (0.6270, 0.9510, 0.6460, 0.9850)),
+    "trinket": ("items", (0.6480, 0.9120, 0.6670, 0.9460)),
+}
+
+# Folders of the scraper (OtherDownloader) with the icons of each set.
+ICON_FOLDERS = {"items": "items", "summoners": "summoners"}
+
+
+def load_icon(path):
+    """
+    Reads an icon as BGR, with its transparent pixels over black (as the HUD shows them).
+    """
+    icon = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if icon is None:
+        return None
+    if icon.ndim == 2:
+        return cv2.cvtColor(icon, cv2.COLOR_GRAY2BGR)
+    if icon.shape[2] == 4:
+        alpha = icon[:, :, 3:].astype(np.float32) / 255
+        return (icon[:, :, :3] * alpha).astype(np.uint8)
+    return icon
+
+
+class HudRecognizer:
+    """
+    Recognizes the items and summoner spells shown in the HUD of a frame by matching every slot
+    against the icons downloaded by the scraper.
+
+    Every icon is reduced once to a small descriptor: its center (without the border the HUD
+    draws around slots) resized to size x size, in color, mean-centered and L2-normalized, so
+    the dot product of two descriptors is their normalized cross-correlation and does not
+    depend on brightness or contrast (e.g. the dimming of an item on cooldown). All descriptors
+    live in one (N, D) float32 array; the slots of a frame are matched with a single matrix
+    product against it.
+
+    Attributes:
+    ----------
+    names (np.ndarray):
+        Icon names, one per row of the index.
+    categories (np.ndarray):
+        Icon set ("items", "summoners") of each row.
+    descriptors (np.ndarray):
+        (N, D) float32 index.
+    layout (dict):
+        Slot name -> (icon set, (x0, y0, x1, y1) fractions of the frame).
+    min_score (float):
+        Correlation below which a slot is reported as unknown.
+    """
+
+    def __init__(self, names, categories, descriptors, layout=HUD_LAYOUT, size=16, inset=0.1,
+                 min_score=0.5, min_std=6.0):
+        """
+        Parameters:
+        ----------
+        names (list):
+            Icon names.
+        categories (list):
+            Icon set of each name.
+        descriptors (np.ndarray):
+            (N, D) descriptors built with the same size and inset.
+        layout (dict):
+            HUD slots to read.
+        size (int):
+            Side of the descriptor thumbnails.
+        inset (float):
+            Fraction of each side of an icon or slot left out (border).
+        min_score (float):
+            Minimum correlation of a match.
+        min_std (float):
+            Gray level deviation under which a slot is empty.
+        """
+        self.names = np.asarray(names)
+        self.categories = np.asarray(categories)
+        self.descriptors = np.ascontiguousarray(descriptors, dtype=np.float32)
+        self.layout = layout
+        self.size = size
+        self.inset = inset
+        self.min_score = min_score
+        self.min_std = min_std
+        # Score offset that keeps every slot inside its own icon set
+        self.masks = {category: np.where(self.categories == category, 0.0, -np.inf).astype(np.float32)
+                      for category in set(self.categories.tolist())}
+
+    def describe(self, images):
+        """
+        Turns BGR images (icons or slot crops, any size) into the (M, D) descriptors of the index.
+
+        Returns:
+        -------
+        tuple:
+            (descriptors, gray level deviation of each image).
+        """
+        thumbs = []
+        for image in images:
+            h, w = image.shape[:2]
+            dy, dx = int(h * self.inset), int(w * self.inset)
+            center = image[dy:h - dy, dx:w - dx]
+            thumbs.append(cv2.resize(center, (self.size, self.size), interpolation=cv2.INTER_AREA))
+        data = np.stack(thumbs).reshape(len(thumbs), -1).astype(np.float32)
+        data -= data.mean(axis=1, keepdims=True)
+        std = np.sqrt((data ** 2).mean(axis=1))
+        data /= np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-6)
+        return data, std
+
+    @classmethod
+    def from_icons(cls, icons, **kwargs):
+        """
+        Builds the index from (category, name, path) tuples.
+        """
+        names, categories, images = [], [], []
+        for category, name, path in icons:
+            image = load_icon(path)
+            if image is None:
+                continue
+            names.append(name)
+            categories.append(category)
+            images.append(image)
+        if not images:
+            raise ValueError("❌ No se encontró ningún icono para el índice del HUD")
+        recognizer = cls(names, categories, np.zeros((0, 0), np.float32), **kwargs)
+        recognizer.descriptors, _ = recognizer.describe(images)
+        return recognizer
+
+    @classmethod
+    def from_scraped(cls, parent_path, **kwargs):
+        """
+        Builds the index from the folder the scraper downloaded to. If it has the manifest of
+        normalize_assets.py, the deduplicated icons listed there are used.
+
+        Parameters:
+        ----------
+        parent_path (str):
+            Folder of the scraped data (e.g. scrapping/data_train).
+        """
+        manifest_path = os.path.join(parent_path, "normalized", "manifest.json")
+        icons = []
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            root = os.path.dirname(manifest_path)
+            for category in ICON_FOLDERS:
+                for name, asset in sorted(manifest["assets"].get(category, {}).items()):
+                    icons.append((category, name, os.path.join(root, asset["path"])))
+        else:
+            for category, folder in ICON_FOLDERS.items():
+                folder = os.path.join(parent_path, folder)
+                if os.path.isdir(folder):
+                    icons += [(category, os.path.splitext(fn)[0], os.path.join(folder, fn))
+                              for fn in sorted(os.listdir(folder)) if fn.lower().endswith(".png")]
+        return cls.from_icons(icons, **kwargs)
+
+    def save(self, path):
+        """
+        Saves the index as a .npz file.
+        """
+        np.savez(path, version=HUD_INDEX_VERSION, names=self.names, categories=self.categories,
+                 descriptors=self.descriptors, size=self.size, inset=self.inset)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Loads an index saved with save().
+        """
+        with np.load(path) as data:
+            if int(data["version"]) != HUD_INDEX_VERSION:
+                raise ValueError(f"❌ Versión de índice no soportada en '{path}'")
+            return cls(data["names"], data["categories"], data["descriptors"],
+                       size=int(data["size"]), inset=float(data["inset"]), **kwargs)
+
+    def crops(self, frame):
+        """
+        Returns the (slot, icon set, crop) of every HUD slot of a frame.
+        """
+        h, w = frame.shape[:2]
+        return [(slot, category, frame[int(y0 * h):int(y1 * h), int(x0 * w):int(x1 * w)])
+                for slot, (category, (x0, y0, x1, y1)) in self.layout.items()]
+
+    def match(self, crops, categories):
+        """
+        Matches crops against the index with one matrix product.
+
+        Returns:
+        -------
+        list:
+            (name, score) per crop, or None for empty or unknown slots.
+        """
+        descriptors, std = self.describe(crops)
+        scores = descriptors @ self.descriptors.T
+        scores += np.stack([self.masks.get(c, np.full(len(self.names), -np.inf, np.float32)) for c in categories])
+        best = scores.argmax(axis=1)
+        best_score = scores[np.arange(len(crops)), best]
+        return [None if s < self.min_std or score < self.min_score else (str(self.names[i]), float(score))
+                for i, score, s in zip(best, best_score, std)]
+
+    def recognize(self, frame):
+        """
+        Reads the items and summoner spells of a BGR frame.
+
+        Returns:
+        -------
+        dict:
+            Slot name -> {"name", "score"}, or None if the slot is empty or not recognized.
+        """
+        slots = self.crops(frame)
+        matches = self.match([crop for _, _, crop in slots], [category for _, category, _ in slots])
+        return {slot: None if m is None else {"name": m[0], "score": round(m[1], 3)}
+                for (slot, _, _), m in zip(slots, matches)}
+
+
+def load_layout(path):
+    """
+    Reads a HUD layout JSON: {"slot": ["items" | "summoners", [x0, y0, x1, y1]], ...}.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return {slot: (category, tuple(box)) for slot, (category, box) in json.load(f).items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconoce objetos y hechizos de invocador en el HUD")
+    parser.add_argument("frames", nargs="*", help="Frames a reconocer.")
+    parser.add_argument("--build", type=str, default=None, help="Carpeta del scraper con la que crear el índice.")
+    parser.add_argument("--index", type=str, default="hud_index.npz", help="Índice de iconos (.npz).")
+    parser.add_argument("--layout", type=str, default=None, help="JSON con las casillas del HUD.")
+    args = parser.parse_args()
+
+    layout = load_layout(args.layout) if args.layout else HUD_LAYOUT
+    if args.build:
+        recognizer = HudRecognizer.from_scraped(args.build, layout=layout)
+        recognizer.save(args.index)
+        print(f"✅ Índice con {len(recognizer.names)} iconos guardado en '{args.index}'")
+    else:
+        recognizer = HudRecognizer.load(args.index, layout=layout)
+    for path in args.frames:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"[ERROR] No se pudo leer: {path}")
+            continue
+        result = recognizer.recognize(frame)
+        print(f"🎒 {os.path.basename(path)}: " + ", ".join(
+            f"{slot}={r['name']} ({r['score']:.2f})" for slot, r in result.items() if r))